@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Publisher 效能基準測試。
+
+對每個規模 (預設 1k / 10k / 100k 篇) 產生合成 KB，分別量測:
+- discover_source_files (掃描 + stat)
+- update_block_index (全圖譜 id:: Block 索引，冷啟動)
+- parse_logseq_file (所有來源檔)
+- enrich_article_metadata (所有文章)
+- generate_related_articles (建立 RelatedIndex + 所有已發佈文章)
+- 完整的 main() (--full，冷啟動)
+
+另外以 `python -X importtime` 量測啟動時的 import 成本，超過 --import-budget-ms
+或在啟動時就載入了應延遲載入的模組 (例如 yaml) 會以非零結束碼回報。
+
+結果存成 JSON，可用 --compare 與先前的結果比較。
+
+用法:
+    python3 scripts/bench_publisher.py --sizes 1000 10000 --out bench_results/run.json
+    python3 scripts/bench_publisher.py --sizes 1000 --compare bench_results/run.json
+"""
+import os
+import sys
+import copy
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import contextlib
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_kb import generate_kb
+from publisher.contracts.types import PublisherConfig
+from publisher.actions.parser import parse_logseq_file
+from publisher.actions.enricher import enrich_article_metadata
+from publisher.actions.block_index import update_block_index, block_tags_map
+from publisher.actions.generator import generate_related_articles
+from publisher.actions.related import RelatedIndex
+from publisher.actions.discovery import discover_source_files
+from publisher.actions.pipeline import assign_output_paths, assign_routes, build_tag_index
+from publisher.actions.collisions import check_collisions
+from publisher.entry.main import main as publisher_main
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_IMPORT_BUDGET_MS = 80.0
+# 這些模組只在特定路徑才需要 (Legacy 頁面 / --jobs)，不該出現在啟動 import 中
+LAZY_MODULES = ["yaml", "concurrent.futures.process", "multiprocessing"]
+
+@contextlib.contextmanager
+def _chdir(path: str):
+    prev = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(prev)
+
+def _timed(fn, repeat: int):
+    """回傳 (最後一次結果, 各次秒數)"""
+    times = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return result, times
+
+def _summary(times, items: int):
+    best = min(times)
+    return {
+        "items": items,
+        "min_s": best,
+        "median_s": statistics.median(times),
+        "runs": times,
+        "items_per_s": items / best if best > 0 else None,
+    }
+
+def prepare_workspace(base_dir: str, size: int, seed: int) -> str:
+    """每個規模一個工作目錄 (KB/ + quartz/)，已存在則重複使用以節省產生時間"""
+    workspace = os.path.join(base_dir, f"kb-{size}-{seed}")
+    kb_dir = os.path.join(workspace, "KB")
+    if not os.path.exists(os.path.join(kb_dir, "pages", "TagsBlock.md")):
+        print(f"  🏗️  產生 {size} 篇文章的合成 KB...")
+        generate_kb(kb_dir, articles=size, seed=seed)
+    return workspace
+
+def bench_size(workspace: str, repeat: int, skip_main: bool) -> dict:
+    results = {}
+    with _chdir(workspace):
+        config = PublisherConfig()
+        stats, times = _timed(lambda: discover_source_files(config), repeat)
+        files = list(stats)
+        results["discover_source_files"] = _summary(times, len(files))
+        index, times = _timed(lambda: update_block_index(None, stats)[0], repeat)
+        results["update_block_index"] = _summary(times, len(files))
+        uuid_map = block_tags_map(index, config)
+
+        parsed, times = _timed(lambda: [a for f in files for a in parse_logseq_file(f, config)], repeat)
+        results["parse_logseq_file"] = _summary(times, len(files))
+
+        def enrich_all():
+            articles = copy.deepcopy(parsed)
+            started = time.perf_counter()
+            for art in articles:
+                enrich_article_metadata(art, uuid_map)
+            return articles, time.perf_counter() - started
+
+        # deepcopy 不計入 enrich 時間
+        enrich_times = []
+        for _ in range(repeat):
+            enriched, elapsed = enrich_all()
+            enrich_times.append(elapsed)
+        results["enrich_article_metadata"] = _summary(enrich_times, len(parsed))
+
+        # 與 publish() 相同的順序: 輸出路徑 -> 衝突處理 -> ArticleRoute
+        published = assign_output_paths(enriched)
+        check_collisions(published)
+        assign_routes(published)
+        tag_index = build_tag_index(published)
+
+        def related_all():
+            related = RelatedIndex(published, tag_index, config)
+            return [generate_related_articles(a, related) for a in published]
+        _, times = _timed(related_all, repeat)
+        results["generate_related_articles"] = _summary(times, len(published))
+
+        if not skip_main:
+            def run_main():
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    publisher_main(["--full"])
+            _, times = _timed(run_main, repeat)
+            results["main"] = _summary(times, len(files))
+    return results
+
+def measure_import_time(repeat: int) -> dict:
+    """
+    在子行程中以 -X importtime 匯入 publisher.entry.main，取多次中最快的一次。
+    """
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import publisher.entry.main"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        )
+        modules = []
+        total_us = 0
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            # 格式: "import time:   self | cumulative |   <縮排>module"
+            self_part, cumulative_part, raw_name = line.split("|")
+            self_us = int(self_part.split(":")[1])
+            cumulative_us = int(cumulative_part)
+            depth = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+            modules.append({"module": raw_name.strip(), "self_us": self_us, "cumulative_us": cumulative_us})
+            # 只計入 publisher 自己觸發的 import (直譯器啟動時的 site 等不算)
+            if depth == 0 and raw_name.strip().startswith("publisher"):
+                total_us += cumulative_us
+        if best is None or total_us < best["total_us"]:
+            best = {"total_us": total_us, "modules": modules}
+
+    loaded = {m["module"] for m in best["modules"]}
+    return {
+        "total_ms": best["total_us"] / 1000,
+        "eager_lazy_modules": [m for m in LAZY_MODULES if m in loaded],
+        "slowest_modules": sorted(best["modules"], key=lambda m: m["self_us"], reverse=True)[:10],
+    }
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return ""
+
+def compare_results(current: dict, baseline: dict) -> str:
+    lines = ["", "📊 與基準比較 (min 秒數，<1.00x 代表變快)"]
+    for size, benches in current["sizes"].items():
+        base_benches = baseline.get("sizes", {}).get(size)
+        if not base_benches:
+            continue
+        lines.append(f"  [{size}]")
+        for name, stats in benches.items():
+            base = base_benches.get(name)
+            if not base or not base.get("min_s"):
+                continue
+            ratio = stats["min_s"] / base["min_s"]
+            lines.append(f"    {name:<28}{base['min_s']:>9.3f}s → {stats['min_s']:>9.3f}s  ({ratio:.2f}x)")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Publisher 效能基準測試")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="文章數量 (可多個)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", default=os.path.join(".publisher-cache", "bench"), help="合成 KB 存放位置")
+    parser.add_argument("--out", default=None, help="結果 JSON 路徑 (預設 bench_results/<時間>.json)")
+    parser.add_argument("--compare", default=None, help="與先前的結果 JSON 比較")
+    parser.add_argument("--skip-main", action="store_true", help="不量測完整 main()")
+    parser.add_argument("--import-budget-ms", type=float, default=DEFAULT_IMPORT_BUDGET_MS,
+                        help="publisher 啟動 import 時間上限 (毫秒)")
+    args = parser.parse_args()
+
+    base_dir = os.path.abspath(args.workdir)
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "git": _git_revision(),
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "sizes": {},
+    }
+
+    startup = measure_import_time(args.repeat)
+    startup["budget_ms"] = args.import_budget_ms
+    report["startup"] = startup
+    print(f"🚦 啟動 import: {startup['total_ms']:.1f} ms (預算 {args.import_budget_ms:.0f} ms)")
+    budget_ok = startup["total_ms"] <= args.import_budget_ms and not startup["eager_lazy_modules"]
+    if startup["eager_lazy_modules"]:
+        print(f"  ⚠️ 啟動時就載入了應延遲的模組: {', '.join(startup['eager_lazy_modules'])}")
+    if startup["total_ms"] > args.import_budget_ms:
+        print("  ⚠️ 超過啟動預算，最慢的模組:")
+        for m in startup["slowest_modules"][:5]:
+            print(f"    {m['self_us'] / 1000:>7.2f} ms  {m['module']}")
+
+    for size in args.sizes:
+        print(f"⏱️  規模 {size} 篇...")
+        workspace = prepare_workspace(base_dir, size, args.seed)
+        benches = bench_size(workspace, args.repeat, args.skip_main)
+        report["sizes"][str(size)] = benches
+        for name, stats in benches.items():
+            print(f"    {name:<28}{stats['min_s']:>9.3f}s  ({stats['items']} 項)")
+
+    out_path = args.out or os.path.join("bench_results", datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 結果已儲存: {out_path}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            print(compare_results(report, json.load(f)))
+
+    return 0 if budget_ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+把 publisher 打包成單一檔案的 zipapp (dist/publish.pyz)。
+
+編輯器 Hook 可以直接執行:
+    python3 dist/publish.pyz [--full] [--jobs N] ...
+
+PyYAML 不會被打包進去，執行環境仍需安裝 (只有 Legacy 頁面會用到)。
+"""
+import os
+import sys
+import shutil
+import zipapp
+import argparse
+import tempfile
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def _ignore(directory, files):
+    return [f for f in files if f == "__pycache__" or f.endswith((".pyc", ".pyo"))]
+
+def build_zipapp(target: str, compress: bool = True, interpreter: str = "/usr/bin/env python3") -> str:
+    with tempfile.TemporaryDirectory() as staging:
+        shutil.copytree(os.path.join(SCRIPTS_DIR, "publisher"), os.path.join(staging, "publisher"), ignore=_ignore)
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+        zipapp.create_archive(
+            staging,
+            target=target,
+            interpreter=interpreter,
+            main="publisher.entry.main:main",
+            compressed=compress,
+        )
+    return target
+
+def main():
+    parser = argparse.ArgumentParser(description="建立 publisher zipapp")
+    parser.add_argument("--out", default=os.path.join("dist", "publish.pyz"))
+    parser.add_argument("--no-compress", action="store_true", help="不壓縮 (啟動稍快，檔案較大)")
+    args = parser.parse_args()
+
+    target = build_zipapp(args.out, compress=not args.no_compress)
+    print(f"📦 已建立 zipapp: {target} ({os.path.getsize(target) / 1024:.1f} KB)")
+
+if __name__ == "__main__":
+    sys.exit(main())
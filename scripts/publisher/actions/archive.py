@@ -2,9 +2,9 @@ import os
 from datetime import datetime
 from typing import List
 from ..contracts.types import Article, PublisherConfig
-from ..actions.utils import get_safe_path_elements
 
-def generate_archive(articles: List[Article], config: PublisherConfig):
+def render_archive(articles: List[Article], full_paths: bool = False) -> str:
+    """full_paths: 連結寫成 分類/檔名 (wikilink_resolution = "absolute")"""
     year_map = {}
     
     for art in articles:
@@ -55,8 +55,8 @@ def generate_archive(articles: List[Article], config: PublisherConfig):
             for art in arts:
                 date = str(art.date)
                 title = art.title
-                safe_cat, safe_title = get_safe_path_elements(title, art.categories)
-                lines.append(f"- {date} - [[{safe_title}|{title}]]")
+                link_path = art.route.path if full_paths else art.route.stem
+                lines.append(f"- {date} - [[{link_path}|{title}]]")
                 
             lines.append('')
             lines.append('</div>')
@@ -67,12 +67,15 @@ def generate_archive(articles: List[Article], config: PublisherConfig):
         lines.append('</details>')
         lines.append("")
     
+    return "\n".join(lines)
+
+def generate_archive(articles: List[Article], config: PublisherConfig):
     target_path = os.path.join(config.quartz_content_dir, "archive.md")
     with open(target_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
+        f.write(render_archive(articles, config.wikilink_resolution == "absolute"))
     print("  📅 已生成歸檔頁面: archive.md")
 
-def generate_tags_page(articles: List[Article], config: PublisherConfig):
+def render_tags_page(articles: List[Article], full_paths: bool = False) -> str:
     tag_map = {}
     
     for art in articles:
@@ -108,16 +111,18 @@ def generate_tags_page(articles: List[Article], config: PublisherConfig):
         for art in arts:
             title = art.title
             date = str(art.date)
-            
-            safe_cat, safe_title = get_safe_path_elements(title, art.categories)
-            lines.append(f"- {date} - [[{safe_title}|{title}]]")
+            link_path = art.route.path if full_paths else art.route.stem
+            lines.append(f"- {date} - [[{link_path}|{title}]]")
         
         lines.append('')
         lines.append('</div>')
         lines.append('</details>')
         lines.append("")
 
+    return "\n".join(lines)
+
+def generate_tags_page(articles: List[Article], config: PublisherConfig):
     target_path = os.path.join(config.quartz_content_dir, "all-tags.md")
     with open(target_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
+        f.write(render_tags_page(articles, config.wikilink_resolution == "absolute"))
     print("  🏷️ 已生成標籤頁面: all-tags.md")
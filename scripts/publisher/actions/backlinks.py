@@ -0,0 +1,77 @@
+from typing import Dict, List, Set, Tuple
+from ..contracts.types import Article
+from .outline import article_refs
+from .related import article_key
+from .wikilinks import link_name, build_link_targets
+
+class BacklinkIndex:
+    """
+    反向連結索引: 連結目標 (與 sanitize_content_links 相同清理後的名稱) -> 連到它的文章。
+    連結在解析時已隨 Block 一起取出 (Article.refs)，這裡不再掃描內文；
+    update() 只改動連出連結有變的文章在索引中的項目，Watch 模式可以一直沿用同一個索引。
+    名稱依標題 / 輸出檔名 / alias 對應到文章，同一篇文章的所有名稱合併成它的「被引用於」清單。
+    """
+    def __init__(self):
+        # 文章 key -> 它連到的目標 (排序、去重)
+        self.links: Dict[str, Tuple[str, ...]] = {}
+        # 目標 -> 連到它的文章 key
+        self.reverse: Dict[str, Set[str]] = {}
+        self.by_key: Dict[str, Article] = {}
+        self.changed = 0
+        self._names: Dict[str, List[str]] = {}
+        self._selected: Dict[str, List[Article]] = {}
+
+    def update(self, articles: List[Article]) -> "BacklinkIndex":
+        keys = [article_key(a) for a in articles]
+        current = {}
+        for key, art in zip(keys, articles):
+            targets = {link_name(text) for text in article_refs(art)["links"]}
+            targets.discard("")
+            current[key] = tuple(sorted(targets))
+
+        self.changed = 0
+        for key in self.links.keys() - current.keys():
+            self._replace(key, self.links.pop(key), ())
+            self.changed += 1
+        for key, targets in current.items():
+            old = self.links.get(key, ())
+            if old != targets:
+                self._replace(key, old, targets)
+                self.links[key] = targets
+                self.changed += 1
+
+        # 名稱的歸屬取決於所有文章的標題 / 檔名 / alias，重新對應一次 (不需要走訪連結)
+        self.by_key = dict(zip(keys, articles))
+        self._names = {}
+        for name, key in build_link_targets(articles, keys).items():
+            self._names.setdefault(key, []).append(name)
+        self._selected = {}
+        return self
+
+    def _replace(self, key: str, old: Tuple[str, ...], new: Tuple[str, ...]):
+        for target in set(old) - set(new):
+            sources = self.reverse.get(target)
+            if sources is not None:
+                sources.discard(key)
+                if not sources:
+                    del self.reverse[target]
+        for target in set(new) - set(old):
+            self.reverse.setdefault(target, set()).add(key)
+
+    def backlinks(self, article: Article) -> List[Article]:
+        """連到這篇文章的其他文章，依日期 (新到舊)、再依輸出路徑排序"""
+        key = article_key(article)
+        if key in self._selected:
+            return self._selected[key]
+        sources = set()
+        for name in self._names.get(key, ()):
+            sources.update(self.reverse.get(name, ()))
+        sources.discard(key)
+        ordered = sorted(sources)
+        ordered.sort(key=lambda k: str(self.by_key[k].date), reverse=True)
+        selected = self._selected[key] = [self.by_key[k] for k in ordered]
+        return selected
+
+def build_backlink_index(articles: List[Article], previous: BacklinkIndex = None) -> BacklinkIndex:
+    """沿用上一個索引 (Watch 模式) 只更新有變的文章，否則從頭建立"""
+    return (previous or BacklinkIndex()).update(articles)
@@ -0,0 +1,185 @@
+import os
+import re
+import json
+from pathlib import Path
+from urllib.parse import unquote
+from typing import Dict, List, Optional, Tuple, Any
+from ..contracts.types import BlockIndex, PublisherConfig
+from .parser import read_source_bytes, decode_source
+
+BLOCK_INDEX_VERSION = 1
+BLOCK_INDEX_FILENAME = "block_index.json"
+
+_ID_PROPERTY_RE = re.compile(r'^id::\s*([a-zA-Z0-9-]+)')
+# 輸出 (嵌入) 時不需要的系統屬性
+_SYSTEM_PROPERTY_RE = re.compile(r'^(collapsed|id|logseq\.[a-z]+)::\s')
+_PAGE_PROPERTY_RE = re.compile(r'^([a-zA-Z0-9_-]+)::\s*(.*)$')
+_TAG_BLOCK_RE = re.compile(r'^\+\+(.+)$')
+
+def page_name_from_path(filepath: Path) -> str:
+    """Logseq 檔名 -> 頁面名稱 (命名空間 ___ 與 %2F 轉回 /)"""
+    return unquote(filepath.stem.replace("___", "/"))
+
+def _split_indent(line: str) -> Tuple[int, str]:
+    """回傳 (縮排寬度，Tab 算 2 格, 去掉縮排的內容)"""
+    body = line.lstrip(" \t")
+    return len(line[:len(line) - len(body)].expandtabs(2)), body
+
+def scan_blocks(filepath: Path, content: str) -> Dict[str, Any]:
+    """
+    掃描一個來源檔: 頁首屬性 (title:: / alias::) 與所有帶 id:: 的 Block。
+    每個 Block 記錄頁面、自己的文字、祖先 Block 的第一行 (由上而下) 與含子 Block 的大綱原文。
+    """
+    lines = content.split("\n")
+    page = page_name_from_path(filepath)
+    aliases: List[str] = []
+
+    # 頁首屬性: 第一個 "- " Block 之前的 key:: value
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith("- ") or stripped == "-":
+            break
+        prop = _PAGE_PROPERTY_RE.match(stripped)
+        if not prop:
+            continue
+        key, value = prop.group(1).lower(), prop.group(2).strip()
+        if key == "title" and value:
+            page = value
+        elif key == "alias" and value:
+            aliases.extend(a.strip().strip("[]") for a in value.split(",") if a.strip())
+
+    record = {"page": page, "aliases": aliases, "blocks": {}}
+    if "id::" not in content:
+        return record
+
+    # (縮排寬度, 起始行, 文字行, uuid)；遇到縮排不大於自己的下一個 Block 時結束
+    stack: List[list] = []
+    finished: List[Tuple[int, int, int, list, Optional[str], List[str]]] = []
+    in_code = False
+
+    def close(end: int):
+        indent, start, text_lines, uuid = stack.pop()
+        if uuid:
+            parents = [entry[2][0] if entry[2] else "" for entry in stack]
+            finished.append((indent, start, end, text_lines, uuid, parents))
+
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if not in_code and (stripped.startswith("- ") or stripped == "-"):
+            indent = _split_indent(line)[0]
+            while stack and stack[-1][0] >= indent:
+                close(i)
+            stack.append([indent, i, [stripped[2:]], None])
+            if "```" in stripped:
+                in_code = stripped.count("```") % 2 == 1
+            continue
+        if not stack:
+            continue
+        if "```" in stripped:
+            if stripped.count("```") % 2 == 1:
+                in_code = not in_code
+        elif not in_code:
+            id_match = _ID_PROPERTY_RE.match(stripped)
+            if id_match:
+                stack[-1][3] = id_match.group(1)
+                continue
+            if _SYSTEM_PROPERTY_RE.match(stripped):
+                continue
+        if stripped:
+            stack[-1][2].append(stripped)
+    while stack:
+        close(len(lines))
+
+    for indent, start, end, text_lines, uuid, parents in finished:
+        outline = []
+        for line in lines[start:end]:
+            stripped = line.strip()
+            if not stripped or _SYSTEM_PROPERTY_RE.match(stripped):
+                continue
+            width, body = _split_indent(line)
+            outline.append(" " * (width - indent) + body)
+        record["blocks"][uuid] = {
+            "text": "\n".join(text_lines),
+            "parents": parents,
+            "outline": "\n".join(outline),
+        }
+    return record
+
+def _rebuild_lookups(index: BlockIndex):
+    index.blocks = {}
+    index.pages = {}
+    for file_key, record in index.files.items():
+        for name in [record["page"]] + record.get("aliases", []):
+            index.pages.setdefault(name.lower(), file_key)
+        for uuid, entry in record["blocks"].items():
+            index.blocks[uuid] = dict(entry, page=record["page"], file=file_key)
+
+def update_block_index(previous: Optional[BlockIndex], source_stats: Dict[Path, os.stat_result]) -> Tuple[BlockIndex, int]:
+    """
+    以 mtime / size 判斷哪些來源檔需要重新掃描，其餘沿用上次的紀錄。
+    回傳 (新的索引, 重新掃描的檔案數)。
+    """
+    old_files = previous.files if previous else {}
+    index = BlockIndex()
+    rescanned = 0
+    for filepath, st in source_stats.items():
+        key = str(filepath)
+        old = old_files.get(key)
+        if old and old["mtime_ns"] == st.st_mtime_ns and old["size"] == st.st_size:
+            index.files[key] = old
+            continue
+        raw = read_source_bytes(filepath)
+        try:
+            content = decode_source(raw) if raw is not None else ""
+        except UnicodeDecodeError:
+            content = ""
+        record = scan_blocks(filepath, content)
+        record["mtime_ns"] = st.st_mtime_ns
+        record["size"] = st.st_size
+        index.files[key] = record
+        rescanned += 1
+    _rebuild_lookups(index)
+    return index, rescanned
+
+def load_block_index(config: PublisherConfig) -> Optional[BlockIndex]:
+    index_path = os.path.join(config.cache_dir, BLOCK_INDEX_FILENAME)
+    if not os.path.exists(index_path):
+        return None
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"  ⚠️ Block 索引讀取失敗，重新掃描: {e}")
+        return None
+    if data.get("version") != BLOCK_INDEX_VERSION:
+        return None
+    index = BlockIndex(files=data.get("files", {}))
+    _rebuild_lookups(index)
+    return index
+
+def save_block_index(config: PublisherConfig, index: BlockIndex):
+    os.makedirs(config.cache_dir, exist_ok=True)
+    index_path = os.path.join(config.cache_dir, BLOCK_INDEX_FILENAME)
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": BLOCK_INDEX_VERSION, "files": index.files}, f, ensure_ascii=False)
+    os.replace(tmp_path, index_path)
+
+def block_tags_map(index: BlockIndex, config: PublisherConfig) -> Dict[str, str]:
+    """
+    TagsBlock.md 中的 UUID -> 標籤。
+    標籤取自 Block 自己或最近的祖先中 "++標籤" 形式的文字 (開頭的 / 會去掉)。
+    """
+    tags_block = str(Path(config.logseq_dir) / "pages" / "TagsBlock.md")
+    record = index.files.get(tags_block)
+    if not record:
+        return {}
+    uuid_tags_map = {}
+    for uuid, entry in record["blocks"].items():
+        first_line = entry["text"].split("\n", 1)[0]
+        for text in [first_line] + entry["parents"][::-1]:
+            tag_match = _TAG_BLOCK_RE.match(text.strip())
+            if tag_match:
+                uuid_tags_map[uuid] = tag_match.group(1).strip().lstrip('/')
+                break
+    return uuid_tags_map
@@ -0,0 +1,100 @@
+import os
+import json
+import hashlib
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Optional, Any
+from ..contracts.types import Article, PublisherConfig
+from .tags import load_tag_rules
+
+MANIFEST_VERSION = 2
+MANIFEST_FILENAME = "manifest.json"
+
+def compute_build_context(config: PublisherConfig, uuid_tags_map: Dict[str, str]) -> str:
+    """
+    影響解析/Enrich 結果的全域輸入 (發佈標記、TagsBlock 對照表、標籤規則)。
+    任何一項改變，整份 Manifest 就失效。
+    """
+    payload = json.dumps({
+        "version": MANIFEST_VERSION,
+        "publish_uuid": config.publish_uuid,
+        "publish_markers": config.publish_markers,
+        "unpublish_markers": config.unpublish_markers,
+        "uuid_tags_map": uuid_tags_map,
+        "tag_rules": load_tag_rules(config.tag_rules_path).digest,
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+def hash_file(filepath: Path) -> str:
+    h = hashlib.sha1()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def load_build_manifest(config: PublisherConfig, context: str) -> Dict[str, Dict[str, Any]]:
+    """讀取上次的 Manifest；版本或 Build Context 不符時回傳空 Manifest (等同全量重建)"""
+    manifest_path = os.path.join(config.cache_dir, MANIFEST_FILENAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"  ⚠️ Manifest 讀取失敗，改為全量重建: {e}")
+        return {}
+    if data.get("version") != MANIFEST_VERSION or data.get("context") != context:
+        return {}
+    return data.get("files", {})
+
+def save_build_manifest(config: PublisherConfig, entries: Dict[str, Dict[str, Any]], context: str):
+    os.makedirs(config.cache_dir, exist_ok=True)
+    manifest_path = os.path.join(config.cache_dir, MANIFEST_FILENAME)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        # frontmatter 可能含有 YAML 解析出的 date 物件，以 str 形式保存
+        json.dump({
+            "version": MANIFEST_VERSION,
+            "context": context,
+            "files": entries,
+        }, f, ensure_ascii=False, default=str)
+    os.replace(tmp_path, manifest_path)
+
+def build_manifest_entry(filepath: Path, articles: List[Article], st: os.stat_result = None,
+                         digest: str = None, date_volatile: bool = False) -> Dict[str, Any]:
+    """記錄來源檔指紋 (mtime / size / hash) 與它產出的 (已 Enrich) 文章"""
+    if st is None:
+        st = filepath.stat()
+    return {
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha1": digest or hash_file(filepath),
+        # 日期由執行當天推算的文章，隔天就不能再沿用
+        "volatile_on": datetime.now().strftime("%Y-%m-%d") if date_volatile else None,
+        "articles": [asdict(a) for a in articles],
+    }
+
+def lookup_cached_articles(entry: Optional[Dict[str, Any]], filepath: Path,
+                           st: os.stat_result = None) -> Optional[List[Article]]:
+    """
+    來源檔未變更時回傳快取的文章，否則回傳 None。
+    mtime 與 size 相同直接命中；只有 mtime 改變 (例如 touch) 時再比對內容 hash。
+    """
+    if not entry:
+        return None
+    volatile_on = entry.get("volatile_on")
+    if volatile_on and volatile_on != datetime.now().strftime("%Y-%m-%d"):
+        return None
+    if st is None:
+        st = filepath.stat()
+    if st.st_size != entry.get("size"):
+        return None
+    if st.st_mtime_ns != entry.get("mtime_ns"):
+        if hash_file(filepath) != entry.get("sha1"):
+            return None
+        entry["mtime_ns"] = st.st_mtime_ns
+    return [Article(**a) for a in entry.get("articles", [])]
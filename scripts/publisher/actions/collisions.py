@@ -0,0 +1,136 @@
+import os
+import hashlib
+import tempfile
+from datetime import datetime
+from typing import Dict, List, Tuple
+from ..contracts.types import Article, PublisherConfig
+
+# 衝突種類 -> [(衝突的值, [文章描述...])]
+CollisionReport = Dict[str, List[Tuple[str, List[str]]]]
+
+def display_title(article: Article) -> str:
+    """輸出 frontmatter 的 title (去掉開頭 # 與粗體標記)，短網址以它計算"""
+    raw_title = article.frontmatter.get("title", article.title)
+    title = str(raw_title).strip().lstrip("#").strip()
+    return title.replace("**", "").replace("__", "")
+
+def compute_short_hash(article: Article, salt: int = 0) -> str:
+    date = article.date if article.date else datetime.now().strftime("%Y-%m-%d")
+    seed = f"{display_title(article)}{date}" + (f"#{salt}" if salt else "")
+    return hashlib.md5(seed.encode()).hexdigest()[:6]
+
+def _describe(article: Article) -> str:
+    return f"{article.title} ({article.source_file}, {article.date})"
+
+def _path_key(path: str, case_insensitive: bool) -> str:
+    return path.casefold() if case_insensitive else path
+
+def _stable_order(articles: List[Article]) -> List[Tuple[int, Article]]:
+    """衝突時由誰保留原名與掃描順序無關，只看來源檔、日期與標題"""
+    return sorted(enumerate(articles), key=lambda ia: (ia[1].source_file, str(ia[1].date), ia[1].title, ia[0]))
+
+def is_case_insensitive_dir(path: str) -> bool:
+    """在 path (或最近的既有上層目錄) 建一個暫存檔，看小寫檔名是否指向同一個檔案"""
+    probe_dir = os.path.abspath(path)
+    while not os.path.isdir(probe_dir) and os.path.dirname(probe_dir) != probe_dir:
+        probe_dir = os.path.dirname(probe_dir)
+    try:
+        with tempfile.NamedTemporaryFile(prefix="CaseProbe-", dir=probe_dir) as probe:
+            name = os.path.basename(probe.name)
+            return os.path.exists(os.path.join(probe_dir, name.lower()))
+    except OSError:
+        # 無法偵測時當成不分大小寫 (多加後綴比覆寫檔案安全)
+        return True
+
+def case_insensitive_paths(config: PublisherConfig) -> bool:
+    """collision_case_insensitive 未設定時，依輸出目錄所在的檔案系統決定"""
+    if config.collision_case_insensitive is not None:
+        return config.collision_case_insensitive
+    return is_case_insensitive_dir(config.quartz_content_dir)
+
+def resolve_collisions(articles: List[Article], case_insensitive: bool = True) -> CollisionReport:
+    """
+    一次走訪建立 輸出路徑 / Slug / 短網址 三個 Hash 索引，O(n) 找出衝突。
+    排序在前的文章保留原值，其餘依序加上 -2、-3... (短網址改以加鹽重新計算)，
+    每篇文章最後都只有一個寫入目標。會直接修改 filename / path_suffix / slug / short_hash。
+    case_insensitive 時輸出路徑不分大小寫比對，只差大小寫的衝突另外列在 "path_case"。
+    """
+    report: CollisionReport = {"path": [], "path_case": [], "slug": [], "short_hash": []}
+    paths: Dict[str, Article] = {}
+    slugs: Dict[str, Article] = {}
+    short_hashes: Dict[str, Article] = {}
+    path_groups: Dict[str, List[str]] = {}
+    case_groups: Dict[str, List[str]] = {}
+    # 實際佔用的路徑 (分大小寫)，用來區分真正同名與只差大小寫
+    exact_paths = set()
+    slug_groups: Dict[str, List[str]] = {}
+    hash_groups: Dict[str, List[str]] = {}
+
+    for _, art in _stable_order(articles):
+        # 1. 輸出路徑 (macOS / Windows 預設不分大小寫，A.md 與 a.md 是同一個檔案)
+        stem, ext = os.path.splitext(art.filename)
+        path = os.path.join(art.target_dir, art.filename)
+        key = _path_key(path, case_insensitive)
+        if key in paths:
+            holder = paths[key]
+            holder_path = os.path.join(holder.target_dir, holder.filename)
+            groups = path_groups if path in exact_paths else case_groups
+            groups.setdefault(holder_path, [_describe(holder)]).append(_describe(art))
+            n = 2
+            while _path_key(os.path.join(art.target_dir, f"{stem}-{n}{ext}"), case_insensitive) in paths:
+                n += 1
+            art.path_suffix = f"-{n}"
+            art.filename = f"{stem}-{n}{ext}"
+            key = _path_key(os.path.join(art.target_dir, art.filename), case_insensitive)
+        paths[key] = art
+        exact_paths.add(os.path.join(art.target_dir, art.filename))
+
+        # 2. Slug
+        base_slug = str(art.frontmatter.get("slug") or art.slug)
+        art.slug = base_slug
+        if base_slug:
+            if base_slug in slugs:
+                slug_groups.setdefault(base_slug, [_describe(slugs[base_slug])]).append(_describe(art))
+                n = 2
+                while f"{base_slug}-{n}" in slugs:
+                    n += 1
+                art.slug = f"{base_slug}-{n}"
+            slugs[art.slug] = art
+
+        # 3. 短網址 /p/<6 碼>
+        short_hash = compute_short_hash(art)
+        if short_hash in short_hashes:
+            hash_groups.setdefault(short_hash, [_describe(short_hashes[short_hash])]).append(_describe(art))
+            salt = 1
+            while compute_short_hash(art, salt) in short_hashes:
+                salt += 1
+            short_hash = compute_short_hash(art, salt)
+        art.short_hash = short_hash
+        short_hashes[short_hash] = art
+
+    report["path"] = sorted(path_groups.items())
+    report["path_case"] = sorted(case_groups.items())
+    report["slug"] = sorted(slug_groups.items())
+    report["short_hash"] = sorted(hash_groups.items())
+    return report
+
+def collision_count(report: CollisionReport) -> int:
+    return sum(len(groups) for groups in report.values())
+
+def format_collision_report(report: CollisionReport) -> str:
+    labels = {"path": "輸出路徑", "path_case": "輸出路徑 (只差大小寫)", "slug": "Slug", "short_hash": "短網址"}
+    lines = [f"⚠️ 發現 {collision_count(report)} 組衝突 (排序在前者保留原值，其餘加上後綴):"]
+    for kind, groups in report.items():
+        for value, members in groups:
+            lines.append(f"  [{labels[kind]}] {value}")
+            for member in members:
+                lines.append(f"    - {member}")
+    return "\n".join(lines)
+
+def check_collisions(articles: List[Article], policy: str = "warn", case_insensitive: bool = True) -> bool:
+    """解決衝突並印出報告；policy 為 "error" 且有衝突時回傳 False (呼叫端應中止發佈)"""
+    report = resolve_collisions(articles, case_insensitive)
+    if not collision_count(report):
+        return True
+    print(format_collision_report(report))
+    return policy != "error"
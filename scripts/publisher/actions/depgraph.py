@@ -0,0 +1,138 @@
+import os
+import json
+import hashlib
+from dataclasses import asdict
+from pathlib import Path
+from typing import List, Dict, Set, Optional
+from ..contracts.types import Article, PublisherConfig, DependencyGraph
+from .redirects import redirects_file_path
+from .dashboard import read_dashboard_hero
+from .generator import optimized_image_path
+from .related import RelatedIndex
+from .backlinks import BacklinkIndex
+from .wikilinks import WikilinkIndex
+
+GRAPH_VERSION = 4
+GRAPH_FILENAME = "depgraph.json"
+
+# 彙總頁名稱 -> 實際輸出位置
+AGGREGATE_OUTPUTS = ("index.md", "archive.md", "all-tags.md", "_redirects")
+
+def _digest(payload) -> str:
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def _link_fields(art: Article):
+    """其他頁面引用一篇文章時會用到的欄位 (標題、日期與 ArticleRoute 的連結路徑)"""
+    return [art.title, str(art.date), art.route.path]
+
+def aggregate_output_path(config: PublisherConfig, name: str) -> str:
+    if name == "_redirects":
+        return redirects_file_path()
+    return os.path.join(config.quartz_content_dir, name)
+
+def build_dependency_graph(results_by_file: Dict[Path, List[Article]], articles: List[Article],
+                           related: RelatedIndex, config: PublisherConfig,
+                           transcluder=None, backlinks: BacklinkIndex = None,
+                           wikilinks: WikilinkIndex = None) -> DependencyGraph:
+    """
+    記錄每個輸出檔是由哪些來源檔、相關文章與彙總輸入產生的。
+    文章頁的「相關文章」以選出的文章 (連結欄位) 做摘要，標籤或分類底下的文章變動但名次不變時不會重新產生；
+    「被引用於」同樣以連到它的文章做摘要，只有清單真的改變的文章會重新產生；
+    連結改寫成完整路徑時，以模式與每個連結解析到的路徑做摘要 (被連結的文章搬家時重新產生)；
+    功能關閉時這些輸入的摘要是空清單，關閉後有用到的文章也會重新產生；
+    展開的 Block 引用 / embed 以被引用的 Block 或頁面為單位做摘要。
+    """
+    graph = DependencyGraph()
+    published = {id(a) for a in articles}
+
+    for source, found_articles in results_by_file.items():
+        for art in found_articles:
+            if id(art) not in published:
+                continue
+            rel_path = art.route.output_path
+            article_key = f"article:{rel_path}"
+            graph.signatures[article_key] = _digest(asdict(art))
+            related_key = f"related:{rel_path}"
+            graph.signatures[related_key] = _digest([_link_fields(a) for a in related.related(art)])
+            backlinks_key = f"backlinks:{rel_path}"
+            linking = backlinks.backlinks(art) if backlinks is not None else []
+            graph.signatures[backlinks_key] = _digest([_link_fields(a) for a in linking])
+            wikilinks_key = f"wikilinks:{rel_path}"
+            # 相關文章 / 被引用於的連結寫法也跟著模式改變，所以摘要包含模式本身
+            graph.signatures[wikilinks_key] = _digest(["absolute", wikilinks.resolved_links(art)] if wikilinks is not None else [])
+            inputs = [article_key, related_key, backlinks_key, wikilinks_key]
+            # 封面圖改用 _optimized.jpg 與否取決於檔案是否存在
+            optimized = optimized_image_path(art, config.logseq_dir)
+            if optimized is not None:
+                asset_key = f"asset:{optimized}"
+                graph.signatures[asset_key] = _digest(os.path.exists(optimized))
+                inputs.append(asset_key)
+            if transcluder is not None:
+                for dep in transcluder.dependencies(art.body):
+                    if dep not in graph.signatures:
+                        graph.signatures[dep] = transcluder.signature(dep)
+                    inputs.append(dep)
+            graph.outputs[rel_path] = {
+                "sources": [str(source)],
+                "inputs": inputs,
+            }
+
+    # 首頁: 最新 10 篇 + Logseq 首頁 Hero 原文
+    # (只摘要 Hero: 首頁的最新發佈清單是 generate_dashboard 自己寫回的，不能讓輸出反過來弄髒輸入)
+    hero = read_dashboard_hero(config)
+    recent = sorted(articles, key=lambda a: str(a.date), reverse=True)[:10]
+    graph.signatures["agg:index"] = _digest({"recent": [_link_fields(a) for a in recent], "hero": hero})
+    # 歸檔 / 標籤頁的連結寫法跟著 wikilink_resolution 改變
+    full_paths = wikilinks is not None
+    graph.signatures["agg:archive"] = _digest([full_paths, [_link_fields(a) for a in articles]])
+    graph.signatures["agg:all-tags"] = _digest([full_paths, [[a.tags] + _link_fields(a) for a in articles]])
+    graph.signatures["agg:redirects"] = _digest([
+        _link_fields(a) + [a.route.short_hash, a.slug, a.frontmatter.get("original_url", "")] for a in articles
+    ])
+
+    graph.outputs["index.md"] = {"sources": [], "inputs": ["agg:index"]}
+    graph.outputs["archive.md"] = {"sources": [], "inputs": ["agg:archive"]}
+    graph.outputs["all-tags.md"] = {"sources": [], "inputs": ["agg:all-tags"]}
+    graph.outputs["_redirects"] = {"sources": [], "inputs": ["agg:redirects"]}
+    return graph
+
+def find_dirty_outputs(graph: DependencyGraph, previous: Optional[DependencyGraph], config: PublisherConfig) -> Set[str]:
+    """與上次的圖比對，回傳需要重新產生的輸出檔 (新的、輸入摘要改變的、或檔案已不存在的)"""
+    dirty = set()
+    for output, node in graph.outputs.items():
+        if previous is None or output not in previous.outputs:
+            dirty.add(output)
+            continue
+        if any(graph.signatures.get(k) != previous.signatures.get(k) for k in node["inputs"]):
+            dirty.add(output)
+            continue
+        if output in AGGREGATE_OUTPUTS:
+            path = aggregate_output_path(config, output)
+        else:
+            path = os.path.join(config.quartz_content_dir, output)
+        if not os.path.exists(path):
+            dirty.add(output)
+    return dirty
+
+def load_dependency_graph(config: PublisherConfig, context: str) -> Optional[DependencyGraph]:
+    graph_path = os.path.join(config.cache_dir, GRAPH_FILENAME)
+    if not os.path.exists(graph_path):
+        return None
+    try:
+        with open(graph_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"  ⚠️ 相依圖讀取失敗，改為全部重新產生: {e}")
+        return None
+    if data.get("version") != GRAPH_VERSION or data.get("context") != context:
+        return None
+    return DependencyGraph(outputs=data.get("outputs", {}), signatures=data.get("signatures", {}))
+
+def save_dependency_graph(config: PublisherConfig, graph: DependencyGraph, context: str):
+    os.makedirs(config.cache_dir, exist_ok=True)
+    graph_path = os.path.join(config.cache_dir, GRAPH_FILENAME)
+    tmp_path = graph_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": GRAPH_VERSION, "context": context, **asdict(graph)}, f, ensure_ascii=False)
+    os.replace(tmp_path, graph_path)
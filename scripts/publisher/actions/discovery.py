@@ -0,0 +1,49 @@
+import os
+from pathlib import Path
+from typing import Dict
+from ..contracts.types import PublisherConfig
+
+def _is_ignored_name(name: str, config: PublisherConfig) -> bool:
+    if len(name) > config.max_filename_length:
+        return True
+    return any(name.startswith(prefix) for prefix in config.ignored_name_prefixes)
+
+def _walk_markdown(directory: Path, config: PublisherConfig, ignored_dirs: set, found: Dict[Path, os.stat_result]):
+    """
+    單次 scandir 同時取得檔案與子目錄，被忽略的目錄在進入前就剪掉。
+    順序與 Path.rglob 相同: 先列出本層檔案，再依序深入子目錄。
+    """
+    subdirs = []
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except PermissionError:
+        return
+
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in ignored_dirs:
+                    subdirs.append(entry.name)
+                continue
+            if not entry.name.endswith(".md") or _is_ignored_name(entry.name, config):
+                continue
+            found[directory / entry.name] = entry.stat()
+        except OSError:
+            continue
+
+    for name in subdirs:
+        _walk_markdown(directory / name, config, ignored_dirs, found)
+
+def discover_source_files(config: PublisherConfig) -> Dict[Path, os.stat_result]:
+    """
+    掃描 journals 與 pages，回傳 來源檔 -> stat 結果 (保持掃描順序)。
+    stat 直接給增量快取使用，不需要再對每個檔案做第二次 stat。
+    """
+    ignored_dirs = set(config.ignored_dirs)
+    found: Dict[Path, os.stat_result] = {}
+    for sub in config.source_subdirs:
+        d = Path(config.logseq_dir) / sub
+        if d.is_dir():
+            _walk_markdown(d, config, ignored_dirs, found)
+    return found
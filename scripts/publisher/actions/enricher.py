@@ -1,39 +1,25 @@
 import re
-import os
 from datetime import datetime
 from typing import Dict
 from ..contracts.types import Article
 from .utils import clean_tags
+from .tags import TagRules
+from .outline import article_refs
 
-def load_uuid_tags_map(logseq_dir: str) -> Dict[str, str]:
-    """Load TagsBlock.md for UUID resolution"""
-    uuid_tags_map = {}
-    tags_block_path = os.path.join(logseq_dir, "pages", "TagsBlock.md")
-    if os.path.exists(tags_block_path):
-        try:
-            with open(tags_block_path, 'r', encoding='utf-8') as f:
-                lines_tb = f.readlines()
-                current_tag = None
-                for line in lines_tb:
-                    tag_match = re.match(r'^\s*-\s*\+\+(.+)$', line)
-                    if tag_match:
-                        current_tag = tag_match.group(1).strip().lstrip('/')
-                        continue
-                    id_match = re.match(r'^\s*id::\s*([a-zA-Z0-9-]+)', line)
-                    if id_match and current_tag:
-                        uuid = id_match.group(1).strip()
-                        uuid_tags_map[uuid] = current_tag
-        except Exception: pass
-    return uuid_tags_map
+JOURNAL_FILE_PATTERN = re.compile(r'^(\d{4})_(\d{2})_(\d{2})\.md$')
 
-def enrich_article_metadata(article: Article, uuid_tags_map: Dict[str, str]):
+def infers_date_from_clock(article: Article) -> bool:
+    """文章沒有 date 且不是 Journal 檔名時，enrich 會用今天日期補上 (結果隨執行日期改變)"""
+    return "date" not in article.frontmatter and not JOURNAL_FILE_PATTERN.match(article.source_file)
+
+def enrich_article_metadata(article: Article, uuid_tags_map: Dict[str, str], tag_rules: TagRules = None):
     """Enrich article frontmatter with inferred Date, consolidated Tags, and Slug"""
     fm = article.frontmatter
     
     # 1. Date Inference
     if "date" not in fm:
         source_file = article.source_file
-        date_match = re.match(r'^(\d{4})_(\d{2})_(\d{2})\.md$', source_file)
+        date_match = JOURNAL_FILE_PATTERN.match(source_file)
         if date_match:
              fm["date"] = f"{date_match.group(1)}-{date_match.group(2)}-{date_match.group(3)}"
         else:
@@ -42,18 +28,18 @@ def enrich_article_metadata(article: Article, uuid_tags_map: Dict[str, str]):
     # [Fix] Enforce YYYY-MM-DD format to match legacy behavior and consistency
     article.date = str(date)[:10]
 
-    # 2. Extract Inline Tags from Body
+    # 2. Inline Tags (解析時已從 Block 樹取出)
     inline_tags_found = []
     if article.body:
-        matches = re.findall(r'\+\+/([a-zA-Z0-9_\u4e00-\u9fa5-]+)', article.body)
+        refs = article_refs(article)
+        matches = refs["inline_tags"]
         
         ignored_tags = {"tag1", "my_new_tag", "tag", "logseq"} 
         if matches: 
             valid_matches = [t for t in matches if t.lower() not in ignored_tags]
             inline_tags_found.extend(valid_matches)
         
-        uuid_matches = re.findall(r'\(\(([a-zA-Z0-9-]+)\)\)', article.body)
-        for uuid in uuid_matches:
+        for uuid in refs["block_refs"]:
             if uuid in uuid_tags_map:
                 inline_tags_found.append(uuid_tags_map[uuid])
 
@@ -90,7 +76,7 @@ def enrich_article_metadata(article: Article, uuid_tags_map: Dict[str, str]):
     final_tags = [t for t in final_tags if t.lower() not in {"tag1", "my_new_tag"}]
     
     try:
-        final_tags = clean_tags(final_tags)
+        final_tags = clean_tags(final_tags, tag_rules)
     except Exception as e:
         print(f"⚠️ Clean Tags Error: {e}")
         final_tags = list(set(final_tags)) 
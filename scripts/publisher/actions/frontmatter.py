@@ -0,0 +1,67 @@
+import re
+import copy
+import hashlib
+from typing import Any, Dict, Optional, Tuple
+
+# Logseq 的 key:: value 轉成 YAML 的 key: value
+_LOGSEQ_PROPERTY_RE = re.compile(r'^(\w+)::(.*)$', re.MULTILINE)
+# 只看行首的 draft 鍵 (draft: / draft::)，值到行尾或 # 註解為止
+_DRAFT_RE = re.compile(r'^draft(?:::|[ \t]*:)(?=[ \t]|$)[ \t]*([^#\n]*)', re.MULTILINE)
+# 除了不分大小寫的 "true"，PyYAML 只把這幾種寫法解析成 True
+_YAML_TRUE = {"yes", "Yes", "YES", "on", "On", "ON"}
+
+_FRONTMATTER_CACHE_LIMIT = 4096
+_frontmatter_cache: Dict[str, Any] = {}
+_loader = None
+
+def yaml_loader():
+    """延遲載入 PyYAML，有 libyaml 時用 C 版的 CSafeLoader，否則退回純 Python 的 SafeLoader"""
+    global _loader
+    if _loader is None:
+        import yaml
+        _loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return _loader
+
+def split_frontmatter(raw: bytes) -> Optional[Tuple[bytes, int]]:
+    """
+    回傳 (--- 之間的前言, 本文起點)，找不到結尾的 --- 時回傳 None。
+    與原本在解碼後字串上 find("---", 3) 的結果相同 (--- 是 ASCII，UTF-8 下位置一致)。
+    """
+    end_marker = raw.find(b"---", 3)
+    if end_marker == -1:
+        return None
+    return raw[3:end_marker], end_marker + 3
+
+def is_draft_header(header: str) -> bool:
+    """
+    不經過 YAML，只看 draft 鍵判斷是否為草稿。
+    只有唯一一個 draft 且值明確為真時才回傳 True，其餘交給 YAML 判斷。
+    """
+    values = _DRAFT_RE.findall(header)
+    if len(values) != 1:
+        return False
+    value = values[0].strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+        # 引號字串: 原本的邏輯是 lower() == "true"
+        return value[1:-1].lower() == "true"
+    return value.lower() == "true" or value in _YAML_TRUE
+
+def load_frontmatter(header: str) -> Any:
+    """
+    解析前言 YAML，結果以內容 Hash 快取 (Watch 模式下只改本文時不必重新解析)。
+    回傳副本，呼叫端可以直接修改。
+    """
+    key = hashlib.sha1(header.encode("utf-8")).hexdigest()
+    if key in _frontmatter_cache:
+        cached = _frontmatter_cache[key]
+    else:
+        # 與 yaml.load 相同 (建立 Loader、取單一文件、釋放)，但只經過 yaml_loader()
+        loader = yaml_loader()(_LOGSEQ_PROPERTY_RE.sub(r'\1:\2', header))
+        try:
+            cached = loader.get_single_data()
+        finally:
+            loader.dispose()
+        if len(_frontmatter_cache) >= _FRONTMATTER_CACHE_LIMIT:
+            _frontmatter_cache.clear()
+        _frontmatter_cache[key] = cached
+    return copy.deepcopy(cached)
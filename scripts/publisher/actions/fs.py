@@ -1,14 +1,28 @@
 import os
 import shutil
 from pathlib import Path
-from typing import List, Set
+from typing import List, Dict, Set, Tuple
 from ..contracts.types import Article, PublisherConfig
-from ..actions.generator import generate_quartz_frontmatter, generate_related_articles, process_body_content
+from ..actions.related import RelatedIndex
+from ..actions.backlinks import BacklinkIndex
+from ..actions.wikilinks import WikilinkIndex
+from ..actions.generator import generate_quartz_frontmatter, generate_related_articles, generate_backlinks, process_body_content
 
 def prepare_output_directories(config: PublisherConfig):
     os.makedirs(config.quartz_content_dir, exist_ok=True)
 
-def write_article(article: Article, config: PublisherConfig, tag_index: dict) -> bool:
+def render_article(article: Article, config: PublisherConfig, related: RelatedIndex, transcluder=None,
+                   backlinks: BacklinkIndex = None, wikilinks: WikilinkIndex = None) -> str:
+    """產生文章的最終 Markdown 內容 (不碰磁碟)"""
+    fm_str = generate_quartz_frontmatter(article, config.logseq_dir)
+    related_str = generate_related_articles(article, related, wikilinks)
+    backlinks_str = generate_backlinks(article, backlinks, wikilinks)
+    body_str = process_body_content(article.body, transcluder, wikilinks)
+    
+    return f"{fm_str}\n\n{body_str}{related_str}{backlinks_str}"
+
+def write_article(article: Article, config: PublisherConfig, related: RelatedIndex, transcluder=None,
+                  backlinks: BacklinkIndex = None, wikilinks: WikilinkIndex = None) -> bool:
     """
     Writes the article to the target file. Returns True if updated, False if skipped.
     """
@@ -21,29 +35,70 @@ def write_article(article: Article, config: PublisherConfig, tag_index: dict) ->
     target_path = os.path.join(target_dir, article.filename)
     
     # Generate content
-    fm_str = generate_quartz_frontmatter(article, config.logseq_dir)
-    related_str = generate_related_articles(article, tag_index)
-    body_str = process_body_content(article.body)
+    final_content = render_article(article, config, related, transcluder, backlinks, wikilinks)
     
-    final_content = f"{fm_str}\n\n{body_str}{related_str}"
-    
-    # Smart Write Check
+    return sync_file(target_path, final_content)
+
+def sync_file(target_path: str, content: str) -> bool:
+    """
+    Smart Write: 內容相同就不寫。Returns True if written, False if unchanged.
+    """
     if os.path.exists(target_path):
         with open(target_path, "r", encoding="utf-8") as f:
             existing_content = f.read()
-        if existing_content == final_content:
+        if existing_content == content:
             return False
             
     with open(target_path, "w", encoding="utf-8") as f:
-        f.write(final_content)
+        f.write(content)
     
     return True
 
-def clean_output_directory(config: PublisherConfig, expected_files: Set[str]):
+def write_articles(articles: List[Article], config: PublisherConfig, related: RelatedIndex, workers: int = None,
+                   transcluder=None, backlinks: BacklinkIndex = None,
+                   wikilinks: WikilinkIndex = None) -> Tuple[int, int]:
     """
-    Removes files in quartz/content that are not in expected_files.
+    批次寫入文章，回傳 (更新數, 跳過數)。
+    渲染在主執行緒進行 (純 CPU)，存在檢查 / 比對 / 寫入交給有上限的 Thread Pool，
+    在網路磁碟或慢速磁碟上可以同時等待多個 I/O。
     """
-    print("🧹 執行同步清理 (移除已刪除或更名的文章)...")
+    workers = config.write_workers if workers is None else workers
+    if workers <= 1:
+        updated = sum(1 for art in articles if write_article(art, config, related, transcluder, backlinks, wikilinks))
+        return updated, len(articles) - updated
+
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    # 限制尚未寫出的內容數量，避免渲染速度遠快於 I/O 時把整站內容堆在記憶體
+    in_flight = threading.BoundedSemaphore(workers * 4)
+    created_dirs = set()
+    futures = []
+    skipped = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for art in articles:
+            if not art.filename:
+                skipped += 1
+                continue
+            target_dir = os.path.join(config.quartz_content_dir, art.target_dir)
+            if target_dir not in created_dirs:
+                os.makedirs(target_dir, exist_ok=True)
+                created_dirs.add(target_dir)
+            
+            final_content = render_article(art, config, related, transcluder, backlinks, wikilinks)
+            in_flight.acquire()
+            future = pool.submit(sync_file, os.path.join(target_dir, art.filename), final_content)
+            future.add_done_callback(lambda _: in_flight.release())
+            futures.append(future)
+
+    updated = sum(1 for future in futures if future.result())
+    return updated, skipped + len(futures) - updated
+
+def find_stale_output_files(config: PublisherConfig, expected_files: Set[str]) -> List[str]:
+    """
+    找出 quartz/content 中不在 expected_files 裡的 .md 檔 (相對路徑)。
+    """
+    stale = []
     if os.path.exists(config.quartz_content_dir):
         for root, dirs, files in os.walk(config.quartz_content_dir):
             for file in files:
@@ -58,8 +113,18 @@ def clean_output_directory(config: PublisherConfig, expected_files: Set[str]):
                 
                 if file.endswith(".md"):
                     if rel_path not in expected_files:
-                        print(f"  🗑️  刪除過期檔案: {rel_path}")
-                        os.remove(abs_path)
+                        stale.append(rel_path)
+    return stale
+
+def clean_output_directory(config: PublisherConfig, expected_files: Set[str]):
+    """
+    Removes files in quartz/content that are not in expected_files.
+    """
+    print("🧹 執行同步清理 (移除已刪除或更名的文章)...")
+    if os.path.exists(config.quartz_content_dir):
+        for rel_path in find_stale_output_files(config, expected_files):
+            print(f"  🗑️  刪除過期檔案: {rel_path}")
+            os.remove(os.path.join(config.quartz_content_dir, rel_path))
                         
         # Clean empty dirs
         for root, dirs, files in os.walk(config.quartz_content_dir, topdown=False):
@@ -70,6 +135,35 @@ def clean_output_directory(config: PublisherConfig, expected_files: Set[str]):
                     print(f"  🗑️  移除空資料夾: {os.path.relpath(path, config.quartz_content_dir)}")
                     os.rmdir(path)
 
+def remove_output_files(config: PublisherConfig, rel_paths: Set[str]):
+    """
+    只刪除指定的輸出檔 (增量模式用，不需走訪整個 quartz/content)。
+    """
+    for rel_path in sorted(rel_paths):
+        abs_path = os.path.join(config.quartz_content_dir, rel_path)
+        if os.path.exists(abs_path):
+            print(f"  🗑️  刪除過期檔案: {rel_path}")
+            os.remove(abs_path)
+            parent = os.path.dirname(abs_path)
+            if os.path.abspath(parent) != os.path.abspath(config.quartz_content_dir) and not os.listdir(parent):
+                print(f"  🗑️  移除空資料夾: {os.path.relpath(parent, config.quartz_content_dir)}")
+                os.rmdir(parent)
+
+def _is_oversized_asset(config: PublisherConfig, filepath: str) -> bool:
+    return os.path.getsize(filepath) / (1024 * 1024) > config.max_asset_size_mb
+
+def list_publishable_assets(config: PublisherConfig) -> Dict[str, int]:
+    """copy_assets 會複製的檔案: 相對路徑 -> 大小 (排除過大的檔案)"""
+    assets_src = os.path.join(config.logseq_dir, "assets")
+    assets = {}
+    if os.path.isdir(assets_src):
+        for root, dirs, files in os.walk(assets_src):
+            for f in files:
+                filepath = os.path.join(root, f)
+                if os.path.isfile(filepath) and not _is_oversized_asset(config, filepath):
+                    assets[os.path.relpath(filepath, assets_src)] = os.path.getsize(filepath)
+    return assets
+
 def copy_assets(config: PublisherConfig):
     assets_src = os.path.join(config.logseq_dir, "assets")
     assets_dest = os.path.join(config.quartz_content_dir, "assets")
@@ -1,10 +1,21 @@
 import re
 import os
-import hashlib
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 from ..contracts.types import Article
-from .utils import get_safe_path_elements, sanitize_content_links
+from .utils import sanitize_content_links
+from .outline import article_refs
+
+def optimized_image_path(article: Article, logseq_dir: str) -> Optional[str]:
+    """沒有指定封面圖時，第一張內文圖片對應的 _optimized.jpg 位置 (不論是否存在)"""
+    fm = article.frontmatter
+    if fm.get("socialImage") or fm.get("image") or fm.get("featured_image"):
+        return None
+    images = article_refs(article)["images"]
+    if not images:
+        return None
+    name_part, _ = os.path.splitext(os.path.basename(images[0]))
+    return os.path.join(logseq_dir, "assets", f"{name_part}_optimized.jpg")
 
 def generate_quartz_frontmatter(article: Article, logseq_dir: str) -> str:
     fm = article.frontmatter
@@ -23,17 +34,14 @@ def generate_quartz_frontmatter(article: Article, logseq_dir: str) -> str:
     # Image
     image = fm.get("socialImage") or fm.get("image") or fm.get("featured_image")
     if not image:
-        img_match = re.search(r'!\[.*?\]\((.*?)\)', article.body)
-        if img_match:
-            image = img_match.group(1)
+        images = article_refs(article)["images"]
+        if images:
+            image = images[0]
             if image.startswith("../assets/"):
                 image = image.replace("../assets/", "/assets/")
-            asset_filename = os.path.basename(image)
-            name_part, ext_part = os.path.splitext(asset_filename)
-            optimized_filename = f"{name_part}_optimized.jpg"
-            optimized_path = os.path.join(logseq_dir, "assets", optimized_filename)
+            optimized_path = optimized_image_path(article, logseq_dir)
             if os.path.exists(optimized_path):
-                image = f"/assets/{optimized_filename}"
+                image = f"/assets/{os.path.basename(optimized_path)}"
     
     if image:
         lines.append(f'image: "{image}"')
@@ -52,9 +60,8 @@ def generate_quartz_frontmatter(article: Article, logseq_dir: str) -> str:
     if article.slug:
          lines.append(f'slug: {article.slug}')
     
-    # Short URL
-    short_hash = hashlib.md5(f"{title}{date}".encode()).hexdigest()[:6]
-    short_url = f"/p/{short_hash}"
+    # Short URL (resolve_collisions 已排除衝突)
+    short_url = f"/p/{article.route.short_hash}"
     lines.append(f'short_url: "{short_url}"')
     
     if "original_url" in fm:
@@ -64,68 +71,39 @@ def generate_quartz_frontmatter(article: Article, logseq_dir: str) -> str:
     lines.append("---")
     return "\n".join(lines)
 
-def generate_related_articles(article: Article, tag_index: Dict[str, List[Article]], category_index: Dict[str, List[Article]] = None, max_related=5) -> str:
-    current_tags = set(article.tags)
-    candidates = {}
-    
-    # 1. Tag Matching (High Score)
-    if current_tags:
-        for tag in current_tags:
-            for related_art in tag_index.get(tag, []):
-                if related_art.title == article.title:
-                    continue
-                
-                title = related_art.title
-                if title not in candidates:
-                    candidates[title] = {
-                        "score": 0,
-                        "art": related_art
-                    }
-                candidates[title]["score"] += 3  # Tag Match = 3 points
-
-    # 2. Category Matching (Low Score)
-    if category_index and article.categories:
-        # Support comma separated categories
-        cats = [c.strip() for c in str(article.categories).split(',')]
-        for cat in cats:
-            for related_art in category_index.get(cat, []):
-                 if related_art.title == article.title:
-                    continue
-                 
-                 title = related_art.title
-                 if title not in candidates:
-                    candidates[title] = {
-                        "score": 0,
-                        "art": related_art
-                    }
-                 candidates[title]["score"] += 1 # Category Match = 1 point
+def article_link(art: Article, wikilinks=None) -> str:
+    """連到另一篇文章的 [[輸出檔名|標題]] (有 wikilinks 時用完整路徑)"""
+    link_path = art.route.path if wikilinks is not None else art.route.stem
+    return f"[[{link_path}|{art.title}]]"
 
-    if not candidates:
+def generate_related_articles(article: Article, related, wikilinks=None) -> str:
+    """related: RelatedIndex (標籤 + 分類計分，已預先排好前 k 名)"""
+    selected = related.related(article)
+    if not selected:
         return ""
-        
-    sorted_candidates = sorted(
-        candidates.values(), 
-        key=lambda x: (x["score"], str(x["art"].date)), 
-        reverse=True
-    )
-    
-    selected = [x["art"] for x in sorted_candidates[:max_related]]
 
     lines = ["\n\n---\n## 📚 相關文章\n"]
     for art in selected:
-        safe_cat, safe_title = get_safe_path_elements(art.title, art.categories)
-        
-        if "關於我" in art.title and "About" in art.title:
-            link_path = "about"
-        else:
-            link_path = safe_title
-        
-        lines.append(f"- [[{link_path}|{art.title}]]")
+        lines.append(f"- {article_link(art, wikilinks)}")
     
     return "\n".join(lines)
 
-def process_body_content(body: str) -> str:
-    """清理和處理 Body 內容"""
+def generate_backlinks(article: Article, backlinks, wikilinks=None) -> str:
+    """backlinks: BacklinkIndex (None = 不產生「被引用於」區塊)"""
+    sources = backlinks.backlinks(article) if backlinks is not None else []
+    if not sources:
+        return ""
+
+    lines = ["\n\n---\n## 🔗 被引用於\n"]
+    for art in sources:
+        lines.append(f"- {article_link(art, wikilinks)}")
+
+    return "\n".join(lines)
+
+def process_body_content(body: str, transcluder=None, wikilinks=None) -> str:
+    """清理和處理 Body 內容 (有 transcluder 時先展開 Block 引用與 embed，有 wikilinks 時把連結改寫成完整路徑)"""
+    if transcluder is not None:
+        body = transcluder.expand(body)
     
     # 處理分隔線及其後的縮排內容
     def fix_separator_section(text):
@@ -166,5 +144,7 @@ def process_body_content(body: str) -> str:
     
     # 確保 Legacy Mode 或其它來源的 body 也有做連結清理
     body = sanitize_content_links(body, for_quartz=True)
+    if wikilinks is not None:
+        body = wikilinks.rewrite(body)
     
     return body
@@ -0,0 +1,171 @@
+import heapq
+from itertools import chain
+from typing import Dict, List, Set, Tuple
+from ..contracts.types import Article
+from .outline import article_refs
+from .optional import optional_module
+from .wikilinks import link_name, build_link_targets
+
+# 連結分數 = 共被引 (兩篇同時被第三篇連到的次數) + 書目耦合 (兩篇都連到同一篇的次數)
+#          + PAGERANK_WEIGHT x 以該文為起點的 Personalized PageRank (連結視為雙向)
+# PageRank 每一步有 PAGERANK_ALPHA 的機率回到起點，只走 PAGERANK_STEPS 步 (截斷的冪次迭代)；
+# 出入度 5 的文章直接連到的文章約得 1.3 分 (比只有一次共被引高)
+PAGERANK_ALPHA = 0.15
+PAGERANK_STEPS = 4
+PAGERANK_WEIGHT = 50.0
+# 每一步捨棄機率低於此值的文章，走訪範圍保持稀疏 (Hub 的鄰居機率都很低，不會整片擴散)
+PAGERANK_EPSILON = 1e-3
+# 連出 / 被連超過這個數量的 Hub (目錄頁之類) 不計入共被引 / 書目耦合，否則它連到的文章兩兩都相關
+LINK_MAX_FANOUT = 200
+# 每篇只保留分數最高的幾篇 (至少 RelatedIndex 需要的名次)
+MAX_LINK_NEIGHBORS = 50
+# 一次以稀疏矩陣處理的起點數 (限制暫存矩陣大小；需小於 2^15，列號以 int16 排序)
+PAGERANK_BATCH = 1024
+
+# 分數取到 2^-32 的倍數，NumPy 與純 Python 的浮點誤差不影響同分時的排序
+# (PageRank 的機率常是剛好落在十進位四捨五入邊界上的有限小數，所以不用 round(x, 12))
+_GRID = float(1 << 32)
+
+def _round(score: float) -> float:
+    return round(score * _GRID) / _GRID
+
+def _top(scores: Dict[int, float], limit: int) -> List[Tuple[int, float]]:
+    rounded = ((j, _round(s)) for j, s in scores.items())
+    return heapq.nsmallest(limit, (js for js in rounded if js[1] > 0), key=lambda js: (-js[1], js[0]))
+
+def _link_scores_python(out_links: List[Set[int]], limit: int) -> List[List[Tuple[int, float]]]:
+    n = len(out_links)
+    in_links: List[List[int]] = [[] for _ in range(n)]
+    for i, targets in enumerate(out_links):
+        for j in sorted(targets):
+            in_links[j].append(i)
+    undirected = [sorted(out_links[i].union(in_links[i])) for i in range(n)]
+    # 每一步: 機率平均分給相鄰文章，其中 (1 - alpha) 繼續走
+    share_of = [(1 - PAGERANK_ALPHA) / len(nb) if nb else 0.0 for nb in undirected]
+
+    rows = []
+    for i in range(n):
+        scores: Dict[int, float] = {}
+        # 共被引: 連到 i 的文章也連到哪些文章
+        for s in in_links[i]:
+            if len(out_links[s]) <= LINK_MAX_FANOUT:
+                for j in out_links[s]:
+                    scores[j] = scores.get(j, 0) + 1
+        # 書目耦合: i 連到的文章還被哪些文章連到
+        for t in out_links[i]:
+            if len(in_links[t]) <= LINK_MAX_FANOUT:
+                for j in in_links[t]:
+                    scores[j] = scores.get(j, 0) + 1
+
+        walk = {i: 1.0}
+        rank: Dict[int, float] = {}
+        for _ in range(PAGERANK_STEPS):
+            step: Dict[int, float] = {}
+            for u, p in walk.items():
+                share = p * share_of[u]
+                for v in undirected[u]:
+                    step[v] = step.get(v, 0.0) + share
+            walk = {v: p for v, p in step.items() if p >= PAGERANK_EPSILON}
+            for v, p in walk.items():
+                rank[v] = rank.get(v, 0.0) + p
+        # 每一步停下 (回到起點) 的機率是 alpha
+        for v, p in rank.items():
+            scores[v] = scores.get(v, 0) + PAGERANK_ALPHA * PAGERANK_WEIGHT * p
+
+        scores.pop(i, None)
+        rows.append(_top(scores, limit))
+    return rows
+
+def _link_scores_sparse(out_links: List[Set[int]], limit: int, np, sparse) -> List[List[Tuple[int, float]]]:
+    """與 _link_scores_python 相同的計算：鄰接矩陣以 SciPy CSR 儲存，每批起點一次做稀疏矩陣乘法 (冪次迭代)"""
+    n = len(out_links)
+    out_degree = np.array([len(t) for t in out_links], dtype=np.int64)
+    rows = np.repeat(np.arange(n), out_degree)
+    cols = np.fromiter(chain.from_iterable(sorted(t) for t in out_links), dtype=np.int64, count=len(rows))
+    adjacency = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+    in_degree = np.bincount(cols, minlength=n)
+
+    # 共被引 = Aᵀ A、書目耦合 = A Aᵀ (Hub 的列 / 行先清成 0)
+    cited = sparse.diags((out_degree <= LINK_MAX_FANOUT).astype(np.float64)) @ adjacency
+    citing = adjacency @ sparse.diags((in_degree <= LINK_MAX_FANOUT).astype(np.float64))
+    cited, citing = cited.tocsr(), citing.tocsr()
+    cited_t, citing_t = cited.T.tocsr(), citing.T.tocsr()
+
+    # 雙向連結的轉移矩陣 (每列除以出入度，並乘上繼續走的機率 1 - alpha)
+    undirected = ((adjacency + adjacency.T) > 0).astype(np.float64).tocsr()
+    degree = np.diff(undirected.indptr)
+    share_of = np.zeros(n)
+    share_of[degree > 0] = (1 - PAGERANK_ALPHA) / degree[degree > 0]
+    transition = (sparse.diags(share_of) @ undirected).tocsr()
+
+    result = []
+    for start in range(0, n, PAGERANK_BATCH):
+        seeds = np.arange(start, min(n, start + PAGERANK_BATCH))
+        size = len(seeds)
+        counts = cited_t[seeds] @ cited + citing[seeds] @ citing_t
+
+        walk = sparse.csr_matrix((np.ones(size), (np.arange(size), seeds)), shape=(size, n))
+        rank = sparse.csr_matrix((size, n))
+        for _ in range(PAGERANK_STEPS):
+            walk = (walk @ transition).tocsr()
+            walk.data[walk.data < PAGERANK_EPSILON] = 0
+            walk.eliminate_zeros()
+            rank = rank + walk
+
+        scores = (counts + rank * (PAGERANK_ALPHA * PAGERANK_WEIGHT)).tocsr()
+        scores.sort_indices()
+        row = np.repeat(np.arange(size), np.diff(scores.indptr))
+        col = scores.indices.astype(np.int64)
+        data = np.rint(scores.data * _GRID) / _GRID
+        keep = (col != seeds[row]) & (data > 0)
+        row, col, data = row[keep], col[keep], data[keep]
+        # 超過 limit 個的列才需要依 (分數高到低, 索引) 排序取前 limit 個：
+        # 同一列內已依索引排好，先依分數、再依列 (int16 可用 Radix Sort) 做穩定排序
+        lengths = np.bincount(row, minlength=size)
+        crowded = lengths[row] > limit
+        if crowded.any():
+            sub = np.flatnonzero(crowded)
+            sub = sub[np.argsort(-data[sub], kind="stable")]
+            order = sub[np.argsort(row[sub].astype(np.int16), kind="stable")]
+            position = np.arange(len(order)) - np.searchsorted(row[order], row[order])
+            keep = ~crowded
+            keep[order[position < limit]] = True
+            row, col, data = row[keep], col[keep], data[keep]
+        bounds = np.searchsorted(row, np.arange(size + 1)).tolist()
+        col, data = col.tolist(), data.tolist()
+        for r in range(size):
+            result.append(list(zip(col[bounds[r]:bounds[r + 1]], data[bounds[r]:bounds[r + 1]])))
+    return result
+
+class LinkGraph:
+    """
+    文章之間的 [[連結]] 圖：依標題 / 輸出檔名 / alias 解析連結，
+    以共被引、書目耦合與 Personalized PageRank 算出每篇文章的連結相關分數。
+    有 NumPy + SciPy 時所有文章以稀疏矩陣分批一次計算，否則用純 Python 的相同實作。
+    """
+    def __init__(self, articles: List[Article], keys: List[str], limit: int = MAX_LINK_NEIGHBORS):
+        targets = build_link_targets(articles, keys)
+        self.nodes = sorted(set(keys))
+        index = {key: i for i, key in enumerate(self.nodes)}
+        self.out_links: List[Set[int]] = [set() for _ in self.nodes]
+        for key, art in zip(keys, articles):
+            links = self.out_links[index[key]]
+            for text in article_refs(art)["links"]:
+                target = targets.get(link_name(text))
+                if target is not None and target != key:
+                    links.add(index[target])
+        self.edges = sum(len(links) for links in self.out_links)
+
+        limit = max(limit, MAX_LINK_NEIGHBORS)
+        np = optional_module("numpy")
+        sparse = optional_module("scipy.sparse") if np is not None else None
+        if not self.edges:
+            rows = [[] for _ in self.nodes]
+        elif sparse is not None:
+            rows = _link_scores_sparse(self.out_links, limit, np, sparse)
+        else:
+            rows = _link_scores_python(self.out_links, limit)
+        nodes = self.nodes
+        self.neighbors: Dict[str, Dict[str, float]] = {
+            nodes[i]: {nodes[j]: score for j, score in row} for i, row in enumerate(rows)
+        }
@@ -0,0 +1,108 @@
+import re
+from typing import List, Dict, Tuple, Optional, Iterable
+from ..contracts.types import PublisherConfig
+
+INLINE_CODE_RE = re.compile(r'(`+).*?\1')
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    把所有標記依共同前綴合併成一棵 Trie，再轉成單一 Regex
+    (例如 ++/publish 與 ++/publish/notes 共用 "++/publish" 的比對)。
+    有更長的標記可以接續時優先比對較長者。
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        alternatives = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alternatives:
+            return ""
+        is_end = "" in node
+        if len(alternatives) == 1 and not is_end:
+            return alternatives[0]
+        group = "(?:" + "|".join(alternatives) + ")"
+        return group + "?" if is_end else group
+
+    return build(trie)
+
+def lines_containing(content: str, needle: str) -> List[int]:
+    """回傳包含 needle 的行號 (同一行只記一次)"""
+    found = []
+    line_no = 0
+    last = 0
+    pos = content.find(needle)
+    while pos != -1:
+        line_no += content.count('\n', last, pos)
+        found.append(line_no)
+        last = content.find('\n', pos)
+        if last == -1:
+            break
+        line_no += 1
+        last += 1
+        pos = content.find(needle, last)
+    return found
+
+class MarkerMatcher:
+    """
+    所有發佈 / 取消發佈標記編譯成同一個 Regex，候選行只需比對一次就能知道
+    符合哪個標記 (重疊時取較長者)。publish_uuid 優先於其他發佈標記，其餘依設定順序；
+    行內 Code 裡的標記不算。
+    """
+    def __init__(self, publish_uuid: str, publish_markers: Dict[str, str], unpublish_markers: Iterable[str]):
+        # (比對文字, 從標題移除的文字, 分區)
+        self.publish: List[Tuple[str, str, str]] = [(publish_uuid, f"(({publish_uuid}))", "")]
+        for marker, section in publish_markers.items():
+            if marker and marker != publish_uuid:
+                self.publish.append((marker, marker, section or ""))
+        self.unpublish = [m for m in unpublish_markers if m]
+        self._by_text = {text: (title_marker, section) for text, title_marker, section in reversed(self.publish)}
+        self._priority = {text: rank for rank, (text, _, _) in enumerate(self.publish)}
+        self._texts = [m for m, _, _ in self.publish] + self.unpublish
+        self.pattern = re.compile(_trie_pattern(self._texts))
+        self._encoded = [m.encode("utf-8") for m, _, _ in self.publish]
+
+    def may_match_bytes(self, raw: bytes) -> bool:
+        return any(marker in raw for marker in self._encoded)
+
+    def may_match(self, content: str) -> bool:
+        return any(marker in content for marker, _, _ in self.publish)
+
+    def lines_containing(self, content: str) -> List[int]:
+        """
+        回傳含有任一標記的行號 (已排序)。
+        整份內容用 str.find 逐一找各標記 (C 層的快速搜尋，標記數量很少時比 Regex 掃描快)，
+        編譯好的 Regex 只用在這些候選行上。
+        """
+        found = set()
+        for marker in self._texts:
+            found.update(lines_containing(content, marker))
+        return sorted(found)
+
+    def match_line(self, line: str) -> Optional[Tuple[str, str]]:
+        """
+        回傳 (要從標題移除的標記, 分區)；沒有發佈標記或含有取消發佈標記時回傳 None。
+        """
+        line_no_code = INLINE_CODE_RE.sub('', line) if "`" in line else line
+        found = {m.group() for m in self.pattern.finditer(line_no_code)}
+        if not found:
+            return None
+        if any(marker in found for marker in self.unpublish):
+            return None
+        candidates = [text for text in found if text in self._by_text and text in line]
+        if not candidates:
+            return None
+        return self._by_text[min(candidates, key=self._priority.__getitem__)]
+
+_matchers: Dict[tuple, MarkerMatcher] = {}
+
+def marker_matcher(config: PublisherConfig) -> MarkerMatcher:
+    """依設定取得 (並快取) 編譯好的 MarkerMatcher"""
+    key = (config.publish_uuid, tuple(config.publish_markers.items()), tuple(config.unpublish_markers))
+    matcher = _matchers.get(key)
+    if matcher is None:
+        matcher = _matchers[key] = MarkerMatcher(config.publish_uuid, config.publish_markers, config.unpublish_markers)
+    return matcher
@@ -0,0 +1,13 @@
+import importlib
+from typing import Any, Dict
+
+_modules: Dict[str, Any] = {}
+
+def optional_module(name: str):
+    """numpy / scipy.sparse 是選用套件：沒安裝時回傳 None，改走純 Python 的實作"""
+    if name not in _modules:
+        try:
+            _modules[name] = importlib.import_module(name)
+        except ImportError:
+            _modules[name] = None
+    return _modules[name]
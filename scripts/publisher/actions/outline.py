@@ -0,0 +1,67 @@
+import re
+from typing import List, Dict, Iterable, Iterator
+from ..contracts.types import Article, BlockNode
+
+INLINE_TAG_RE = re.compile(r'\+\+/([a-zA-Z0-9_\u4e00-\u9fa5-]+)')
+BLOCK_REF_RE = re.compile(r'\(\(([a-zA-Z0-9-]+)\)\)')
+IMAGE_RE = re.compile(r'!\[.*?\]\((.*?)\)')
+WIKILINK_RE = re.compile(r'\[\[(.*?)\]\]')
+
+class OutlineBuilder:
+    """依層級把 Block 掛成樹: 新 Block 成為前面最近一個層級較淺的 Block 的子節點"""
+    __slots__ = ("roots", "_stack")
+
+    def __init__(self):
+        self.roots: List[BlockNode] = []
+        self._stack: List[BlockNode] = []
+
+    def add(self, node: BlockNode) -> BlockNode:
+        stack = self._stack
+        while stack and stack[-1].level >= node.level:
+            stack.pop()
+        (stack[-1].children if stack else self.roots).append(node)
+        stack.append(node)
+        return node
+
+    def add_property(self, text: str):
+        """key:: value 屬性掛在它上方的 Block (還沒有 Block 時略過)"""
+        if not self._stack or "::" not in text:
+            return
+        key, value = text.split("::", 1)
+        self._stack[-1].properties[key.strip()] = value.strip()
+
+def iter_blocks(roots: List[BlockNode]) -> Iterator[BlockNode]:
+    """前序走訪，順序與原始大綱相同"""
+    stack = list(reversed(roots))
+    while stack:
+        node = stack.pop()
+        yield node
+        if node.children:
+            stack.extend(reversed(node.children))
+
+def render_outline(roots: List[BlockNode]) -> str:
+    return "\n".join(f"{'  ' * node.level}{node.marker}{node.content}" for node in iter_blocks(roots))
+
+def extract_refs(texts: Iterable[str]) -> Dict[str, List[str]]:
+    """
+    一次取出 inline tag (++/xxx)、Block 引用 ((uuid))、圖片與 [[連結]]。
+    這些語法都不會跨行，逐行取出與對整份 body 搜尋的結果與順序相同。
+    """
+    refs = {"inline_tags": [], "block_refs": [], "images": [], "links": []}
+    for text in texts:
+        if "++/" in text:
+            refs["inline_tags"].extend(INLINE_TAG_RE.findall(text))
+        if "((" in text:
+            refs["block_refs"].extend(BLOCK_REF_RE.findall(text))
+        if "![" in text:
+            refs["images"].extend(IMAGE_RE.findall(text))
+        if "[[" in text:
+            refs["links"].extend(WIKILINK_RE.findall(text))
+    return refs
+
+def collect_refs(roots: List[BlockNode]) -> Dict[str, List[str]]:
+    return extract_refs(node.content for node in iter_blocks(roots))
+
+def article_refs(article: Article) -> Dict[str, List[str]]:
+    """解析時已取出就直接使用；其他來源建立的 Article 才回頭掃描 body"""
+    return article.refs or extract_refs([article.body])
@@ -1,275 +1,370 @@
 import re
-import yaml
 from pathlib import Path
 from typing import List, Optional
-from ..contracts.types import Article, PublisherConfig
+from ..contracts.types import Article, PublisherConfig, BlockNode
 from .utils import sanitize_content_links
+from .outline import OutlineBuilder, render_outline, collect_refs, extract_refs
+from .markers import MarkerMatcher, marker_matcher, lines_containing
+from .frontmatter import split_frontmatter, is_draft_header, load_frontmatter
 
-def parse_logseq_file(filepath: Path, config: PublisherConfig) -> List[Article]:
+def read_source_bytes(filepath: Path) -> Optional[bytes]:
+    """以 bytes 讀入來源檔 (一次 read)，失敗時回傳 None"""
+    try:
+        with open(filepath, 'rb') as f:
+            return f.read()
+    except Exception as e:
+        print(f"⚠️ 無法讀取 {filepath}: {e}")
+        return None
+
+def may_contain_articles(raw: bytes, filepath: Path, config: PublisherConfig) -> bool:
+    """
+    Bytes 層級預篩: 沒有任何發佈標記、也不是 Legacy 頁面 (pages + 開頭 ---) 的檔案
+    不可能產出文章，不必解碼與解析。UTF-8 編碼下 bytes 搜尋與字串搜尋結果相同。
+    """
+    if marker_matcher(config).may_match_bytes(raw):
+        return True
+    return raw.startswith(b"---") and "pages" in str(filepath)
+
+def decode_source(raw: bytes) -> str:
+    """與文字模式 open() 相同: UTF-8 解碼並把 \\r\\n、\\r 轉成 \\n"""
+    content = raw.decode("utf-8")
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
+
+def parse_logseq_file(filepath: Path, config: PublisherConfig, raw: bytes = None) -> List[Article]:
     """
     解析 Logseq 檔案。
     模式 1: Block-Based Article (包含 UUID)
     模式 2: Legacy File Page (標準 Markdown)
+    raw 為已讀入的檔案內容 (bytes)，省略時自行讀取。
     """
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except Exception as e:
-        print(f"⚠️ 無法讀取 {filepath}: {e}")
-        return []
-
     # 忽略 index.md (它是首頁來源，不是文章)
     if filepath.name == "index.md":
         return []
 
+    if raw is None:
+        raw = read_source_bytes(filepath)
+        if raw is None:
+            return []
+
+    # 大部分 Journal 沒有任何標記，在解碼前就排除
+    if not may_contain_articles(raw, filepath, config):
+        return []
+
     articles = []
     
-    # 模式 1: 尋找包含 UUID 或 ++/publish 的 Block (優先)
-    # 支援新舊兩種標記方式
-    trigger_tag = "++/publish"
+    # 模式 1: 尋找包含發佈標記 (UUID、++/publish 或設定的其他標記) 的 Block (優先)
+    matcher = marker_matcher(config)
     
-    if config.publish_uuid in content or trigger_tag in content:
-        articles.extend(_parse_block_based(filepath, content, config.publish_uuid, trigger_tag))
+    if matcher.may_match_bytes(raw):
+        try:
+            content = decode_source(raw)
+        except UnicodeDecodeError as e:
+            print(f"⚠️ 無法讀取 {filepath}: {e}")
+            return []
+        articles.extend(_parse_block_based(filepath, content, matcher))
             
     # 模式 2: Legacy File Page (標準 Markdown 前言)
     # 條件: 在 Pages 目錄 + 有 frontmatter + 無 UUID (或 UUID 不在標題，這裡簡化邏輯：如果在 pages 目錄且有 frontmatter)
-    if not articles and "pages" in str(filepath) and content.startswith("---"):
-        article = _parse_legacy_file(filepath, content)
+    if not articles and "pages" in str(filepath) and raw.startswith(b"---"):
+        article = _parse_legacy_file(filepath, raw)
         if article:
             articles.append(article)
 
     return articles
 
-def _parse_block_based(filepath: Path, content: str, publish_uuid: str, trigger_tag: str) -> List[Article]:
+# --- Outline Lexer ---
+# 先以 str.find 在整份內容上找出含有結構語法 (``` / :: / 🏁) 與發佈標記的行號，
+# 其他行只可能是空行、一般內容或 - frontmatter。外層只需看 ``` 與標記所在的行；
+# 文章範圍內的結構行才交給 _lex_line 轉成 Token:
+#   (kind, indent, text, content, bullet)
+#   indent : 行首空白長度
+#   text   : 原文 (Fence 行的語言轉為小寫)
+#   content: 去掉縮排與 "- " 的內容；bullet 表示是否有 "- "
+TOKEN_TEXT = 0
+TOKEN_BLANK = 1
+TOKEN_END = 2               # 🏁 全域結束標記
+TOKEN_SYSTEM_PROPERTY = 3   # collapsed:: / id:: / logseq.xxx::
+TOKEN_FENCE = 4             # 可開可關的 ``` 行
+TOKEN_FENCE_INLINE = 5      # ``` 不在行首，只能開啟 Code Block
+TOKEN_FRONTMATTER = 6       # - frontmatter
+TOKEN_PROPERTY = 7          # 一般 key:: value 屬性
+
+_BLANK_TOKEN = (TOKEN_BLANK, 0, "", "", False)
+
+_SYSTEM_PROPERTY_RE = re.compile(r'^(collapsed|id|logseq\.[a-z]+)::\s')
+_FENCE_LANG_RE = re.compile(r'```([a-zA-Z0-9_\-\+]+)')
+_PROPERTY_RE = re.compile(r'^[a-zA-Z0-9-_]+::')
+
+def _lower_fence_lang(match) -> str:
+    return '```' + match.group(1).lower()
+
+def _lex_line(line: str) -> tuple:
+    content = line.lstrip()
+    if not content:
+        return _BLANK_TOKEN
+    indent = len(line) - len(content)
+
+    if "🏁" in line:
+        return (TOKEN_END, indent, line, content, False)
+    if "::" in content and _SYSTEM_PROPERTY_RE.match(content.rstrip()):
+        return (TOKEN_SYSTEM_PROPERTY, indent, line, content, False)
+
+    if "```" in line:
+        text = _FENCE_LANG_RE.sub(_lower_fence_lang, line)
+        fence_check = text.replace('\t', '').strip()
+        if fence_check.startswith("- "):
+            fence_check = fence_check[2:].strip()
+        kind = TOKEN_FENCE if fence_check.startswith("```") else TOKEN_FENCE_INLINE
+        return (kind, indent, text, content, False)
+
+    bullet = content[:2] == "- "
+    if bullet:
+        content = content[2:]
+        if content[:1] in "fF" and content[:11].lower() == "frontmatter":
+            return (TOKEN_FRONTMATTER, indent, line, content, bullet)
+    if ":: " in content and _PROPERTY_RE.match(content):
+        return (TOKEN_PROPERTY, indent, line, content, bullet)
+    return (TOKEN_TEXT, indent, line, content, bullet)
+
+def _read_frontmatter(lines: List[str], start: int, fm_indent: int, frontmatter_raw: dict) -> int:
+    """讀取 - frontmatter 底下的 key: value 子 Block，回傳下一個要處理的行"""
+    k = start
+    while k < len(lines):
+        fm_line = lines[k]
+        if not fm_line.strip():
+            k += 1
+            continue
+        fm_sub_indent = len(fm_line) - len(fm_line.lstrip())
+        if fm_sub_indent <= fm_indent:
+            break
+        fm_text = fm_line.strip().lstrip("- ")
+        if ":" in fm_text:
+            key, value = fm_text.split(":", 1)
+            frontmatter_raw[key.strip()] = value.strip()
+        k += 1
+    return k
+
+def _parse_block_based(filepath: Path, content: str, matcher: MarkerMatcher) -> List[Article]:
     articles = []
     lines = content.split('\n')
+    total = len(lines)
+
+    # 只有 ``` 與標記所在的行會影響外層狀態
+    fence_lines = set(lines_containing(content, "```"))
+    marker_lines = set(matcher.lines_containing(content))
+    # 文章內需要完整 Lex 的行
+    structural_set = fence_lines.union(lines_containing(content, "::"), lines_containing(content, "🏁"))
+
     i = 0
     in_code_block = False
-    
-    while i < len(lines):
-        line = lines[i]
-        
+    for line_no in sorted(fence_lines | marker_lines):
+        # 已被上一篇文章吃掉的行
+        if line_no < i:
+            continue
+        i = line_no
+        line = lines[line_no]
+
         # 偵測 Code Block
-        if "```" in line:
+        if line_no in fence_lines:
             in_code_block = not in_code_block
-        
-        has_valid_uuid = False
-        start_marker = ""
-        
-        # 檢查 UUID
-        if publish_uuid in line:
-            line_no_code = re.sub(r'(`+).*?\1', '', line)
-            if publish_uuid in line_no_code:
-                has_valid_uuid = True
-                start_marker = f"(({publish_uuid}))"
-
-        # 檢查 ++/publish
-        if not has_valid_uuid and trigger_tag in line:
-             line_no_code = re.sub(r'(`+).*?\1', '', line)
-             if trigger_tag in line_no_code:
-                 has_valid_uuid = True
-                 start_marker = trigger_tag
-
-        if has_valid_uuid and not in_code_block and not line.strip().startswith("id::"):
-            # 計算縮排級別
-            indent = len(line) - len(line.lstrip())
-            
-            # 提取標題
-            raw_title = line.strip().lstrip('- ').lstrip('# ').replace(start_marker, "").strip()
-            raw_title = raw_title.replace("**", "").replace("__", "") # Clean Markdown
-            
-            block_content = []
-            frontmatter_raw = {}
-            
-            # 追蹤 Code Block Fence 的縮排
-            fence_indent_len = 0
-            
-            # 往子 Block 掃描
-            j = i + 1
-            while j < len(lines):
-                sub_line = lines[j]
-                
-                # Global End Marker
-                if "🏁" in sub_line:
-                    j = len(lines) # Force Finish
-                    break
-                    
-                if not sub_line.strip():
+
+        if in_code_block or line_no not in marker_lines:
+            continue
+        matched = matcher.match_line(line)
+        if not matched or line.strip().startswith("id::"):
+            continue
+        start_marker, section = matched
+
+        # 計算縮排級別
+        indent = len(line) - len(line.lstrip())
+
+        # 提取標題
+        raw_title = line.strip().lstrip('- ').lstrip('# ').replace(start_marker, "").strip()
+        raw_title = raw_title.replace("**", "").replace("__", "") # Clean Markdown
+
+        outline = OutlineBuilder()
+        add_block = outline.add
+        frontmatter_raw = {}
+
+        # 追蹤 Code Block Fence 的縮排
+        fence_indent_len = 0
+
+        # 往子 Block 掃描
+        j = line_no + 1
+        while j < total:
+            sub_line = lines[j]
+            if j in structural_set:
+                kind, sub_indent, sub_line, clean_content, has_bullet = _lex_line(sub_line)
+            else:
+                # 沒有結構語法的行只可能是空行、一般內容或 - frontmatter
+                clean_content = sub_line.lstrip()
+                if not clean_content:
                     j += 1
                     continue
-                    
-                # Pre-filter System Properties
-                clean_check = sub_line.strip()
-                if "::" in clean_check:
-                        if re.match(r'^(collapsed|id|logseq\.[a-z]+)::\s', clean_check):
-                            j += 1
-                            continue
-
-                # 偵測子內容中的 Code Block 開關
-                is_opening_fence = False
-                is_closing_fence = False
-                
-                if "```" in sub_line:
-                    # Normalize fence lang
-                    sub_line = re.sub(r'```([a-zA-Z0-9_\-\+]+)', lambda m: '```' + m.group(1).lower(), sub_line)
-                    
-                    clean_fence_check = sub_line.replace('\t', '').strip()
-                    if clean_fence_check.startswith("- "): 
-                            clean_fence_check = clean_fence_check[2:].strip()
-                    
-                    if not in_code_block:
-                        in_code_block = True
-                        fence_indent_len = len(sub_line) - len(sub_line.lstrip())
-                        is_opening_fence = True
-                    else:
-                        if clean_fence_check == "```" or clean_fence_check.startswith("```"):
-                            in_code_block = False
-                            is_closing_fence = True
-                
-                sub_indent = len(sub_line) - len(sub_line.lstrip())
-                
-                # 如果縮排回到父層級或更少，表示此 Block 結束
-                if sub_indent <= indent and not in_code_block and not is_closing_fence:
+                kind = TOKEN_TEXT
+                sub_indent = len(sub_line) - len(clean_content)
+                has_bullet = clean_content[:2] == "- "
+                if has_bullet:
+                    clean_content = clean_content[2:]
+                    if clean_content[:1] in "fF" and clean_content[:11].lower() == "frontmatter":
+                        kind = TOKEN_FRONTMATTER
+
+            # 最常見的情況: Code Block 外的一般內容行
+            if kind == TOKEN_TEXT and not in_code_block:
+                if sub_indent <= indent:
                     break
+                relative_tabs = sub_line[indent:sub_indent].count('\t') or (sub_indent - indent) // 2
+                level = relative_tabs - 1 if relative_tabs > 1 else 0
+                if "[[" in clean_content:
+                    clean_content = sanitize_content_links(clean_content)
+                marker = "- " if has_bullet or clean_content.startswith("#") else "  "
+                add_block(BlockNode(clean_content, level, marker))
+                j += 1
+                continue
 
-                # Frontmatter Block Detection
-                clean_sub_check = sub_line.strip()
-                if not in_code_block and clean_sub_check.lower().startswith("- frontmatter"):
-                    fm_indent = sub_indent
-                    k = j + 1
-                    while k < len(lines):
-                        fm_line = lines[k]
-                        if not fm_line.strip():
-                            k += 1
-                            continue
-                        fm_sub_indent = len(fm_line) - len(fm_line.lstrip())
-                        if fm_sub_indent <= fm_indent:
-                            break
-                        fm_text = fm_line.strip().lstrip("- ")
-                        fm_text = fm_text.lstrip("- ") 
-                        if ":" in fm_text:
-                            key, value = fm_text.split(":", 1)
-                            frontmatter_raw[key.strip()] = value.strip()
-                        k += 1
-                    j = k 
-                    continue
-                    
-                # 計算相對層級 (Tabs)
-                raw_indent = sub_line[:sub_indent]
-                relative_tabs = raw_indent[indent:].count('\t')
-                if relative_tabs == 0 and sub_indent > indent:
-                    relative_tabs = (sub_indent - indent) // 2
-                
-                content_part = sub_line[sub_indent:]
-                
-                if in_code_block or is_closing_fence: 
-                        # Strict Stripping
-                        if len(sub_line) >= fence_indent_len:
-                            clean_content = sub_line[fence_indent_len:].rstrip()
-                        else:
-                            clean_content = sub_line.strip()
-
-                        has_bullet = False
-                        
-                        if is_opening_fence:
-                            if clean_content.strip().startswith("- "):
-                                clean_content = clean_content.strip()[2:]
-                                has_bullet = True
-                            elif sub_line.replace('\t', '    ').strip().startswith("- "):
-                                has_bullet = True
-                                if clean_content.strip().startswith("- "):
-                                    clean_content = clean_content.strip()[2:]
-                        
-                else:
-                    clean_content = content_part
-                    has_bullet = False
-                    if not in_code_block and content_part.startswith("- "):
-                        clean_content = content_part[2:]
-                        has_bullet = True
-                    
-                    if clean_content.strip() == "```" or clean_content.strip().startswith("```"):
-                            has_bullet = False 
-                    
-                    if ":: " in clean_content:
-                            prop_match = re.match(r'^[a-zA-Z0-9-_]+::', clean_content)
-                            if prop_match:
-                                j += 1
-                                continue
+            # Global End Marker
+            if kind == TOKEN_END:
+                j = total # Force Finish
+                break
 
+            # 空行與系統屬性 (屬性不輸出，但記在上方的 Block)
+            if kind == TOKEN_BLANK:
+                j += 1
+                continue
+            if kind == TOKEN_SYSTEM_PROPERTY:
                 if not in_code_block:
-                        clean_content = sanitize_content_links(clean_content)
-                
-                is_header = not in_code_block and clean_content.startswith("#")
-                content_level = max(0, relative_tabs - 1)
-                spaces_count = content_level * 2
-                indent_str = " " * spaces_count
-                
-                if is_closing_fence:
-                    articles_lines = f"{indent_str}  ```"
-                    fence_indent_len = 0
-                    
-                elif in_code_block:
-                    if is_opening_fence:
-                        clean_content = clean_content.lower().strip()
-                    
-                    if has_bullet:
-                        articles_lines = f"{indent_str}- {clean_content}"
-                    else:
-                        articles_lines = f"{indent_str}  {clean_content}"
-                        
-                elif has_bullet:
-                    articles_lines = f"{indent_str}- {clean_content}"
+                    outline.add_property(clean_content)
+                j += 1
+                continue
+
+            # 偵測子內容中的 Code Block 開關
+            is_opening_fence = False
+            is_closing_fence = False
+            if kind == TOKEN_FENCE or kind == TOKEN_FENCE_INLINE:
+                if not in_code_block:
+                    in_code_block = True
+                    fence_indent_len = sub_indent
+                    is_opening_fence = True
+                elif kind == TOKEN_FENCE:
+                    in_code_block = False
+                    is_closing_fence = True
+
+            # 如果縮排回到父層級或更少，表示此 Block 結束
+            if sub_indent <= indent and not in_code_block and not is_closing_fence:
+                break
+
+            # Frontmatter Block Detection
+            if kind == TOKEN_FRONTMATTER and not in_code_block:
+                j = _read_frontmatter(lines, j + 1, sub_indent, frontmatter_raw)
+                continue
+
+            # 計算相對層級 (Tabs)
+            relative_tabs = 0
+            if sub_indent > indent:
+                relative_tabs = sub_line[indent:sub_indent].count('\t') or (sub_indent - indent) // 2
+            level = relative_tabs - 1 if relative_tabs > 1 else 0
+
+            if is_closing_fence:
+                add_block(BlockNode("```", level, "  ", in_code=True))
+                fence_indent_len = 0
+                j += 1
+                continue
+
+            if in_code_block:
+                # Strict Stripping
+                if len(sub_line) >= fence_indent_len:
+                    clean_content = sub_line[fence_indent_len:].rstrip()
                 else:
-                    if is_header:
-                        articles_lines = f"{indent_str}- {clean_content}"
-                    else:
-                            articles_lines = f"{indent_str}  {clean_content}"
-                    
-                block_content.append(articles_lines)
+                    clean_content = sub_line.strip()
+                has_bullet = False
+
+                if is_opening_fence:
+                    if clean_content.strip().startswith("- "):
+                        clean_content = clean_content.strip()[2:]
+                        has_bullet = True
+                    elif sub_line.replace('\t', '    ').strip().startswith("- "):
+                        has_bullet = True
+                    clean_content = clean_content.lower().strip()
+                    fence = clean_content.split("```", 1)[-1].strip()
+                else:
+                    fence = None
+
+                marker = "- " if has_bullet else "  "
+                add_block(BlockNode(clean_content, level, marker, fence=fence, in_code=True))
                 j += 1
-            
-            if not raw_title:
-                 # print(f"DEBUG: Skipping empty title block in {filepath}")
-                 i = j
-                 continue
-
-            # print(f"DEBUG: Parsed article '{raw_title}' from {filepath} (Type: block)")
-            articles.append(Article(
-                title=raw_title,
-                frontmatter=frontmatter_raw,
-                body="\n".join(block_content),
-                source_file=filepath.name,
-                type="block"
-            ))
-            
-            i = j 
-        else:
-            i += 1
+                continue
+
+            # 一般屬性 (key:: value) 不輸出
+            if kind == TOKEN_PROPERTY:
+                outline.add_property(clean_content)
+                j += 1
+                continue
+
+            if "[[" in clean_content:
+                clean_content = sanitize_content_links(clean_content)
+            marker = "- " if has_bullet or clean_content.startswith("#") else "  "
+            add_block(BlockNode(clean_content, level, marker))
+            j += 1
+
+        i = j
+        if not raw_title:
+            # print(f"DEBUG: Skipping empty title block in {filepath}")
+            continue
+        if section and "categories" not in frontmatter_raw:
+            frontmatter_raw["categories"] = section
+
+        # print(f"DEBUG: Parsed article '{raw_title}' from {filepath} (Type: block)")
+        articles.append(Article(
+            title=raw_title,
+            frontmatter=frontmatter_raw,
+            body=render_outline(outline.roots),
+            source_file=filepath.name,
+            type="block",
+            section=section,
+            refs=collect_refs(outline.roots),
+        ))
     return articles
 
-def _parse_legacy_file(filepath: Path, content: str) -> Optional[Article]:
-    end_marker = content.find("---", 3)
-    if end_marker != -1:
-        try:
-            fm_str = content[3:end_marker]
-            fm_str = re.sub(r'^(\w+)::(.*)$', r'\1:\2', fm_str, flags=re.MULTILINE)
-            frontmatter = yaml.safe_load(fm_str)
-            
-            is_draft = frontmatter.get("draft", False)
-            if isinstance(is_draft, str):
-                is_draft = is_draft.lower() == "true"
-            
-            if not is_draft and frontmatter:
-                title = frontmatter.get("title", filepath.stem)
-                # print(f"DEBUG: Parsed article '{title}' from {filepath} (Type: legacy)")
-                body = content[end_marker+3:].strip()
-                return Article(
-                    title=title,
-                    frontmatter=frontmatter,
-                    body=body,
-                    source_file=filepath.name,
-                    type="file"
-                )
-        except Exception as e:
-            print(f"  ⚠️ YAML Parsing Error {filepath.name}: {e}")
+def _parse_legacy_file(filepath: Path, raw: bytes) -> Optional[Article]:
+    """
+    只解碼 --- 之間的前言；草稿在 YAML 之前就用 draft 鍵排除，本文只有確定要發佈時才解碼。
+    """
+    split = split_frontmatter(raw)
+    if split is None:
+        return None
+    header_raw, body_start = split
+    try:
+        fm_str = decode_source(header_raw)
+        if is_draft_header(fm_str):
+            return None
+    except UnicodeDecodeError as e:
+        print(f"⚠️ 無法讀取 {filepath}: {e}")
+        return None
+
+    try:
+        frontmatter = load_frontmatter(fm_str)
+        
+        is_draft = frontmatter.get("draft", False)
+        if isinstance(is_draft, str):
+            is_draft = is_draft.lower() == "true"
+        
+        if not is_draft and frontmatter:
+            title = frontmatter.get("title", filepath.stem)
+            try:
+                body = decode_source(raw[body_start:]).strip()
+            except UnicodeDecodeError as e:
+                print(f"⚠️ 無法讀取 {filepath}: {e}")
+                return None
+            return Article(
+                title=title,
+                frontmatter=frontmatter,
+                body=body,
+                source_file=filepath.name,
+                type="file",
+                refs=extract_refs([body]),
+            )
+    except Exception as e:
+        print(f"  ⚠️ YAML Parsing Error {filepath.name}: {e}")
     return None
@@ -0,0 +1,154 @@
+import os
+import time
+import urllib.parse
+from pathlib import Path
+from typing import List, Dict, Set, Tuple, Any
+from ..contracts.types import Article, ArticleRoute, PublisherConfig
+from .parser import parse_logseq_file, read_source_bytes
+from .enricher import enrich_article_metadata, infers_date_from_clock
+from .cache import build_manifest_entry, hash_bytes
+from .utils import get_safe_path_elements
+from .collisions import compute_short_hash
+from .tags import load_tag_rules, drain_rule_hits, rule_hits
+from .dashboard import generate_dashboard
+from .archive import generate_archive, generate_tags_page
+from .redirects import generate_redirects
+from .profiling import PhaseProfiler
+
+# Worker 行程共用的唯讀狀態 (由 initializer 設定一次，避免每個檔案都重新 pickle)
+_worker_config: PublisherConfig = None
+_worker_uuid_map: Dict[str, str] = None
+
+def parse_and_enrich_file(filepath: Path, config: PublisherConfig, uuid_map: Dict[str, str],
+                          timings: Dict[str, Dict[str, float]] = None, st: os.stat_result = None) -> Tuple[List[Article], Dict[str, Any]]:
+    """解析 + Enrich 單一來源檔，並回傳對應的 Manifest 紀錄 (timings 不為 None 時記錄耗時)"""
+    started = time.perf_counter()
+    # 只讀一次: 同一份 bytes 用於預篩、解析與 Manifest 的 hash
+    raw = read_source_bytes(filepath)
+    found_articles = parse_logseq_file(filepath, config, raw) if raw is not None else []
+    parsed = time.perf_counter()
+    date_volatile = any(infers_date_from_clock(art) for art in found_articles)
+    tag_rules = load_tag_rules(config.tag_rules_path)
+    for art in found_articles:
+        enrich_article_metadata(art, uuid_map, tag_rules)
+    if timings is not None:
+        timings[str(filepath)] = {"parse_s": parsed - started, "enrich_s": time.perf_counter() - parsed}
+    digest = hash_bytes(raw) if raw is not None else None
+    return found_articles, build_manifest_entry(filepath, found_articles, st=st, digest=digest, date_volatile=date_volatile)
+
+def _init_worker(config: PublisherConfig, uuid_map: Dict[str, str]):
+    global _worker_config, _worker_uuid_map
+    _worker_config = config
+    _worker_uuid_map = uuid_map
+
+def _worker_parse_and_enrich(item: Tuple[Path, os.stat_result]):
+    filepath, st = item
+    timings = {}
+    found_articles, entry = parse_and_enrich_file(filepath, _worker_config, _worker_uuid_map, timings, st)
+    return found_articles, entry, timings, drain_rule_hits()
+
+def resolve_jobs(jobs: int) -> int:
+    """jobs <= 0 代表使用所有 CPU 核心"""
+    if jobs is None or jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+def parse_and_enrich_files(files: List[Path], config: PublisherConfig, uuid_map: Dict[str, str],
+                           jobs: int = 1, chunk_size: int = 0,
+                           timings: Dict[str, Dict[str, float]] = None,
+                           stats: Dict[Path, os.stat_result] = None) -> List[Tuple[List[Article], Dict[str, Any]]]:
+    """
+    批次解析 + Enrich。jobs > 1 時分塊交給 Process Pool 處理，
+    結果依照輸入順序回傳，與序列執行完全相同。
+    stats 為掃描階段取得的 stat，可省去寫入 Manifest 時的重複 stat。
+    """
+    stats = stats or {}
+    if jobs <= 1 or len(files) < 2:
+        return [parse_and_enrich_file(f, config, uuid_map, timings, stats.get(f)) for f in files]
+
+    if chunk_size <= 0:
+        # 每個 worker 約分到 4 個 chunk，兼顧負載平衡與 IPC 開銷
+        chunk_size = max(1, len(files) // (jobs * 4))
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(config, uuid_map)) as pool:
+        results = []
+        for found_articles, entry, file_timings, hits in pool.map(_worker_parse_and_enrich, [(f, stats.get(f)) for f in files], chunksize=chunk_size):
+            if timings is not None:
+                timings.update(file_timings)
+            # Worker 的標籤規則命中次數併回主行程
+            rule_hits.update(hits)
+            results.append((found_articles, entry))
+        return results
+
+def assign_output_paths(found_articles: List[Article]) -> List[Article]:
+    """過濾草稿並決定每篇文章的輸出位置 (target_dir / filename)"""
+    publishable = []
+    for art in found_articles:
+        # Draft check
+        is_draft = str(art.frontmatter.get("draft", "false")).lower() == "true"
+        if is_draft: continue
+        
+        # Path Logic
+        safe_cat, safe_title = get_safe_path_elements(art.title, art.categories)
+        filename = f"{safe_title}.md"
+        
+        if "關於我" in art.title and "About" in art.title:
+            filename = "about.md"
+            safe_cat = ""
+            
+        art.target_dir = safe_cat
+        art.filename = filename
+        art.path_suffix = ""
+        art.route = None
+        publishable.append(art)
+    return publishable
+
+def build_route(article: Article) -> ArticleRoute:
+    """由已定案的 target_dir / filename / short_hash 組出網站上的各種路徑"""
+    stem = os.path.splitext(article.filename)[0]
+    path = f"{article.target_dir}/{stem}" if article.target_dir else stem
+    url_path = f"/{path}"
+    return ArticleRoute(
+        category=article.target_dir,
+        title=stem[:len(stem) - len(article.path_suffix)],
+        stem=stem,
+        path=path,
+        output_path=os.path.join(article.target_dir, article.filename),
+        url_path=url_path,
+        url=urllib.parse.quote(url_path, safe='/'),
+        short_hash=article.short_hash or compute_short_hash(article),
+    )
+
+def assign_routes(articles: List[Article]) -> List[Article]:
+    """check_collisions 之後呼叫: 輸出路徑與短網址已定案，每篇文章算一次 ArticleRoute"""
+    for art in articles:
+        art.route = build_route(art)
+    return articles
+
+def output_rel_path(article: Article) -> str:
+    return article.route.output_path
+
+def build_tag_index(articles: List[Article]) -> Dict[str, List[Article]]:
+    tag_index = {}
+    for art in articles:
+        for t in art.tags:
+            if t not in tag_index: tag_index[t] = []
+            tag_index[t].append(art)
+    return tag_index
+
+def generate_site_pages(articles: List[Article], config: PublisherConfig, only: Set[str] = None, profiler: PhaseProfiler = None):
+    """彙總頁面: 首頁、歸檔、標籤索引、_redirects (only 指定時只產生其中幾個)"""
+    profiler = profiler or PhaseProfiler()
+    if only is None or "index.md" in only:
+        with profiler.phase("generate_dashboard", len(articles)):
+            generate_dashboard(articles, config)
+    if only is None or "archive.md" in only:
+        with profiler.phase("generate_archive", len(articles)):
+            generate_archive(articles, config)
+    if only is None or "all-tags.md" in only:
+        with profiler.phase("generate_tags_page", len(articles)):
+            generate_tags_page(articles, config)
+    if only is None or "_redirects" in only:
+        with profiler.phase("generate_redirects", len(articles)):
+            generate_redirects(articles, config)
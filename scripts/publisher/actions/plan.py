@@ -0,0 +1,86 @@
+import os
+from typing import List, Dict, Any
+from ..contracts.types import Article, PublisherConfig
+from .related import RelatedIndex
+from .backlinks import BacklinkIndex
+from .wikilinks import WikilinkIndex
+from .fs import render_article, find_stale_output_files, list_publishable_assets
+from .dashboard import render_dashboard
+from .archive import render_archive, render_tags_page
+from .redirects import render_redirects, format_redirects, redirects_file_path
+
+def _plan_file(path: str, new_content: str) -> Dict[str, Any]:
+    """比對磁碟上的檔案與即將寫入的內容 (只讀不寫)"""
+    new_bytes = len(new_content.encode("utf-8"))
+    if not os.path.exists(path):
+        return {"path": path, "action": "create", "old_bytes": 0, "new_bytes": new_bytes}
+    with open(path, "r", encoding="utf-8") as f:
+        existing = f.read()
+    old_bytes = len(existing.encode("utf-8"))
+    action = "unchanged" if existing == new_content else "update"
+    return {"path": path, "action": action, "old_bytes": old_bytes, "new_bytes": new_bytes}
+
+def plan_assets(config: PublisherConfig) -> Dict[str, int]:
+    """copy_assets 會整個重建 assets 目錄，這裡只統計實際會有差異的檔案"""
+    src = list_publishable_assets(config)
+    dest = {}
+    assets_dest = os.path.join(config.quartz_content_dir, "assets")
+    if os.path.isdir(assets_dest):
+        for root, dirs, files in os.walk(assets_dest):
+            for f in files:
+                filepath = os.path.join(root, f)
+                dest[os.path.relpath(filepath, assets_dest)] = os.path.getsize(filepath)
+    return {
+        "create": sum(1 for k in src if k not in dest),
+        "update": sum(1 for k, size in src.items() if k in dest and dest[k] != size),
+        "delete": sum(1 for k in dest if k not in src),
+        "unchanged": sum(1 for k, size in src.items() if dest.get(k) == size),
+    }
+
+def plan_publish(articles: List[Article], related: RelatedIndex,
+                 config: PublisherConfig, expected_files: set, transcluder=None,
+                 backlinks: BacklinkIndex = None, wikilinks: WikilinkIndex = None) -> Dict[str, Any]:
+    """
+    在記憶體中跑完整個輸出流程，回傳每個檔案會被 新增 / 更新 / 刪除 / 不變。
+    不寫入任何檔案，也不複製 Assets。
+    """
+    changes = []
+    for art in articles:
+        if not art.filename:
+            continue
+        path = os.path.join(config.quartz_content_dir, art.target_dir, art.filename)
+        changes.append(_plan_file(path, render_article(art, config, related, transcluder, backlinks, wikilinks)))
+
+    for rel_path in find_stale_output_files(config, expected_files):
+        path = os.path.join(config.quartz_content_dir, rel_path)
+        changes.append({"path": path, "action": "delete", "old_bytes": os.path.getsize(path), "new_bytes": 0})
+
+    logseq_index, quartz_index = render_dashboard(articles, config)
+    changes.append(_plan_file(os.path.join(config.logseq_dir, "pages", "index.md"), logseq_index))
+    changes.append(_plan_file(os.path.join(config.quartz_content_dir, "index.md"), quartz_index))
+    changes.append(_plan_file(os.path.join(config.quartz_content_dir, "archive.md"), render_archive(articles, wikilinks is not None)))
+    changes.append(_plan_file(os.path.join(config.quartz_content_dir, "all-tags.md"), render_tags_page(articles, wikilinks is not None)))
+
+    redirects, short_redirects = render_redirects(articles)
+    if redirects or short_redirects:
+        changes.append(_plan_file(redirects_file_path(), format_redirects(redirects + short_redirects)))
+
+    return {"files": changes, "assets": plan_assets(config)}
+
+def format_plan(plan: Dict[str, Any]) -> str:
+    symbols = {"create": "+", "update": "~", "delete": "-", "unchanged": "="}
+    counts = {action: 0 for action in symbols}
+    delta_total = 0
+    lines = ["", "🗺️  發佈計畫 (未寫入任何檔案)"]
+    for change in plan["files"]:
+        counts[change["action"]] += 1
+        delta = change["new_bytes"] - change["old_bytes"]
+        delta_total += delta
+        if change["action"] == "unchanged":
+            continue
+        lines.append(f"  {symbols[change['action']]} {change['path']}  ({change['old_bytes']} → {change['new_bytes']} bytes, {delta:+d})")
+
+    lines.append(f"\n📋 新增 {counts['create']}, 更新 {counts['update']}, 刪除 {counts['delete']}, 不變 {counts['unchanged']} (合計 {delta_total:+d} bytes)")
+    assets = plan["assets"]
+    lines.append(f"📦 Assets: 新增 {assets['create']}, 更新 {assets['update']}, 刪除 {assets['delete']}, 不變 {assets['unchanged']}")
+    return "\n".join(lines)
@@ -0,0 +1,93 @@
+import os
+import json
+import time
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Any
+
+class PhaseProfiler:
+    """
+    記錄每個階段的 Wall Time / CPU Time / 處理數量。
+    enabled=False 時 phase() 幾乎沒有成本，main() 可以無條件呼叫。
+    """
+
+    def __init__(self, enabled: bool = False, trace_memory: bool = False):
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.phases: List[Dict[str, Any]] = []
+        self.file_timings: Dict[str, Dict[str, float]] = {}
+        self._started = time.perf_counter()
+        self._started_cpu = time.process_time()
+        if self.trace_memory:
+            import tracemalloc
+            tracemalloc.start()
+
+    @contextmanager
+    def phase(self, name: str, items: Optional[int] = None):
+        if not self.enabled:
+            yield {}
+            return
+        if self.trace_memory:
+            import tracemalloc
+            tracemalloc.reset_peak()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        record = {"name": name, "items": items}
+        try:
+            yield record
+        finally:
+            record["wall_s"] = time.perf_counter() - wall
+            record["cpu_s"] = time.process_time() - cpu
+            if self.trace_memory:
+                import tracemalloc
+                record["peak_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+            self.phases.append(record)
+
+    def record_files(self, timings: Dict[str, Dict[str, float]]):
+        self.file_timings.update(timings)
+
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        slowest = sorted(self.file_timings.items(), key=lambda kv: kv[1]["parse_s"] + kv[1]["enrich_s"], reverse=True)[:top]
+        report = {
+            "total_wall_s": time.perf_counter() - self._started,
+            "total_cpu_s": time.process_time() - self._started_cpu,
+            "phases": self.phases,
+            "files": {
+                "count": len(self.file_timings),
+                "parse_s": sum(t["parse_s"] for t in self.file_timings.values()),
+                "enrich_s": sum(t["enrich_s"] for t in self.file_timings.values()),
+            },
+            "slowest_files": [{"file": f, **t} for f, t in slowest],
+        }
+        if self.trace_memory:
+            import tracemalloc
+            snapshot = tracemalloc.take_snapshot()
+            report["top_allocations"] = [
+                {"location": str(stat.traceback), "size_kb": stat.size / 1024, "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:top]
+            ]
+        return report
+
+def write_profile_report(report: Dict[str, Any], path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+def format_profile_summary(report: Dict[str, Any]) -> str:
+    lines = ["", "⏱️  效能報告", f"{'階段':<24}{'Wall(s)':>10}{'CPU(s)':>10}{'數量':>8}"]
+    for p in report["phases"]:
+        items = "" if p.get("items") is None else str(p["items"])
+        lines.append(f"{p['name']:<24}{p['wall_s']:>10.3f}{p['cpu_s']:>10.3f}{items:>8}")
+    lines.append(f"{'總計':<24}{report['total_wall_s']:>10.3f}{report['total_cpu_s']:>10.3f}")
+
+    files = report["files"]
+    if files["count"]:
+        lines.append(f"\n📄 重新解析 {files['count']} 個檔案: parse {files['parse_s']:.3f}s, enrich {files['enrich_s']:.3f}s (各檔累計)")
+    if report["slowest_files"]:
+        lines.append("🐢 最慢的檔案:")
+        for entry in report["slowest_files"]:
+            lines.append(f"  {entry['parse_s'] + entry['enrich_s']:.4f}s  {entry['file']}")
+    if report.get("top_allocations"):
+        lines.append("🧠 記憶體配置 (Top):")
+        for entry in report["top_allocations"]:
+            lines.append(f"  {entry['size_kb']:>10.1f} KB  {entry['location']}")
+    return "\n".join(lines)
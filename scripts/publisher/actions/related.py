@@ -0,0 +1,241 @@
+import os
+import json
+import heapq
+import hashlib
+from collections import Counter
+from itertools import chain
+from typing import Dict, List, Optional, Any
+from ..contracts.types import Article, PublisherConfig
+
+RELATED_VERSION = 1
+RELATED_FILENAME = "related.json"
+# 預設分類不代表兩篇文章有關
+DEFAULT_CATEGORY = "Uncategorized"
+# "tags" = 標籤 / 分類, "content" = 內文相似度, "links" = [[連結]] 圖, "blend" = 三者分數相加
+RELATED_ENGINES = ("tags", "content", "links", "blend")
+
+def article_key(article: Article) -> str:
+    """文章的唯一識別 (輸出路徑，resolve_collisions 之後不會重複)"""
+    if article.route is None:
+        raise ValueError(f"文章尚未指定 ArticleRoute (需在 check_collisions 之後呼叫 assign_routes): {article.title}")
+    return article.route.output_path
+
+def article_categories(article: Article) -> List[str]:
+    cats = [c.strip() for c in str(article.categories).split(',')]
+    return sorted({c for c in cats if c and c != DEFAULT_CATEGORY})
+
+def build_category_index(articles: List[Article]) -> Dict[str, List[Article]]:
+    category_index = {}
+    for art in articles:
+        for cat in article_categories(art):
+            category_index.setdefault(cat, []).append(art)
+    return category_index
+
+def _digest(payload) -> str:
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+class RelatedIndex:
+    """
+    一次算出所有文章的相關文章。
+    分數 = 共同標籤數 x tag_weight + 共同分類數 x category_weight，
+    以倒排索引 (標籤 / 分類 -> 文章) 累加，只走訪真的有共同項目的文章。
+    標籤與分類完全相同的文章共用同一組排名 (Signature)，並以 heapq 取前 k 名；
+    Signature 涉及的倒排清單都沒變時直接沿用上次的排名。
+    同分時依日期 (新到舊)、再依輸出路徑排序，結果與掃描順序無關。
+    related_engine 為 content / blend 時再加上 內文 Cosine 相似度 x content_weight (見 similarity.py)，
+    為 links / blend 時再加上 連結分數 x link_weight (見 linkgraph.py)。
+    """
+    def __init__(self, articles: List[Article], tag_index: Dict[str, List[Article]], config: PublisherConfig,
+                 previous: Optional[Dict[str, Dict[str, Any]]] = None,
+                 vectors: Optional[Dict[str, Dict[str, Any]]] = None):
+        if config.related_engine not in RELATED_ENGINES:
+            raise ValueError(f"related_engine 必須是 {', '.join(RELATED_ENGINES)} 其中之一: {config.related_engine!r}")
+        self.engine = config.related_engine
+        self.content_weight = config.related_content_weight
+        self.link_weight = config.related_link_weight
+        self.max_related = config.max_related
+        self.tag_weight = config.related_tag_weight
+        self.category_weight = config.related_category_weight
+        self.category_index = build_category_index(articles)
+        keys = {id(a): article_key(a) for a in articles}
+        self.by_key = {keys[id(a)]: a for a in articles}
+        self.groups: Dict[str, Dict[str, Any]] = {}
+        self.reused = 0
+        self._signatures: Dict[str, str] = {}
+        # 相依圖與渲染都會查詢同一篇文章
+        self._selected: Dict[str, List[Article]] = {}
+        self._categories = {keys[id(a)]: set(article_categories(a)) for a in articles}
+        self._tags = {keys[id(a)]: set(a.tags) for a in articles}
+
+        postings = {f"tag:{t}": members for t, members in tag_index.items()}
+        postings.update({f"category:{c}": members for c, members in self.category_index.items()})
+        # 倒排清單只記錄成員與排序用的日期
+        self._postings = {name: [keys[id(a)] for a in members] for name, members in postings.items()}
+        posting_digests = {name: _digest(sorted((keys[id(a)], str(a.date)) for a in members))
+                           for name, members in postings.items()}
+
+        # 依 (日期新到舊, 路徑) 排好的名次，heapq 只需要比較整數
+        ordered = sorted(self.by_key)
+        ordered.sort(key=lambda k: str(self.by_key[k].date), reverse=True)
+        self._rank = {key: rank for rank, key in enumerate(ordered)}
+
+        # 同標題的文章互相排除、也只列一次，多取幾名才補得滿 k 篇
+        duplicate_titles = len(articles) - len({art.title for art in articles})
+        need = self._need = self.max_related + 1 + duplicate_titles
+
+        for art in articles:
+            self._signatures[keys[id(art)]] = self._signature(art)
+
+        previous = previous or {}
+        # content / links 模式不看標籤，不必排名
+        signatures = set(self._signatures.values()) if self.engine not in ("content", "links") else ()
+        for signature in signatures:
+            terms = json.loads(signature)
+            deps = _digest([posting_digests.get(name) for name in terms])
+            cached = previous.get(signature)
+            if cached and cached["deps"] == deps and cached["need"] >= need \
+                    and all(k in self.by_key for k in cached["ranked"]):
+                self.groups[signature] = cached
+                self.reused += 1
+                continue
+            self.groups[signature] = {"deps": deps, "need": need, "ranked": self._rank_terms(terms, need)}
+
+        # 延遲載入: 預設的 tags 模式不需要 (也不會載入 NumPy / SciPy)
+        self.content = None
+        if self.engine in ("content", "blend"):
+            from .similarity import ContentSimilarity
+            self.content = ContentSimilarity(articles, [keys[id(a)] for a in articles], config, vectors)
+        self.links = None
+        if self.engine == "links" or (self.engine == "blend" and self.link_weight):
+            from .linkgraph import LinkGraph
+            self.links = LinkGraph(articles, [keys[id(a)] for a in articles], need)
+
+    def _signature(self, article: Article) -> str:
+        terms = [f"tag:{t}" for t in sorted(set(article.tags))]
+        terms += [f"category:{c}" for c in article_categories(article)]
+        return json.dumps(terms, ensure_ascii=False)
+
+    def _rank_terms(self, terms: List[str], need: int) -> List[str]:
+        tag_lists = [self._postings.get(name, ()) for name in terms if name.startswith("tag:")]
+        categories = {name[len("category:"):] for name in terms if name.startswith("category:")}
+        tag_weight, category_weight = self.tag_weight, self.category_weight
+        tag_counts = Counter(chain.from_iterable(tag_lists))
+        category_max = category_weight * len(categories)
+
+        # 至少 need 篇的分數 >= floor；加滿分類分數仍低於 floor 的文章不可能進前 need 名，不必計分
+        candidates = tag_counts
+        category_only = True
+        if len(tag_counts) >= need and tag_weight > 0 and category_weight >= 0:
+            floor = tag_weight * sorted(tag_counts.values(), reverse=True)[need - 1]
+            min_count = -(-(floor - category_max) // tag_weight)
+            candidates = {key: count for key, count in tag_counts.items() if count >= min_count}
+            category_only = category_max >= floor
+
+        if categories:
+            own = self._categories
+            scores = {key: tag_weight * count + category_weight * len(categories & own[key])
+                      for key, count in candidates.items()}
+            if category_only:
+                for cat in categories:
+                    for key in self._postings.get(f"category:{cat}", ()):
+                        if key not in tag_counts:
+                            scores[key] = scores.get(key, 0) + category_weight
+        else:
+            scores = {key: tag_weight * count for key, count in candidates.items()}
+        rank = self._rank
+        best = heapq.nsmallest(need, scores.items(), key=lambda kv: (-kv[1], rank[kv[0]]))
+        return [key for key, _ in best]
+
+    def _tag_score(self, a: str, b: str) -> int:
+        return self.tag_weight * len(self._tags[a] & self._tags[b]) \
+            + self.category_weight * len(self._categories[a] & self._categories[b])
+
+    def _blend(self, key: str, signature: str) -> List[str]:
+        """
+        標籤排名的前 need 名加上 LSH 找到的內文相近文章、連結分數最高的文章，以合計分數重新排序。
+        都不在的文章合計分數不會超過第 need 名 (連結只保留前幾名，是近似)，不必計算。
+        """
+        sources = []
+        if self.content is not None:
+            sources.append((self.content_weight, self.content.neighbors.get(key, {})))
+        if self.links is not None:
+            sources.append((self.link_weight, self.links.neighbors.get(key, {})))
+        with_tags = self.engine == "blend"
+        scores = {other: self._tag_score(key, other) for other in self.groups[signature]["ranked"]} if with_tags else {}
+        for weight, neighbors in sources:
+            for other, score in neighbors.items():
+                if other not in scores:
+                    scores[other] = self._tag_score(key, other) if with_tags else 0
+                scores[other] += weight * score
+        rank = self._rank
+        best = heapq.nsmallest(self._need, (kv for kv in scores.items() if kv[1] > 0),
+                               key=lambda kv: (-kv[1], rank[kv[0]]))
+        return [other for other, _ in best]
+
+    def related(self, article: Article) -> List[Article]:
+        key = article_key(article)
+        signature = self._signatures.get(key)
+        if signature is None:
+            return []
+        if key in self._selected:
+            return self._selected[key]
+        if self.content is None and self.links is None:
+            ranked = self.groups[signature]["ranked"]
+        else:
+            ranked = self._blend(key, signature)
+        selected = []
+        titles = {article.title}
+        for other in ranked:
+            candidate = self.by_key[other]
+            if candidate.title in titles:
+                continue
+            titles.add(candidate.title)
+            selected.append(candidate)
+            if len(selected) >= self.max_related:
+                break
+        self._selected[key] = selected
+        return selected
+
+def related_context(config: PublisherConfig) -> str:
+    """排名與權重、k 有關；與 Manifest 的 Build Context 分開，標籤對照改變時仍可沿用沒受影響的排名"""
+    return _digest([RELATED_VERSION, config.max_related, config.related_tag_weight, config.related_category_weight])
+
+def load_related_cache(config: PublisherConfig) -> Optional[Dict[str, Dict[str, Any]]]:
+    path = os.path.join(config.cache_dir, RELATED_FILENAME)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"  ⚠️ 相關文章快取讀取失敗，重新計算: {e}")
+        return None
+    if data.get("version") != RELATED_VERSION or data.get("context") != related_context(config):
+        return None
+    return data.get("groups", {})
+
+def build_related_index(articles: List[Article], tag_index: Dict[str, List[Article]], config: PublisherConfig,
+                        previous_index: Optional[RelatedIndex] = None, full: bool = False) -> RelatedIndex:
+    """沿用上一個 RelatedIndex (Watch 模式) 或磁碟快取的排名與內文向量"""
+    if previous_index is not None:
+        previous = previous_index.groups
+        vectors = previous_index.content.vectors if previous_index.content else None
+    else:
+        previous = None if full else load_related_cache(config)
+        vectors = None
+        if config.related_engine != "tags" and not full:
+            from .similarity import load_content_vectors
+            vectors = load_content_vectors(config)
+    return RelatedIndex(articles, tag_index, config, previous, vectors)
+
+def save_related_cache(config: PublisherConfig, index: RelatedIndex):
+    if index.content is not None:
+        from .similarity import save_content_vectors
+        save_content_vectors(config, index.content)
+    os.makedirs(config.cache_dir, exist_ok=True)
+    path = os.path.join(config.cache_dir, RELATED_FILENAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": RELATED_VERSION, "context": related_context(config), "groups": index.groups}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
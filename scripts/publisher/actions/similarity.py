@@ -0,0 +1,276 @@
+import os
+import re
+import json
+import math
+import zlib
+import random
+import hashlib
+from collections import Counter
+from itertools import chain
+from typing import Dict, List, Optional, Tuple, Any
+from ..contracts.types import Article, PublisherConfig
+from .optional import optional_module
+
+VECTORS_VERSION = 1
+VECTORS_FILENAME = "content_vectors.json"
+# MinHash (One Permutation Hashing): 每個詞只雜湊一次並分到 128 格，每格取最小值；
+# 128 格切成 64 個 Band (每個 2 格)，Jaccard 0.15 的兩篇約 76% 機率成為候選
+NUM_BINS = 128
+LSH_BANDS = 64
+# 出現在超過這個比例文章中的詞 (「我們」「可以」之類) 不放進 MinHash，否則所有文章看起來都很像
+LSH_MAX_DF = 0.1
+# 仍然過大的桶不產生候選，避免退化成全部兩兩比較
+LSH_MAX_BUCKET = 100
+# 每篇只保留 TF-IDF 最高的詞計算 Cosine (長文的尾端詞幾乎不影響結果，卻決定了計算量)
+MAX_VECTOR_TERMS = 100
+# 一次交給 SciPy 計算的候選組數 (限制暫存矩陣大小)
+COSINE_BATCH = 20000
+
+_PRIME = (1 << 31) - 1
+_rng = random.Random(20240521)
+_HASH_A, _HASH_B = _rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)
+# 空格借用右邊最近一格的值並加上 距離 x _BIN_STRIDE (Rotation Densification)，不會與真正的值相撞
+_BIN_STRIDE = _PRIME // NUM_BINS + 1
+
+_URL_RE = re.compile(r'https?://\S+')
+# 中日韓文字連續成段 (取字元 Bigram)，其他語言取英數字單字
+_TOKEN_RE = re.compile(r'([぀-ヿ㐀-䶿一-鿿가-힯]+)|([A-Za-z0-9]+)')
+
+def body_hash(body: str) -> str:
+    return hashlib.sha1(body.encode("utf-8")).hexdigest()
+
+def content_features(text: str) -> Counter:
+    """內文 -> 詞頻。中日韓文字以字元 Bigram 切分 (不需要斷詞)，英數字以單字計"""
+    terms = Counter()
+    for cjk, word in _TOKEN_RE.findall(_URL_RE.sub(" ", text)):
+        if cjk:
+            if len(cjk) == 1:
+                terms[cjk] += 1
+            else:
+                terms.update(cjk[i:i + 2] for i in range(len(cjk) - 1))
+        elif len(word) > 1:
+            terms[word.lower()] += 1
+    return terms
+
+def _term_hash(term: str) -> int:
+    """詞 -> [0, p) 的雜湊值 (種子固定，跨執行、跨機器一致)；格子 = h % NUM_BINS，值 = h // NUM_BINS"""
+    return (_HASH_A * zlib.crc32(term.encode("utf-8")) + _HASH_B) % _PRIME
+
+def _densify(bins: List[Optional[int]]) -> Tuple[int, ...]:
+    """空格由右邊 (環狀) 最近的非空格補上；全部都空時回傳空簽章"""
+    if all(v is None for v in bins):
+        return ()
+    out = list(bins)
+    nearest, distance = None, 0
+    for j in range(2 * NUM_BINS - 1, -1, -1):
+        value = bins[j % NUM_BINS]
+        if value is not None:
+            nearest, distance = value, 0
+        else:
+            distance += 1
+            if j < NUM_BINS:
+                out[j] = nearest + distance * _BIN_STRIDE
+    return tuple(out)
+
+def _lsh_candidates(signatures: List[Tuple[int, ...]]) -> List[Tuple[int, int]]:
+    rows = NUM_BINS // LSH_BANDS
+    buckets: Dict[Tuple, List[int]] = {}
+    for i, sig in enumerate(signatures):
+        if not sig:
+            continue
+        for band in range(LSH_BANDS):
+            buckets.setdefault((band,) + sig[band * rows:(band + 1) * rows], []).append(i)
+    pairs = set()
+    for members in buckets.values():
+        if 1 < len(members) <= LSH_MAX_BUCKET:
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    pairs.add((members[x], members[y]))
+    return list(pairs)
+
+def _lsh_candidates_numpy(np, signatures, valid):
+    """_lsh_candidates 的向量化版本 (同樣的分桶與上限)，回傳 (左, 右) 兩個索引陣列"""
+    rows = NUM_BINS // LSH_BANDS
+    docs = np.flatnonzero(valid)
+    codes = []
+    for band in range(LSH_BANDS):
+        # 簽章值都小於 2^31，兩格合成一個 int64 當作桶的 key
+        keys = signatures[docs, band * rows] << 31 | signatures[docs, band * rows + 1]
+        order = np.argsort(keys, kind="stable")
+        starts = np.flatnonzero(np.r_[True, keys[order][1:] != keys[order][:-1]])
+        sizes = np.diff(np.r_[starts, len(order)])
+        for size in np.unique(sizes[(sizes > 1) & (sizes <= LSH_MAX_BUCKET)]).tolist():
+            members = docs[order[starts[sizes == size][:, None] + np.arange(size)]]
+            x, y = np.triu_indices(size, 1)
+            left, right = members[:, x].ravel(), members[:, y].ravel()
+            codes.append(np.minimum(left, right) * len(valid) + np.maximum(left, right))
+    if not codes:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    codes = np.unique(np.concatenate(codes))
+    return codes // len(valid), codes % len(valid)
+
+def _max_df(n: int) -> int:
+    return max(2, int(n * LSH_MAX_DF))
+
+def _similar_pairs_python(docs: List[Dict[str, int]], min_similarity: float) -> List[Tuple[int, int, float]]:
+    n = len(docs)
+    df = Counter()
+    for terms in docs:
+        df.update(terms.keys())
+
+    # TF-IDF (平滑 IDF、對數 TF)，每篇正規化成單位向量
+    idf = {t: math.log((1 + n) / (1 + c)) + 1 for t, c in df.items()}
+    weights = []
+    for terms in docs:
+        vec = sorted(((-(1 + math.log(tf)) * idf[t], t) for t, tf in terms.items()))[:MAX_VECTOR_TERMS]
+        norm = math.sqrt(sum(w * w for w, _ in vec)) or 1.0
+        weights.append({t: -w / norm for w, t in vec})
+
+    # 只出現在一篇的詞不會讓兩篇文章相撞，太常見的詞會讓所有文章相撞，兩者都不放進 MinHash
+    max_df = _max_df(n)
+    hashes: Dict[str, int] = {}
+    signatures = []
+    for terms in docs:
+        bins: List[Optional[int]] = [None] * NUM_BINS
+        for t in terms:
+            if 2 <= df[t] <= max_df:
+                h = hashes.get(t)
+                if h is None:
+                    h = hashes[t] = _term_hash(t)
+                slot, value = h % NUM_BINS, h // NUM_BINS
+                if bins[slot] is None or value < bins[slot]:
+                    bins[slot] = value
+        signatures.append(_densify(bins))
+
+    similar = []
+    for i, j in _lsh_candidates(signatures):
+        a, b = weights[i], weights[j]
+        sim = sum(a[t] * b[t] for t in a.keys() & b.keys())
+        if sim >= min_similarity:
+            similar.append((i, j, sim))
+    return similar
+
+def _similar_pairs_sparse(docs: List[Dict[str, int]], min_similarity: float, np, sparse) -> List[Tuple[int, int, float]]:
+    """與 _similar_pairs_python 相同的計算，以 NumPy 向量化、SciPy CSR 稀疏矩陣一次處理所有文章"""
+    n = len(docs)
+    terms_by_id = list(dict.fromkeys(chain.from_iterable(docs)))
+    vocab = {t: i for i, t in enumerate(terms_by_id)}
+    indices = np.fromiter(map(vocab.__getitem__, chain.from_iterable(docs)), dtype=np.int64)
+    counts = np.fromiter(chain.from_iterable(terms.values() for terms in docs), dtype=np.float64)
+    indptr = np.concatenate(([0], np.cumsum([len(terms) for terms in docs]))).astype(np.int64)
+    row_of = np.repeat(np.arange(n), np.diff(indptr))
+
+    df = np.bincount(indices, minlength=len(vocab))
+    idf = np.log((1 + n) / (1 + df)) + 1
+    data = (1 + np.log(counts)) * idf[indices]
+
+    # 每篇保留權重最高的 MAX_VECTOR_TERMS 個詞 (同分依詞排序，與純 Python 版本一致)
+    term_order = np.empty(len(vocab), dtype=np.int64)
+    term_order[sorted(range(len(vocab)), key=terms_by_id.__getitem__)] = np.arange(len(vocab))
+    order = np.lexsort((term_order[indices], -data, row_of))
+    position = np.arange(len(order)) - np.repeat(indptr[:-1], np.diff(indptr))
+    keep = order[position < MAX_VECTOR_TERMS]
+    keep_rows = row_of[keep]
+    kept = data[keep]
+    norms = np.sqrt(np.bincount(keep_rows, weights=kept * kept, minlength=n))
+    norms[norms == 0] = 1.0
+    kept_indptr = np.concatenate(([0], np.cumsum(np.bincount(keep_rows, minlength=n))))
+    matrix = sparse.csr_matrix((kept / norms[keep_rows], indices[keep], kept_indptr),
+                               shape=(n, max(len(vocab), 1)))
+
+    # MinHash: 每篇文章 x 每格取最小值，再把空格依 Rotation Densification 補上
+    max_df = _max_df(n)
+    mask = (df[indices] >= 2) & (df[indices] <= max_df)
+    term_hash = np.zeros(len(vocab), dtype=np.int64)
+    used = np.unique(indices[mask])
+    term_hash[used] = [_term_hash(terms_by_id[i]) for i in used.tolist()]
+    empty = np.iinfo(np.int64).max
+    bins = np.full((n, NUM_BINS), empty, dtype=np.int64)
+    hashed = term_hash[indices[mask]]
+    np.minimum.at(bins, (row_of[mask], hashed % NUM_BINS), hashed // NUM_BINS)
+
+    dense = bins.copy()
+    missing = bins == empty
+    has_any = ~missing.all(axis=1)
+    for distance in range(1, NUM_BINS):
+        todo = missing & has_any[:, None]
+        if not todo.any():
+            break
+        shifted = np.roll(bins, -distance, axis=1)
+        fill = todo & (shifted != empty)
+        dense[fill] = shifted[fill] + distance * _BIN_STRIDE
+        missing &= ~fill
+    left, right = _lsh_candidates_numpy(np, dense, has_any)
+    sims = np.zeros(len(left))
+    for start in range(0, len(left), COSINE_BATCH):
+        part = slice(start, start + COSINE_BATCH)
+        product = matrix[left[part]].multiply(matrix[right[part]])
+        sims[part] = np.asarray(product.sum(axis=1)).ravel()
+    hit = sims >= min_similarity
+    return list(zip(left[hit].tolist(), right[hit].tolist(), sims[hit].tolist()))
+
+class ContentSimilarity:
+    """
+    內文相似度：TF-IDF 向量 (Cosine) + MinHash LSH 候選。
+    只比較 LSH 分到同一個桶的文章 (以去掉過於常見 / 罕見的詞後的詞集合計算)，不做全部兩兩比較；
+    詞頻以 body 的雜湊快取，內文沒變的文章不用重新切詞。
+    有 NumPy + SciPy 時以稀疏矩陣向量化計算，否則用純 Python 的相同實作。
+    """
+    def __init__(self, articles: List[Article], keys: List[str], config: PublisherConfig,
+                 cache: Optional[Dict[str, Dict[str, Any]]] = None):
+        cache = cache or {}
+        self.vectors: Dict[str, Dict[str, Any]] = {}
+        self.computed = 0
+        docs = []
+        for art in articles:
+            h = body_hash(art.body)
+            if h not in self.vectors:
+                entry = cache.get(h)
+                if entry is None:
+                    entry = {"terms": dict(content_features(art.body))}
+                    self.computed += 1
+                self.vectors[h] = entry
+            docs.append(self.vectors[h]["terms"])
+
+        np = optional_module("numpy")
+        sparse = optional_module("scipy.sparse") if np is not None else None
+        if sparse is not None:
+            similar = _similar_pairs_sparse(docs, config.related_min_similarity, np, sparse)
+        else:
+            similar = _similar_pairs_python(docs, config.related_min_similarity)
+
+        self.neighbors: Dict[str, Dict[str, float]] = {key: {} for key in keys}
+        for i, j, sim in similar:
+            # 四捨五入，NumPy 與純 Python 的浮點誤差不影響同分時的排序
+            sim = round(sim, 12)
+            if keys[i] != keys[j]:
+                self.neighbors[keys[i]][keys[j]] = sim
+                self.neighbors[keys[j]][keys[i]] = sim
+
+def _vectors_context() -> str:
+    raw = json.dumps([VECTORS_VERSION, _TOKEN_RE.pattern])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def load_content_vectors(config: PublisherConfig) -> Optional[Dict[str, Dict[str, Any]]]:
+    path = os.path.join(config.cache_dir, VECTORS_FILENAME)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"  ⚠️ 內文向量快取讀取失敗，重新計算: {e}")
+        return None
+    if data.get("version") != VECTORS_VERSION or data.get("context") != _vectors_context():
+        return None
+    return data.get("vectors", {})
+
+def save_content_vectors(config: PublisherConfig, similarity: ContentSimilarity):
+    """只保存這次用到的向量，刪掉或改寫過的內文不會一直累積"""
+    os.makedirs(config.cache_dir, exist_ok=True)
+    path = os.path.join(config.cache_dir, VECTORS_FILENAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": VECTORS_VERSION, "context": _vectors_context(), "vectors": similarity.vectors},
+                  f, ensure_ascii=False)
+    os.replace(tmp_path, path)
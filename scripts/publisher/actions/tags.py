@@ -0,0 +1,147 @@
+import re
+import json
+import hashlib
+import pkgutil
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Tuple, Any
+
+# 每個標籤字串的清理結果 (多數 KB 的標籤種類遠少於這個數字)
+TAG_CACHE_SIZE = 8192
+DEFAULT_RULES_RESOURCE = "tag_rules.json"
+
+_PART_SPLIT_RE = re.compile(r'[- ]+')
+_ASCII_WORD_RE = re.compile(r'^[a-zA-Z0-9]+$')
+
+# 本次執行各規則命中次數 ("blacklist:xxx" / "rename:xxx" / "prefix:xxx")
+rule_hits: Counter = Counter()
+_rules: Dict[str, "TagRules"] = {}
+
+class TagRules:
+    """
+    標籤清理規則 (黑名單、改名、複合標籤前綴)。
+    前綴編成一棵小寫 Trie，一次走訪就找出所有符合的前綴；
+    單一標籤的結果放在 LRU Cache，同樣的標籤字串只清理一次。
+    """
+    def __init__(self, data: Dict[str, Any]):
+        self.blacklist = {str(t).lower() for t in data.get("blacklist", [])}
+        self.renames = {str(k).lower(): str(v) for k, v in data.get("renames", {}).items()}
+        self.prefixes = [str(p) for p in data.get("prefixes", []) if p]
+        self.digest = hashlib.sha1(json.dumps(
+            [sorted(self.blacklist), self.renames, self.prefixes], ensure_ascii=False, sort_keys=True
+        ).encode("utf-8")).hexdigest()
+
+        # 每個節點: {字元: 子節點, "": [(順序, 原始前綴), ...]}
+        self._trie: Dict[str, Any] = {}
+        for rank, prefix in enumerate(self.prefixes):
+            node = self._trie
+            for ch in prefix.lower():
+                node = node.setdefault(ch, {})
+            node.setdefault("", []).append((rank, prefix))
+
+        self.normalize = lru_cache(maxsize=TAG_CACHE_SIZE)(self._normalize)
+
+    def _split_prefix(self, tag: str) -> Tuple[List[str], str]:
+        """
+        複合標籤拆分: Logseq筆記法 -> Logseq, 筆記法 (只拆一次)。
+        多個前綴都符合時取規則中排在最前面的，與逐一檢查前綴的結果相同。
+        """
+        matches = []
+        node = self._trie
+        for ch in tag.lower():
+            node = node.get(ch)
+            if node is None:
+                break
+            matches.extend(node.get("", ()))
+        for _, prefix in sorted(matches):
+            if len(tag) > len(prefix):
+                suffix = tag[len(prefix):].lstrip("- _")
+                if suffix:
+                    return [prefix, suffix], prefix
+        return [tag], ""
+
+    def _normalize(self, tag: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """單一標籤 -> (清理後的標籤, 命中的規則)"""
+        t = tag.strip()
+        if not t:
+            return (), ()
+        # 移除開頭 #
+        t = t.lstrip("#")
+
+        # basic check
+        if t.lower() in self.blacklist:
+            return (), (f"blacklist:{t.lower()}",)
+
+        fired = []
+        split_tags, prefix = self._split_prefix(t)
+        if prefix:
+            fired.append(f"prefix:{prefix}")
+
+        result = []
+        for sub_tag in split_tags:
+            st = sub_tag.strip()
+            if not st:
+                continue
+
+            # Check Rename
+            if st.lower() in self.renames:
+                fired.append(f"rename:{st.lower()}")
+                st = self.renames[st.lower()]
+
+            # Normalization: 以 - 或空白分割，純小寫英數字的部分字首大寫
+            parts = _PART_SPLIT_RE.split(st)
+            final_tag = "".join(p.capitalize() if _ASCII_WORD_RE.match(p) and p.islower() else p for p in parts)
+
+            # Final check
+            if final_tag.lower() in self.blacklist:
+                fired.append(f"blacklist:{final_tag.lower()}")
+                continue
+            result.append(final_tag)
+        return tuple(result), tuple(fired)
+
+    def clean(self, tags: List[str]) -> List[str]:
+        cleaned = []
+        seen = set()
+        for tag in tags:
+            normalized, fired = self.normalize(str(tag))
+            if fired:
+                rule_hits.update(fired)
+            for final_tag in normalized:
+                if final_tag not in seen:
+                    cleaned.append(final_tag)
+                    seen.add(final_tag)
+        return cleaned
+
+def _read_rules(path: str) -> Dict[str, Any]:
+    if not path:
+        # 內建規則隨套件發佈 (zipapp 內也讀得到)
+        return json.loads(pkgutil.get_data("publisher", DEFAULT_RULES_RESOURCE).decode("utf-8"))
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            from .frontmatter import yaml_loader
+            import yaml
+            return yaml.load(f, Loader=yaml_loader()) or {}
+        return json.load(f)
+
+def load_tag_rules(path: str = "") -> TagRules:
+    """依路徑快取 (空字串 = 內建規則)，整個行程只讀取、編譯一次"""
+    rules = _rules.get(path)
+    if rules is None:
+        rules = _rules[path] = TagRules(_read_rules(path))
+    return rules
+
+def drain_rule_hits() -> Dict[str, int]:
+    """取出並清空本行程累積的規則命中次數 (Worker 行程回報給主行程用)"""
+    hits = dict(rule_hits)
+    rule_hits.clear()
+    return hits
+
+def format_tag_rule_report(hits: Dict[str, int], rules: TagRules) -> str:
+    lines = ["", "🏷️  標籤規則命中次數 (本次重新 Enrich 的文章)"]
+    if not hits:
+        lines.append("  (沒有規則命中)")
+    for rule, count in sorted(hits.items(), key=lambda kv: (-kv[1], kv[0])):
+        lines.append(f"  {count:>6}  {rule}")
+    info = rules.normalize.cache_info()
+    lines.append(f"  LRU: {info.hits} 命中 / {info.misses} 未命中 ({info.currsize} 個標籤)")
+    return "\n".join(lines)
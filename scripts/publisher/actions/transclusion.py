@@ -0,0 +1,222 @@
+import re
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from ..contracts.types import BlockIndex, PublisherConfig
+from .parser import read_source_bytes, decode_source
+from .block_index import block_tags_map
+
+# 行內 Code 原樣保留；其餘依序比對 {{embed ((uuid))}}、{{embed [[頁面]]}}、((uuid))
+_TRANSCLUSION_RE = re.compile(
+    r'(`+).*?\1'
+    r'|\{\{embed\s+\(\(([a-zA-Z0-9-]+)\)\)\s*\}\}'
+    r'|\{\{embed\s+\[\[(.+?)\]\]\s*\}\}'
+    r'|\(\(([a-zA-Z0-9-]+)\)\)'
+)
+# 整行只有一個 embed 時展開成子大綱，而不是行內文字
+_EMBED_LINE_RE = re.compile(r'^(\s*)(?:- )?\{\{embed\s+(?:\(\(([a-zA-Z0-9-]+)\)\)|\[\[(.+?)\]\])\s*\}\}\s*$')
+_PAGE_PROPERTY_RE = re.compile(r'^[a-zA-Z0-9_-]+::')
+_SYSTEM_PROPERTY_RE = re.compile(r'^(collapsed|id|logseq\.[a-z]+)::\s')
+
+def has_transclusions(text: str) -> bool:
+    return "((" in text or "{{embed" in text
+
+class Transcluder:
+    """
+    以全圖譜 Block 索引展開 ((uuid)) 與 {{embed}}。
+    每個 Block / 頁面的完整展開只算一次 (與被嵌入的深度無關)，被 50 篇文章嵌入的 Block 也只渲染一次；
+    縮排在嵌入的位置才加上。遇到循環或超過 max_depth 時保留原始語法。
+    TagsBlock 的 Block 是標籤引用 (由 Enrich 轉成標籤)，不展開。
+    """
+    def __init__(self, index: BlockIndex, config: PublisherConfig):
+        self.index = index
+        self.max_depth = config.transclusion_max_depth
+        self._tag_keys = {f"block:{uuid}" for uuid in block_tags_map(index, config)}
+        # (key, inline) -> (完整展開結果, 依賴的 key, 需要的深度)
+        self._memo: Dict[Tuple[str, bool], Tuple[Optional[str], Set[str], int]] = {}
+        # 被深度截斷的結果只對同一個剩餘深度有效
+        self._truncated_memo: Dict[Tuple[str, bool, int], Tuple[Optional[str], Set[str]]] = {}
+        self._pages: Dict[str, str] = {}
+        self._bodies: Dict[str, Tuple[str, Set[str]]] = {}
+        self._active: Set[str] = set()
+        self._cycle_hit = False
+        self._truncated = False
+        self._height = 0
+
+    # --- 來源內容 ---
+
+    def _page_file(self, name: str) -> Optional[str]:
+        return self.index.pages.get(name.strip().lower())
+
+    def _page_outline(self, file_key: str) -> str:
+        """頁面原文去掉頁首屬性與系統屬性，Tab 轉成兩個空白 (同一次執行只讀一次)"""
+        if file_key not in self._pages:
+            raw = read_source_bytes(Path(file_key))
+            try:
+                content = decode_source(raw) if raw is not None else ""
+            except UnicodeDecodeError:
+                content = ""
+            lines = []
+            for line in content.split("\n"):
+                stripped = line.strip()
+                if not stripped:
+                    continue
+                if not lines and not stripped.startswith("-") and _PAGE_PROPERTY_RE.match(stripped):
+                    continue
+                if _SYSTEM_PROPERTY_RE.match(stripped):
+                    continue
+                body = line.lstrip(" \t")
+                lines.append(line[:len(line) - len(body)].expandtabs(2) + body)
+            self._pages[file_key] = "\n".join(lines)
+        return self._pages[file_key]
+
+    def _exists(self, key: str) -> bool:
+        kind, _, name = key.partition(":")
+        if kind == "block":
+            return name in self.index.blocks
+        return self._page_file(name) is not None
+
+    def _source(self, key: str, inline: bool) -> Optional[str]:
+        kind, _, name = key.partition(":")
+        if kind == "block":
+            entry = self.index.blocks.get(name)
+            if entry is None:
+                return None
+            return entry["text"].split("\n", 1)[0] if inline else entry["outline"]
+        file_key = self._page_file(name)
+        if file_key is None:
+            return None
+        return self._page_outline(file_key)
+
+    def signature(self, key: str) -> str:
+        """依賴節點的內容摘要 (給相依圖判斷文章是否要重新產生)"""
+        kind, _, name = key.partition(":")
+        if kind == "block":
+            payload = self.index.blocks.get(name)
+        else:
+            file_key = self._page_file(name)
+            record = self.index.files.get(file_key) if file_key else None
+            payload = [file_key, record["mtime_ns"], record["size"]] if record else None
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    # --- 展開 ---
+
+    def _resolve(self, key: str, inline: bool, depth: int) -> Tuple[Optional[str], Set[str]]:
+        """
+        回傳 (展開結果, 依賴的 key)。
+        self._height 記錄完整展開需要的深度 (巢狀幾層)，剩餘深度足夠時直接沿用完整展開的結果；
+        self._truncated / self._cycle_hit 記錄結果是否被深度或循環截斷。
+        """
+        if key in self._tag_keys:
+            return None, set()
+        if key in self._active:
+            self._cycle_hit = True
+            return None, set()
+        full = self._memo.get((key, inline))
+        # 子樹中有正在展開的 Block 時，這條路徑上會被循環截斷，不能沿用
+        if full is not None and full[2] <= depth and self._active.isdisjoint(full[1]):
+            self._height = max(self._height, full[2])
+            return full[0], full[1]
+        if depth <= 0:
+            # 找不到的 Block 在任何深度都保留原樣，不算截斷
+            if self._exists(key):
+                self._truncated = True
+                return None, set()
+            return None, {key}
+        truncated = self._truncated_memo.get((key, inline, depth))
+        if truncated is not None and self._active.isdisjoint(truncated[1]):
+            self._truncated = True
+            return truncated
+
+        source = self._source(key, inline)
+        deps = {key}
+        if source is None:
+            return None, deps
+
+        outer = (self._cycle_hit, self._truncated, self._height)
+        self._cycle_hit = self._truncated = False
+        self._height = 0
+        self._active.add(key)
+        try:
+            expanded, inner = self._expand(source, depth - 1)
+        finally:
+            self._active.discard(key)
+        deps |= inner
+        height = self._height + 1
+        # 被循環截斷的結果取決於呼叫路徑，不能重複使用
+        if not self._cycle_hit:
+            if self._truncated:
+                self._truncated_memo[(key, inline, depth)] = (expanded, deps)
+            else:
+                self._memo[(key, inline)] = (expanded, deps, height)
+        self._cycle_hit = self._cycle_hit or outer[0]
+        self._truncated = self._truncated or outer[1]
+        self._height = max(outer[2], height)
+        return expanded, deps
+
+    def _expand_inline(self, line: str, depth: int, deps: Set[str]) -> str:
+        def replace(match):
+            if match.group(1):
+                return match.group(0)
+            if match.group(2) or match.group(4):
+                key = "block:" + (match.group(2) or match.group(4))
+                # 行內只放 Block 第一行，保持原本的行結構
+                text, used = self._resolve(key, True, depth)
+            else:
+                key = "page:" + match.group(3)
+                text, used = self._resolve(key, True, depth)
+                if text is not None:
+                    text = text.split("\n", 1)[0]
+                    text = text[2:] if text.startswith("- ") else text
+            deps.update(used)
+            return match.group(0) if text is None else text
+        return _TRANSCLUSION_RE.sub(replace, line)
+
+    def _expand(self, text: str, depth: int) -> Tuple[str, Set[str]]:
+        deps: Set[str] = set()
+        if not has_transclusions(text):
+            return text, deps
+        out = []
+        in_code = False
+        for line in text.split("\n"):
+            if "```" in line and line.count("```") % 2 == 1:
+                in_code = not in_code
+                out.append(line)
+                continue
+            if in_code or not has_transclusions(line):
+                out.append(line)
+                continue
+            embed = _EMBED_LINE_RE.match(line)
+            if embed:
+                key = f"block:{embed.group(2)}" if embed.group(2) else f"page:{embed.group(3)}"
+                outline, used = self._resolve(key, False, depth)
+                deps |= used
+                if outline:
+                    indent = embed.group(1)
+                    embedded = outline.split("\n")
+                    # 頁面內容不一定以 "- " 開頭，補上讓它成為一個子大綱
+                    if not embedded[0].startswith("-"):
+                        embedded[0] = "- " + embedded[0]
+                    out.extend(indent + l for l in embedded)
+                    continue
+            out.append(self._expand_inline(line, depth, deps))
+        return "\n".join(out), deps
+
+    def _expand_body(self, body: str) -> Tuple[str, Set[str]]:
+        # 相依圖與輸出都會用到同一篇文章的展開結果
+        if body not in self._bodies:
+            self._bodies[body] = self._expand(body, self.max_depth)
+        return self._bodies[body]
+
+    def expand(self, body: str) -> str:
+        if not body or not has_transclusions(body):
+            return body
+        return self._expand_body(body)[0]
+
+    def dependencies(self, body: str) -> List[str]:
+        """展開 body 會用到的所有 Block / 頁面 (含巢狀)"""
+        if not body or not has_transclusions(body):
+            return []
+        return sorted(self._expand_body(body)[1])
@@ -1,6 +1,9 @@
 import re
 import os
 from typing import List
+from .tags import TagRules, load_tag_rules
+
+_WIKILINK_RE = re.compile(r'\[\[(.*?)\]\]')
 
 def sanitize_content_links(text: str, for_quartz: bool = True) -> str:
     """
@@ -8,7 +11,7 @@ def sanitize_content_links(text: str, for_quartz: bool = True) -> str:
     1. 移除 [["Title"]] 內部的多餘引號，避免 404
     2. 如果 for_quartz=True: 將空格轉為 - 以符合 Quartz Slug 邏輯
     """
-    if not text:
+    if not text or "[[" not in text:
         return text
 
     def clean_link_content(match):
@@ -30,7 +33,7 @@ def sanitize_content_links(text: str, for_quartz: bool = True) -> str:
         return f'[[{content}]]'
 
     # 使用 Regex 匹配所有 [[...]] 並清理其內容
-    text = re.sub(r'\[\[(.*?)\]\]', clean_link_content, text)
+    text = _WIKILINK_RE.sub(clean_link_content, text)
     
     return text
 
@@ -53,93 +56,11 @@ def get_safe_path_elements(title: str, categories: str):
     
     return safe_cat, safe_title
 
-def clean_tags(tags: List[str]) -> List[str]:
+def clean_tags(tags: List[str], rules: TagRules = None) -> List[str]:
     """
     集中清理標籤邏輯 (Ported from fix_tags_source.py)
+    規則 (黑名單、改名、複合標籤前綴) 來自 tag_rules.json 或 PublisherConfig.tag_rules_path。
     """
     if not tags:
         return []
-    
-    # 1. Blacklist (全小寫比對)
-    BLACKLIST = {
-        "#", "注意看這行", "這行可以不寫", "", 
-        "h1", "ul", "ol", "listtotable", "centered", "right", "justified", 
-        "outline", "nospace", "imagecaption", "tablecaption", "book100",
-        "simpro", "fusionflow", "日本", "長篇小說", "現實主義", "東京", 
-        "20世紀", "愛情", "精神官能症", "曾改編電影"
-    }
-    
-    # 2. Renames (Canonical Mapping)
-    RENAMES = {
-        "product manager 產品經理": "PM",
-        "product plan 產品企劃": "PM",
-        "product manager": "PM",
-        "product plan": "PM",
-        "remnote教學": "RemNote", 
-    }
-    
-    cleaned = []
-    seen = set()
-    
-    for tag in tags:
-        t = str(tag).strip()
-        if not t: continue
-        
-        # 移除開頭 #
-        t = t.lstrip("#")
-        
-        # basic check
-        if t.lower() in BLACKLIST:
-            continue
-        
-        # 3. Splitting (Atomic Tags: Prefix-based)
-        # 複合標籤拆分: Logseq筆記法 -> Logseq, 筆記法
-        PREFIXES = [
-            "GraphRAG", "Heptabase", "Logseq", "Notion", "RemNote", "Obsidian", "AI"
-        ]
-        
-        split_tags = [t]
-        
-        for p in PREFIXES:
-            # Case-insensitive prefix match
-            # 如果標籤以 Prefix 開頭，且長度大於 Prefix (表示有 Suffix)
-            if t.lower().startswith(p.lower()) and len(t) > len(p):
-                suffix = t[len(p):]
-                # 簡單清理 Suffix 開頭的連接符 (例如 Logseq-custom -> custom)
-                # 但因為之前的步驟移除了連字號? 不，這裡 t 是原始 tag
-                # 如果 suffix 是 "-abc", lstrip 變成 "abc"
-                suffix = suffix.lstrip("- _")
-                
-                if suffix:
-                   split_tags = [p, suffix]
-                   break # 只拆分一次，避免多重拆分邏輯過於複雜
-            
-        for sub_tag in split_tags:
-            st = sub_tag.strip()
-            if not st: continue
-            
-            # Check Rename
-            if st.lower() in RENAMES:
-                st = RENAMES[st.lower()]
-            
-            # 4. Normalization (CamelCase & English-Chinese mixed)
-            # CamelCase 處理：將 - 或 空格 分割的字首大寫
-            parts = re.split(r'[- ]+', st)
-            normalized_parts = []
-            for p in parts:
-                if re.match(r'^[a-zA-Z0-9]+$', p): # 純英文/數字部分
-                    if p.islower():
-                        normalized_parts.append(p.capitalize())
-                    else:
-                        normalized_parts.append(p)
-                else:
-                    normalized_parts.append(p) # 中文或其他
-            
-            final_tag = "".join(normalized_parts)
-            
-            # Final check
-            if final_tag.lower() not in BLACKLIST and final_tag not in seen:
-                cleaned.append(final_tag)
-                seen.add(final_tag)
-                
-    return cleaned
+    return (rules or load_tag_rules()).clean(tags)
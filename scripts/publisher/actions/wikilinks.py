@@ -0,0 +1,105 @@
+from typing import Dict, List, Optional
+from ..contracts.types import Article, PublisherConfig
+from .outline import article_refs, WIKILINK_RE
+
+def _normalize(name: str) -> str:
+    return name.replace('"', '').replace("'", "").strip().replace(" ", "-").casefold()
+
+def link_target(text: str) -> str:
+    """[[連結]] 的內容 -> Quartz 看到的目標: 與 sanitize_content_links 相同的清理 (去引號、| 之後是別名、空格轉 -)"""
+    content = text.replace('"', '').replace("'", "").strip()
+    return content.split("|", 1)[0].replace(" ", "-").strip()
+
+def link_name(text: str) -> str:
+    """比對用名稱 (不分大小寫)；已清理過與原始的連結得到相同結果"""
+    return link_target(text).casefold()
+
+def article_aliases(article: Article) -> List[str]:
+    value = article.frontmatter.get("alias") or article.frontmatter.get("aliases") or []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [str(v).strip().strip("[]") for v in value if str(v).strip()]
+
+def build_link_targets(articles: List[Article], keys: List[str]) -> Dict[str, str]:
+    """名稱 -> 文章 key。標題與輸出檔名優先於 alias；同名時 key 排序在前的文章勝出"""
+    ordered = sorted(zip(keys, range(len(articles))))
+    targets: Dict[str, str] = {}
+    for key, i in ordered:
+        art = articles[i]
+        for name in (str(art.title), art.route.stem):
+            targets.setdefault(_normalize(name), key)
+    for key, i in ordered:
+        for name in article_aliases(articles[i]):
+            targets.setdefault(_normalize(name), key)
+    targets.pop("", None)
+    return targets
+
+# [[連結]] 的寫法: "shortest" = 只清理 (交給 Quartz 以最短路徑搜尋全站), "absolute" = 改寫成文章的完整路徑
+WIKILINK_RESOLUTIONS = ("shortest", "absolute")
+# 解析不到的連結摘要最多列出幾個目標
+UNRESOLVED_REPORT_LIMIT = 20
+
+class WikilinkIndex:
+    """
+    標題 / 輸出檔名 / alias -> 文章完整路徑。
+    rewrite() 把 [[目標|別名]] 改寫成 [[分類/檔名|別名]]，Quartz 不必再為每個連結搜尋全站；
+    解析不到的連結保留原樣，由 unresolved() 彙整成一份摘要。
+    """
+    def __init__(self, articles: List[Article]):
+        keys = [a.route.output_path for a in articles]
+        paths = {key: a.route.path for key, a in zip(keys, articles)}
+        self.paths: Dict[str, str] = {name: paths[key] for name, key in build_link_targets(articles, keys).items()}
+
+    def resolve(self, target: str) -> Optional[str]:
+        return self.paths.get(link_name(target))
+
+    def rewrite(self, text: str) -> str:
+        if not text or "[[" not in text:
+            return text
+
+        def resolve_link(match):
+            target, sep, alias = match.group(1).partition("|")
+            path = self.resolve(target)
+            if path is None:
+                return match.group(0)
+            # 沒有別名時保留原本顯示的文字
+            return f"[[{path}|{alias if sep else target}]]"
+
+        return WIKILINK_RE.sub(resolve_link, text)
+
+    def resolved_links(self, article: Article) -> List[List[Optional[str]]]:
+        """文章內每個連結目標解析到的路徑 (相依圖用: 被連結的文章搬家時要重新產生)"""
+        names = sorted({link_name(text) for text in article_refs(article)["links"]} - {""})
+        return [[name, self.paths.get(name)] for name in names]
+
+    def unresolved(self, articles: List[Article]) -> Dict[str, List[str]]:
+        """解析不到的連結目標 -> 用到它的文章標題"""
+        missing: Dict[str, List[str]] = {}
+        for art in articles:
+            seen = set()
+            for text in article_refs(art)["links"]:
+                target = link_target(text)
+                name = target.casefold()
+                if name and name not in self.paths and name not in seen:
+                    seen.add(name)
+                    missing.setdefault(target, []).append(str(art.title))
+        return missing
+
+def build_wikilink_index(articles: List[Article], config: PublisherConfig) -> Optional[WikilinkIndex]:
+    """wikilink_resolution 為 "shortest" 時不改寫連結，回傳 None"""
+    if config.wikilink_resolution not in WIKILINK_RESOLUTIONS:
+        raise ValueError(f"wikilink_resolution 必須是 {', '.join(WIKILINK_RESOLUTIONS)} 其中之一: {config.wikilink_resolution!r}")
+    if config.wikilink_resolution == "shortest":
+        return None
+    return WikilinkIndex(articles)
+
+def format_unresolved_report(missing: Dict[str, List[str]]) -> str:
+    total = sum(len(sources) for sources in missing.values())
+    lines = [f"⚠️ {len(missing)} 個 [[連結]] 目標找不到對應的文章 (共 {total} 處，保留原樣):"]
+    ranked = sorted(missing.items(), key=lambda kv: (-len(kv[1]), kv[0]))
+    for target, sources in ranked[:UNRESOLVED_REPORT_LIMIT]:
+        shown = ", ".join(sources[:3]) + (f" 等 {len(sources)} 篇" if len(sources) > 3 else "")
+        lines.append(f"  [[{target}]] ← {shown}")
+    if len(ranked) > UNRESOLVED_REPORT_LIMIT:
+        lines.append(f"  ... 還有 {len(ranked) - UNRESOLVED_REPORT_LIMIT} 個")
+    return "\n".join(lines)
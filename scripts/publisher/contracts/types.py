@@ -1,6 +1,21 @@
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Any
 
+@dataclass(frozen=True)
+class ArticleRoute:
+    """
+    文章在網站上的位置，輸出路徑與短網址確定 (resolve_collisions 之後) 時計算一次，
+    各階段產生連結 / 轉址都讀這裡，不再各自由標題與分類重算。
+    """
+    category: str      # 分類目錄 ("" = 根目錄)
+    title: str         # 清理過的檔名 (不含衝突後綴)
+    stem: str          # 輸出檔名去掉 .md (含衝突後綴)，也是最短路徑連結的目標
+    path: str          # 分類/檔名 (完整路徑連結的目標)
+    output_path: str   # 相對於 quartz_content_dir 的輸出檔
+    url_path: str      # /分類/檔名
+    url: str           # url_path 的百分比編碼
+    short_hash: str    # /p/<short_hash> 短網址
+
 @dataclass
 class Article:
     title: str
@@ -12,12 +27,36 @@ class Article:
     # Target path info
     target_dir: str = ""
     filename: str = ""
+    path_suffix: str = ""  # 輸出路徑衝突時加上的後綴 (例如 "-2")，連結也要跟著加
     
     # Enriched metadata
     slug: str = ""
     date: str = ""
+    section: str = ""  # 由符合的發佈標記決定 (預設分區為空字串)
     tags: List[str] = field(default_factory=list)
     categories: str = "Uncategorized"
+    short_hash: str = ""  # /p/<short_hash> 短網址 (已排除衝突)
+    route: Optional[ArticleRoute] = None  # 由 assign_routes 在衝突處理後設定
+
+    # 解析時從 Block 樹一次取出的引用 (inline_tags / block_refs / images / links)
+    refs: Dict[str, List[str]] = field(default_factory=dict)
+
+class BlockNode:
+    """
+    大綱中的一個 Block (對應 body 的一行)。
+    level 為輸出縮排層級，marker 為 "- " 或 "  "；fence 只在開頭的 ``` 行上記錄語言。
+    """
+    __slots__ = ("content", "level", "marker", "properties", "children", "fence", "in_code")
+
+    def __init__(self, content: str, level: int = 0, marker: str = "- ",
+                 fence: Optional[str] = None, in_code: bool = False):
+        self.content = content
+        self.level = level
+        self.marker = marker
+        self.properties: Dict[str, str] = {}
+        self.children: List["BlockNode"] = []
+        self.fence = fence
+        self.in_code = in_code
 
 @dataclass
 class PublisherConfig:
@@ -25,3 +64,57 @@ class PublisherConfig:
     quartz_content_dir: str = "./quartz/content"
     publish_uuid: str = "dc0b4d96-f96f-4c1b-9d35-e1a5de79d979"
     max_asset_size_mb: int = 25
+    # 發佈標記 -> 分區。分區會成為沒有設定 categories 的文章的預設分類
+    # (publish_uuid 永遠是預設分區的標記)
+    publish_markers: Dict[str, str] = field(default_factory=lambda: {"++/publish": ""})
+    # 含有取消發佈標記的 Block 不會被發佈 (即使也有發佈標記)
+    unpublish_markers: List[str] = field(default_factory=lambda: ["++/unpublish"])
+    cache_dir: str = "./.publisher-cache"
+    # 相關文章: 最多幾篇，共同標籤 / 共同分類各得幾分
+    max_related: int = 5
+    related_tag_weight: int = 3
+    related_category_weight: int = 1
+    # 相關文章引擎: "tags" = 標籤 / 分類, "content" = 內文相似度 (TF-IDF + MinHash LSH),
+    # "links" = [[連結]] 圖 (共被引 / 書目耦合 / Personalized PageRank), "blend" = 三者相加
+    related_engine: str = "tags"
+    # 內文 Cosine 相似度 (0~1) 乘上的分數，以及低於多少不算相關
+    related_content_weight: float = 6.0
+    related_min_similarity: float = 0.1
+    # 連結分數乘上的分數 (blend 模式設為 0 = 不看連結)
+    related_link_weight: float = 2.0
+    # 在文章最後加上「被引用於」(連到這篇文章的其他文章)；預設關閉，輸出與原本相同
+    backlinks_section: bool = False
+    # [[連結]] 的寫法: "shortest" = 只清理 (交給 Quartz 以最短路徑搜尋全站),
+    # "absolute" = 改寫成文章的完整路徑 (分類/檔名)，解析不到的連結彙整成一份摘要
+    wikilink_resolution: str = "shortest"
+    # 輸出路徑 / Slug / 短網址衝突: "warn" = 加後綴並警告, "error" = 列出衝突後中止
+    collision_policy: str = "warn"
+    # 輸出路徑比對是否不分大小寫 (A.md 與 a.md 算衝突)；None = 依輸出目錄的檔案系統自動偵測
+    collision_case_insensitive: Optional[bool] = None
+    # 標籤清理規則 (JSON / YAML)，空字串 = 內建的 publisher/tag_rules.json
+    tag_rules_path: str = ""
+    # ((uuid)) / {{embed}} 巢狀展開的最大深度，超過時保留原始語法
+    transclusion_max_depth: int = 5
+    write_workers: int = 8
+    
+    # Source discovery (ignore rules)
+    source_subdirs: List[str] = field(default_factory=lambda: ["journals", "pages"])
+    ignored_dirs: List[str] = field(default_factory=lambda: ["Uncategorized"])
+    ignored_name_prefixes: List[str] = field(default_factory=lambda: [">", "!"])
+    max_filename_length: int = 100
+
+@dataclass
+class DependencyGraph:
+    # 輸出檔 (相對路徑或彙總頁名稱) -> {"sources": [...], "inputs": [...]}
+    outputs: Dict[str, Dict[str, List[str]]] = field(default_factory=dict)
+    # 輸入節點 ("article:..." / "related:..." / "backlinks:..." / "wikilinks:..." / "agg:...") -> 內容摘要
+    signatures: Dict[str, str] = field(default_factory=dict)
+
+@dataclass
+class BlockIndex:
+    # 來源檔 -> {"mtime_ns", "size", "page", "aliases", "blocks": {uuid: entry}}
+    files: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # uuid -> {"page", "file", "text", "parents", "outline"} (由 files 彙整，不另外保存)
+    blocks: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # 頁面名稱 / alias (小寫) -> 來源檔
+    pages: Dict[str, str] = field(default_factory=dict)
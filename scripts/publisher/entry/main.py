@@ -1,91 +1,209 @@
 import os
 import sys
+import argparse
 from pathlib import Path
 from ..contracts.types import PublisherConfig
-from ..actions.utils import get_safe_path_elements
-from ..actions.parser import parse_logseq_file
-from ..actions.enricher import load_uuid_tags_map, enrich_article_metadata
-from ..actions.fs import prepare_output_directories, write_article, clean_output_directory, copy_assets
-from ..actions.dashboard import generate_dashboard
-from ..actions.archive import generate_archive, generate_tags_page
-from ..actions.redirects import generate_redirects
-
-def main():
-    print("🚀 啟動 Logseq Block-Publish Agent (Atomic V2)...")
-    config = PublisherConfig()
-    
-    prepare_output_directories(config)
-    
-    search_dirs = [Path(config.logseq_dir) / "journals", Path(config.logseq_dir) / "pages"]
-    all_md_files = []
-    
-    for d in search_dirs:
-        if d.exists():
-            for f in d.rglob("*.md"):
-                if "Uncategorized" in f.parts: continue
-                if len(f.name) > 100: continue
-                if f.name.startswith(">") or f.name.startswith("!"): continue
-                all_md_files.append(f)
-                
+from ..actions.block_index import load_block_index, update_block_index, save_block_index, block_tags_map
+from ..actions.transclusion import Transcluder
+from ..actions.tags import load_tag_rules, drain_rule_hits, format_tag_rule_report
+from ..actions.collisions import check_collisions, case_insensitive_paths
+from ..actions.related import build_related_index, save_related_cache
+from ..actions.backlinks import build_backlink_index
+from ..actions.wikilinks import build_wikilink_index, format_unresolved_report
+from ..actions.cache import compute_build_context, load_build_manifest, save_build_manifest, lookup_cached_articles
+from ..actions.discovery import discover_source_files
+from ..actions.pipeline import parse_and_enrich_files, resolve_jobs, assign_output_paths, assign_routes, output_rel_path, build_tag_index, generate_site_pages
+from ..actions.depgraph import build_dependency_graph, find_dirty_outputs, load_dependency_graph, save_dependency_graph
+from ..actions.fs import prepare_output_directories, write_articles, clean_output_directory, copy_assets
+from ..actions.profiling import PhaseProfiler, write_profile_report, format_profile_summary
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Logseq Block-Publish Agent")
+    parser.add_argument("--full", action="store_true", help="忽略 Manifest 快取，重新解析所有檔案")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="平行解析的行程數 (0 = 所有 CPU 核心，預設 1 = 序列執行)")
+    parser.add_argument("--write-workers", type=int, default=None, help="寫入文章的執行緒數 (預設使用 PublisherConfig.write_workers，1 = 序列寫入)")
+    parser.add_argument("--watch", action="store_true", help="發佈後持續監看 KB 目錄，只重新發佈受影響的文章")
+    parser.add_argument("--interval", type=float, default=1.0, help="Watch 模式的輪詢間隔秒數")
+    parser.add_argument("--debounce", type=float, default=0.5, help="Watch 模式等待連續存檔平息的秒數")
+    parser.add_argument("--profile", action="store_true", help="記錄各階段耗時，輸出 JSON 報告與摘要")
+    parser.add_argument("--profile-out", default=None, help="效能報告 JSON 路徑 (預設 <cache_dir>/profile.json)")
+    parser.add_argument("--profile-top", type=int, default=10, help="報告中列出最慢的 N 個來源檔")
+    parser.add_argument("--tracemalloc", action="store_true", help="搭配 --profile 記錄每個階段的記憶體峰值")
+    parser.add_argument("--cprofile", default=None, metavar="PATH", help="以 cProfile 執行並輸出 pstats 檔")
+    parser.add_argument("--plan", action="store_true", help="只列出會新增/更新/刪除哪些檔案，不寫入磁碟")
+    parser.add_argument("--tag-report", action="store_true", help="列出標籤清理規則的命中次數 (搭配 --full 可涵蓋所有文章)")
+    args = parser.parse_args(argv)
+    if args.plan and args.watch:
+        parser.error("--plan 不能與 --watch 一起使用")
+    return args
+
+def publish(config: PublisherConfig, args, profiler: PhaseProfiler):
+    if not args.plan:
+        prepare_output_directories(config)
+
+    with profiler.phase("scan") as ph:
+        source_stats = discover_source_files(config)
+        all_md_files = list(source_stats)
+        ph["items"] = len(all_md_files)
     print(f"📂 掃描 {len(all_md_files)} 個檔案...")
-    
-    uuid_map = load_uuid_tags_map(config.logseq_dir)
-    articles_to_publish = []
-    expected_output_files = set()
-    
+
+    with profiler.phase("block_index", len(all_md_files)) as ph:
+        # 全圖譜的 id:: Block 索引，只重新掃描 mtime / size 改變的檔案
+        previous_index = None if args.full else load_block_index(config)
+        block_index, rescanned = update_block_index(previous_index, source_stats)
+        if not args.plan:
+            save_block_index(config, block_index)
+        uuid_map = block_tags_map(block_index, config)
+        ph["rescanned"] = rescanned
+
+    with profiler.phase("load_manifest"):
+        build_context = compute_build_context(config, uuid_map)
+        manifest = {} if args.full else load_build_manifest(config, build_context)
+    new_manifest = {}
+
     # Parse & Enrich Plan
+    with profiler.phase("cache_lookup", len(all_md_files)) as ph:
+        cached_results = {}
+        for f in all_md_files:
+            cached = lookup_cached_articles(manifest.get(str(f)), f, source_stats[f])
+            if cached is not None:
+                cached_results[f] = cached
+        ph["hits"] = len(cached_results)
+
+    stale_files = [f for f in all_md_files if f not in cached_results]
+    jobs = resolve_jobs(args.jobs)
+    if jobs > 1 and stale_files:
+        print(f"⚙️  使用 {jobs} 個行程平行解析 {len(stale_files)} 個檔案...")
+    file_timings = {} if profiler.enabled else None
+    with profiler.phase("parse_enrich", len(stale_files)):
+        fresh_results = dict(zip(stale_files, parse_and_enrich_files(stale_files, config, uuid_map, jobs=jobs, timings=file_timings, stats=source_stats)))
+    if file_timings:
+        profiler.record_files(file_timings)
+
+    results_by_file = {}
+    articles_to_publish = []
     for f in all_md_files:
-        found_articles = parse_logseq_file(f, config)
-        for art in found_articles:
-            enrich_article_metadata(art, uuid_map)
-            
-            # Draft check
-            is_draft = str(art.frontmatter.get("draft", "false")).lower() == "true"
-            if is_draft: continue
-            
-            # Path Logic
-            safe_cat, safe_title = get_safe_path_elements(art.title, art.categories)
-            filename = f"{safe_title}.md"
-            
-            if "關於我" in art.title and "About" in art.title:
-                filename = "about.md"
-                safe_cat = ""
-                
-            art.target_dir = safe_cat
-            art.filename = filename
-            
-            articles_to_publish.append(art)
-            expected_output_files.add(os.path.join(safe_cat, filename))
-            
+        key = str(f)
+        if f in cached_results:
+            found_articles = cached_results[f]
+            new_manifest[key] = manifest[key]
+        else:
+            found_articles, new_manifest[key] = fresh_results[f]
+
+        results_by_file[f] = found_articles
+        articles_to_publish.extend(assign_output_paths(found_articles))
+
+    # 輸出路徑 / Slug / 短網址衝突: 每篇文章只能有一個寫入目標
+    if not check_collisions(articles_to_publish, config.collision_policy, case_insensitive_paths(config)):
+        print("❌ collision_policy = error，中止發佈")
+        sys.exit(1)
+    assign_routes(articles_to_publish)
+
+    expected_output_files = {output_rel_path(art) for art in articles_to_publish}
+    # 彙總頁面只在輸入改變時重新產生，清理時不能當成過期檔案刪掉
+    expected_output_files.update(["archive.md", "all-tags.md"])
+
+    if not args.plan:
+        with profiler.phase("save_manifest", len(new_manifest)):
+            save_build_manifest(config, new_manifest, build_context)
+    print(f"♻️  快取命中 {len(cached_results)} 個檔案, 重新解析 {len(stale_files)} 個")
+    if args.tag_report:
+        print(format_tag_rule_report(drain_rule_hits(), load_tag_rules(config.tag_rules_path)))
     print(f"📝 準備發佈 {len(articles_to_publish)} 篇文章...")
-    
-    # Build Tag Index
-    tag_index = {}
-    for art in articles_to_publish:
-        for t in art.tags:
-            if t not in tag_index: tag_index[t] = []
-            tag_index[t].append(art)
-            
+
+    # ((uuid)) / {{embed}} 展開: 同一次發佈共用 memo
+    transcluder = Transcluder(block_index, config)
+
+    backlinks = None
+    if config.backlinks_section:
+        with profiler.phase("backlinks", len(articles_to_publish)):
+            # 被引用於: 解析時取出的 [[連結]] -> 反向索引
+            backlinks = build_backlink_index(articles_to_publish)
+
+    wikilinks = build_wikilink_index(articles_to_publish, config)
+    if wikilinks is not None:
+        # [[連結]] 改寫成完整路徑；解析不到的連結一次列出
+        missing = wikilinks.unresolved(articles_to_publish)
+        if missing:
+            print(format_unresolved_report(missing))
+
+    if args.plan:
+        # Plan 模式: 在記憶體中渲染全部輸出並與磁碟比對，不寫入、不刪除、不複製 Assets
+        from ..actions.plan import plan_publish, format_plan
+        with profiler.phase("plan", len(articles_to_publish)):
+            related = build_related_index(articles_to_publish, build_tag_index(articles_to_publish), config, full=args.full)
+            plan = plan_publish(articles_to_publish, related, config, expected_output_files, transcluder,
+                                backlinks, wikilinks)
+        print(format_plan(plan))
+        return None
+
+    with profiler.phase("related", len(articles_to_publish)) as ph:
+        # 相關文章: 倒排索引 + Top-k，Signature 的輸入沒變就沿用上次的排名 (內文向量依 body 雜湊快取)
+        related = build_related_index(articles_to_publish, build_tag_index(articles_to_publish), config, full=args.full)
+        ph["reused"] = related.reused
+        if related.content is not None:
+            ph["vectors_computed"] = related.content.computed
+        if related.links is not None:
+            ph["link_edges"] = related.links.edges
+
+    with profiler.phase("dependency_graph", len(articles_to_publish)):
+        # Dependency Graph: 只重新產生輸入有變的輸出
+        dep_graph = build_dependency_graph(results_by_file, articles_to_publish, related, config, transcluder,
+                                           backlinks, wikilinks)
+        previous_graph = None if args.full else load_dependency_graph(config, build_context)
+        dirty_outputs = find_dirty_outputs(dep_graph, previous_graph, config)
+
     # Write Content
-    updated_count = 0
-    skipped_count = 0
-    for art in articles_to_publish:
-        if write_article(art, config, tag_index):
-            updated_count += 1
-        else:
-            skipped_count += 1
-            
+    with profiler.phase("write_article", len(articles_to_publish)) as ph:
+        dirty_articles = [art for art in articles_to_publish if output_rel_path(art) in dirty_outputs]
+        updated_count, skipped_count = write_articles(dirty_articles, config, related, workers=args.write_workers,
+                                                      transcluder=transcluder, backlinks=backlinks,
+                                                      wikilinks=wikilinks)
+        skipped_count += len(articles_to_publish) - len(dirty_articles)
+        ph["updated"] = updated_count
+
     print(f"✅ 完成同步: 更新 {updated_count} 篇, 跳過 {skipped_count} 篇")
-    
-    clean_output_directory(config, expected_output_files)
-    copy_assets(config)
-    
-    generate_dashboard(articles_to_publish, config)
-    generate_archive(articles_to_publish, config)
-    generate_tags_page(articles_to_publish, config)
-    generate_redirects(articles_to_publish, config)
-    
+
+    with profiler.phase("clean_output_directory"):
+        clean_output_directory(config, expected_output_files)
+    with profiler.phase("copy_assets"):
+        copy_assets(config)
+
+    generate_site_pages(articles_to_publish, config, only=dirty_outputs, profiler=profiler)
+    save_dependency_graph(config, dep_graph, build_context)
+    save_related_cache(config, related)
+
     print("\n🎉 同步完成 (Atomic V2)！")
+    return results_by_file, new_manifest, dep_graph, block_index
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("🚀 啟動 Logseq Block-Publish Agent (Atomic V2)...")
+    config = PublisherConfig()
+    profiler = PhaseProfiler(enabled=args.profile, trace_memory=args.tracemalloc)
+
+    if args.cprofile:
+        import cProfile
+        cprof = cProfile.Profile()
+        state = cprof.runcall(publish, config, args, profiler)
+        os.makedirs(os.path.dirname(args.cprofile) or ".", exist_ok=True)
+        cprof.dump_stats(args.cprofile)
+        print(f"  🔬 cProfile 已輸出: {args.cprofile} (可用 python -m pstats 查看)")
+    else:
+        state = publish(config, args, profiler)
+
+    if profiler.enabled:
+        report = profiler.report(top=args.profile_top)
+        report_path = args.profile_out or os.path.join(config.cache_dir, "profile.json")
+        write_profile_report(report, report_path)
+        print(format_profile_summary(report))
+        print(f"\n  📊 效能報告已輸出: {report_path}")
+
+    if args.watch and state:
+        from .watch import watch_and_publish
+        results_by_file, manifest, dep_graph, block_index = state
+        watch_and_publish(config, results_by_file, manifest, dep_graph, block_index,
+                          interval=args.interval, debounce=args.debounce)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,153 @@
+import time
+from pathlib import Path
+from typing import List, Dict, Set, Tuple, Any, NamedTuple
+from ..contracts.types import Article, PublisherConfig, DependencyGraph, BlockIndex
+from ..actions.block_index import update_block_index, save_block_index, block_tags_map
+from ..actions.transclusion import Transcluder
+from ..actions.collisions import resolve_collisions, collision_count, format_collision_report, case_insensitive_paths
+from ..actions.related import build_related_index, save_related_cache
+from ..actions.backlinks import build_backlink_index
+from ..actions.wikilinks import build_wikilink_index, format_unresolved_report
+from ..actions.cache import compute_build_context, save_build_manifest
+from ..actions.discovery import discover_source_files
+from ..actions.pipeline import parse_and_enrich_file, assign_output_paths, assign_routes, output_rel_path, build_tag_index, generate_site_pages
+from ..actions.depgraph import build_dependency_graph, find_dirty_outputs, save_dependency_graph
+from ..actions.fs import write_articles, remove_output_files
+
+class SourceStat(NamedTuple):
+    """快照只保留 (mtime_ns, size)；欄位名稱與 os.stat_result 相同，可直接交給 update_block_index"""
+    st_mtime_ns: int
+    st_size: int
+
+def snapshot_source_files(config: PublisherConfig) -> Dict[Path, SourceStat]:
+    """來源檔 -> (mtime_ns, size)"""
+    return {f: SourceStat(st.st_mtime_ns, st.st_size) for f, st in discover_source_files(config).items()}
+
+def diff_snapshots(old: Dict[Path, SourceStat], new: Dict[Path, SourceStat]) -> Tuple[Set[Path], Set[Path]]:
+    """回傳 (新增或修改的檔案, 被刪除的檔案)"""
+    changed = {f for f, sig in new.items() if old.get(f) != sig}
+    removed = set(old) - set(new)
+    return changed, removed
+
+def wait_for_quiet(config: PublisherConfig, snapshot: Dict[Path, SourceStat], debounce: float) -> Dict[Path, SourceStat]:
+    """Logseq 存檔常是一連串寫入，等到 debounce 秒內不再變動才開始處理"""
+    while True:
+        time.sleep(debounce)
+        latest = snapshot_source_files(config)
+        if latest == snapshot:
+            return latest
+        snapshot = latest
+
+def collect_published(order: List[Path], results_by_file: Dict[Path, List[Article]],
+                      case_insensitive: bool = True) -> Tuple[List[Article], str]:
+    """回傳 (已指定輸出路徑的文章, 衝突報告)；Watch 模式不中止，衝突一律加後綴"""
+    articles = []
+    for f in order:
+        articles.extend(assign_output_paths(results_by_file.get(f, [])))
+    report = resolve_collisions(articles, case_insensitive)
+    return assign_routes(articles), format_collision_report(report) if collision_count(report) else ""
+
+def unresolved_report(articles: List[Article], wikilinks) -> str:
+    missing = wikilinks.unresolved(articles) if wikilinks is not None else {}
+    return format_unresolved_report(missing) if missing else ""
+
+def report_if_changed(reports: Dict[str, str], name: str, text: str, cleared: str):
+    """同一份報告每次重建都會重算，只在內容改變時印出"""
+    if reports.get(name, "") == text:
+        return
+    reports[name] = text
+    print(text or cleared)
+
+def watch_and_publish(config: PublisherConfig, results_by_file: Dict[Path, List[Article]],
+                      manifest: Dict[str, Dict[str, Any]], dep_graph: DependencyGraph, block_index: BlockIndex,
+                      interval: float = 1.0, debounce: float = 0.5):
+    """
+    常駐監看模式 (輪詢)。解析結果保留在記憶體中，
+    每次變更只重新解析異動的檔案，再由相依圖決定要重寫哪些輸出與彙總頁面。
+    """
+    # generate_dashboard 會寫回 KB/pages/index.md，它自己的寫入不應再觸發重建
+    self_written = Path(config.logseq_dir) / "pages" / "index.md"
+    uuid_map = block_tags_map(block_index, config)
+    # 相關文章排名: 只重算涉及的標籤 / 分類有變動的 Signature，內文向量只算內文有變的文章
+    related = None
+    # 被引用於: 反向連結索引常駐記憶體，每次只更新連出連結有變的文章
+    backlinks = None
+
+    # 輸出目錄的檔案系統是否分大小寫只偵測一次
+    case_insensitive = case_insensitive_paths(config)
+    snapshot = snapshot_source_files(config)
+    order = list(snapshot)
+    articles, collision_text = collect_published(order, results_by_file, case_insensitive)
+    # publish() 已經印過這兩份報告，之後只印有變的
+    reports = {
+        "collisions": collision_text,
+        "unresolved": unresolved_report(articles, build_wikilink_index(articles, config)),
+    }
+    print(f"\n👀 Watch 模式: 監看 {config.logseq_dir} (每 {interval}s 輪詢，Ctrl+C 結束)")
+
+    try:
+        while True:
+            time.sleep(interval)
+            latest = snapshot_source_files(config)
+            if latest == snapshot:
+                continue
+            latest = wait_for_quiet(config, latest, debounce)
+            changed, removed = diff_snapshots(snapshot, latest)
+            changed.discard(self_written)
+            snapshot = latest
+            if not changed and not removed:
+                continue
+
+            started = time.time()
+            old_paths = {output_rel_path(a) for a in articles}
+
+            # 沿用等待期間的快照，不再重新掃描整個目錄
+            block_index, _ = update_block_index(block_index, latest)
+            save_block_index(config, block_index)
+            # UUID 標籤對照改變會影響所有文章的標籤解析，只能整個重新 Enrich
+            new_uuid_map = block_tags_map(block_index, config)
+            if new_uuid_map != uuid_map:
+                uuid_map = new_uuid_map
+                changed = set(latest)
+
+            for f in removed:
+                results_by_file.pop(f, None)
+                manifest.pop(str(f), None)
+
+            for f in changed:
+                results_by_file[f], manifest[str(f)] = parse_and_enrich_file(f, config, uuid_map)
+
+            order = list(latest)
+            articles, collision_text = collect_published(order, results_by_file, case_insensitive)
+            report_if_changed(reports, "collisions", collision_text, "  ✅ 輸出路徑 / Slug / 短網址已無衝突")
+            new_paths = {output_rel_path(a) for a in articles}
+
+            related = build_related_index(articles, build_tag_index(articles), config, previous_index=related)
+            if config.backlinks_section:
+                backlinks = build_backlink_index(articles, previous=backlinks)
+            wikilinks = build_wikilink_index(articles, config)
+            report_if_changed(reports, "unresolved", unresolved_report(articles, wikilinks), "  ✅ 所有 [[連結]] 都已找到對應的文章")
+            transcluder = Transcluder(block_index, config)
+            new_graph = build_dependency_graph(results_by_file, articles, related, config, transcluder, backlinks, wikilinks)
+            dirty_outputs = find_dirty_outputs(new_graph, dep_graph, config)
+            dirty_articles = [art for art in articles if output_rel_path(art) in dirty_outputs]
+            updated_count, _ = write_articles(dirty_articles, config, related, transcluder=transcluder,
+                                              backlinks=backlinks, wikilinks=wikilinks)
+
+            remove_output_files(config, old_paths - new_paths)
+            generate_site_pages(articles, config, only=dirty_outputs)
+
+            build_context = compute_build_context(config, uuid_map)
+            save_build_manifest(config, manifest, build_context)
+            save_dependency_graph(config, new_graph, build_context)
+            save_related_cache(config, related)
+            dep_graph = new_graph
+
+            # 把自己寫回的 index.md 納入快照
+            if self_written.exists():
+                st = self_written.stat()
+                snapshot[self_written] = (st.st_mtime_ns, st.st_size)
+
+            print(f"🔁 {len(changed)} 個檔案變更, {len(removed)} 個刪除 → 更新 {updated_count} 篇 ({time.time() - started:.2f}s)")
+    except KeyboardInterrupt:
+        print("\n👋 結束 Watch 模式")
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+產生擬真的 Logseq KB 目錄樹，用於 publisher 效能測試。
+
+內容包含:
+- journals: 帶 ++/publish 或 ((publish_uuid)) 標記的 Block 文章、frontmatter 子區塊、
+  巢狀 Code Fence、系統屬性、🏁 結束標記，以及大量不會發佈的一般日誌
+- pages: Legacy frontmatter 頁面 (含草稿)、TagsBlock.md UUID 標籤、index.md 首頁
+- assets: 小型圖片檔
+
+用法:
+    python3 scripts/synthetic_kb.py <輸出目錄> --articles 1000 [--seed 42]
+"""
+import os
+import sys
+import uuid
+import random
+import argparse
+from datetime import date, timedelta
+
+PUBLISH_UUID = "dc0b4d96-f96f-4c1b-9d35-e1a5de79d979"
+
+WORDS_ZH = ["知識", "管理", "筆記", "工具", "寫作", "思考", "產品", "設計", "學習", "系統",
+            "流程", "習慣", "閱讀", "技術", "架構", "效率", "團隊", "溝通", "目標", "回顧"]
+WORDS_EN = ["graph", "block", "outline", "page", "query", "journal", "plugin", "theme",
+            "sync", "export", "template", "workflow", "agent", "prompt", "model", "vector"]
+TAGS = ["Logseq", "LogseqPlugin", "Notion", "Obsidian", "RemNote", "Heptabase", "AI", "AIAgent",
+        "GraphRAG", "PM", "product manager", "寫作", "閱讀", "生產力", "知識管理", "程式設計",
+        "Python", "TypeScript", "Quartz", "Cloudflare"]
+CATEGORIES = ["技術", "生活", "閱讀", "工具", "技術, 生活", "產品"]
+LANGS = ["Python", "javascript", "Bash", "TypeScript", "yaml", ""]
+
+def _sentence(rng: random.Random, titles) -> str:
+    parts = []
+    for _ in range(rng.randint(6, 16)):
+        parts.append(rng.choice(WORDS_ZH) if rng.random() < 0.6 else rng.choice(WORDS_EN))
+    text = "".join(p if not p.isascii() else f" {p} " for p in parts).strip()
+    if titles and rng.random() < 0.3:
+        text += f" [[{rng.choice(titles)}]]"
+    if rng.random() < 0.1:
+        text += f" `inline ++/publish code`"
+    if rng.random() < 0.15:
+        text = f"**{text}**"
+    return text
+
+def _title(rng: random.Random, n: int) -> str:
+    words = [rng.choice(WORDS_ZH) for _ in range(rng.randint(2, 4))]
+    if rng.random() < 0.4:
+        words.insert(1, rng.choice(WORDS_EN).capitalize())
+    sep = rng.choice(["", " ", "：", " | "])
+    return f"{sep.join(words)} {n}"
+
+def _code_fence(rng: random.Random, indent: str) -> list:
+    lang = rng.choice(LANGS)
+    lines = [f"{indent}- ```{lang}"]
+    for i in range(rng.randint(2, 8)):
+        lines.append(f"{indent}  line_{i} = {rng.randint(0, 999)}  # - not a bullet")
+    lines.append(f"{indent}  ```")
+    return lines
+
+def _block_article(rng: random.Random, n: int, titles, tag_uuids, assets) -> list:
+    title = _title(rng, n)
+    titles.append(title)
+    marker = "++/publish" if rng.random() < 0.8 else f"(({PUBLISH_UUID}))"
+    heading = "## " if rng.random() < 0.3 else ""
+    lines = [f"- {heading}{title} {marker}"]
+
+    if rng.random() < 0.7:
+        lines.append("\t- frontmatter")
+        tags = rng.sample(TAGS, rng.randint(1, 3))
+        lines.append(f"\t\t- tags: [{', '.join(tags)}]")
+        lines.append(f"\t\t- categories: {rng.choice(CATEGORIES)}")
+    if rng.random() < 0.3:
+        lines.append("\t  collapsed:: true")
+
+    for _ in range(rng.randint(3, 12)):
+        roll = rng.random()
+        if roll < 0.1:
+            lines.extend(_code_fence(rng, "\t"))
+        elif roll < 0.2:
+            lines.append(f"\t- {_sentence(rng, titles)}")
+            for _ in range(rng.randint(1, 3)):
+                lines.append(f"\t\t- {_sentence(rng, titles)}")
+                if rng.random() < 0.2:
+                    lines.extend(_code_fence(rng, "\t\t"))
+        elif roll < 0.27 and tag_uuids:
+            lines.append(f"\t- 參考 (({rng.choice(tag_uuids)}))")
+        elif roll < 0.33:
+            lines.append(f"\t- {_sentence(rng, titles)} ++/{rng.choice(TAGS).replace(' ', '')}")
+        elif roll < 0.38 and assets:
+            lines.append(f"\t- ![image](../assets/{rng.choice(assets)})")
+        elif roll < 0.41:
+            lines.append(f"\t  id:: {uuid.UUID(int=rng.getrandbits(128))}")
+        elif roll < 0.43:
+            lines.append("\t- * *")
+        else:
+            lines.append(f"\t- {_sentence(rng, titles)}")
+
+    if rng.random() < 0.1:
+        lines.append("\t- 🏁")
+    return lines
+
+def _noise_blocks(rng: random.Random, titles) -> list:
+    lines = []
+    for _ in range(rng.randint(1, 6)):
+        lines.append(f"- {_sentence(rng, titles)}")
+        if rng.random() < 0.4:
+            lines.append(f"\t- {_sentence(rng, titles)}")
+    return lines
+
+def _legacy_page(rng: random.Random, n: int, titles, assets) -> str:
+    title = _title(rng, n)
+    titles.append(title)
+    fm = [
+        "---",
+        f"title: {title}",
+        f"date: {date(2015, 1, 1) + timedelta(days=rng.randint(0, 3000))}",
+        f"tags: [{', '.join(rng.sample(TAGS, rng.randint(1, 4)))}]",
+        f"categories: {rng.choice(CATEGORIES)}",
+    ]
+    if rng.random() < 0.3:
+        fm.append(f"original_url: https://old.example.com/{n}/post-{n}/")
+    if rng.random() < 0.1:
+        fm.append("draft: true")
+    fm.append("---")
+    body = []
+    for _ in range(rng.randint(5, 30)):
+        body.append(_sentence(rng, titles))
+        body.append("")
+    if assets and rng.random() < 0.4:
+        body.append(f"![cover](../assets/{rng.choice(assets)})")
+    return "\n".join(fm + body)
+
+def generate_kb(root: str, articles: int = 1000, seed: int = 42, legacy_ratio: float = 0.2,
+                noise_journals: float = 1.0, tag_blocks: int = 40, asset_count: int = 50) -> dict:
+    """
+    在 root 底下產生 journals/ pages/ assets/。
+    articles: 會被發佈的文章總數 (Block + Legacy，草稿也算在內)
+    noise_journals: 每篇 Block 文章對應多少個沒有發佈標記的日誌
+    """
+    rng = random.Random(seed)
+    journals_dir = os.path.join(root, "journals")
+    pages_dir = os.path.join(root, "pages")
+    assets_dir = os.path.join(root, "assets")
+    for d in (journals_dir, pages_dir, assets_dir):
+        os.makedirs(d, exist_ok=True)
+
+    assets = []
+    for i in range(asset_count):
+        name = f"image_{i}.png"
+        with open(os.path.join(assets_dir, name), "wb") as f:
+            f.write(b"\x89PNG\r\n\x1a\n" + bytes(rng.getrandbits(8) for _ in range(256)))
+        assets.append(name)
+
+    tag_uuids = []
+    tags_block = []
+    for i in range(tag_blocks):
+        tag_uuid = str(uuid.UUID(int=rng.getrandbits(128)))
+        tag_uuids.append(tag_uuid)
+        tags_block.append(f"- ++{rng.choice(TAGS).replace(' ', '')}{i}")
+        tags_block.append(f"  id:: {tag_uuid}")
+    with open(os.path.join(pages_dir, "TagsBlock.md"), "w", encoding="utf-8") as f:
+        f.write("\n".join(tags_block))
+
+    with open(os.path.join(pages_dir, "index.md"), "w", encoding="utf-8") as f:
+        f.write("# Synthetic KB\n- 這是一個自動產生的測試知識庫 [[Home]]\n")
+
+    titles = []
+    legacy_count = int(articles * legacy_ratio)
+    block_count = articles - legacy_count
+
+    day = date(2000, 1, 1)
+    journal_files = 0
+    written = 0
+    while written < block_count:
+        lines = _noise_blocks(rng, titles)
+        for _ in range(min(rng.randint(1, 3), block_count - written)):
+            lines.extend(_block_article(rng, written, titles, tag_uuids, assets))
+            lines.extend(_noise_blocks(rng, titles))
+            written += 1
+        with open(os.path.join(journals_dir, day.strftime("%Y_%m_%d.md")), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+        journal_files += 1
+        day += timedelta(days=1)
+
+    noise_files = int(block_count * noise_journals)
+    for _ in range(noise_files):
+        with open(os.path.join(journals_dir, day.strftime("%Y_%m_%d.md")), "w", encoding="utf-8") as f:
+            f.write("\n".join(_noise_blocks(rng, titles) * rng.randint(1, 4)))
+        day += timedelta(days=1)
+
+    for i in range(legacy_count):
+        with open(os.path.join(pages_dir, f"legacy-page-{i}.md"), "w", encoding="utf-8") as f:
+            f.write(_legacy_page(rng, block_count + i, titles, assets))
+
+    return {
+        "articles": articles,
+        "block_articles": block_count,
+        "legacy_pages": legacy_count,
+        "journal_files": journal_files + noise_files,
+        "assets": asset_count,
+        "seed": seed,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="產生合成 Logseq KB")
+    parser.add_argument("root", help="輸出目錄 (會建立 journals/ pages/ assets/)")
+    parser.add_argument("--articles", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--legacy-ratio", type=float, default=0.2)
+    parser.add_argument("--noise-journals", type=float, default=1.0)
+    args = parser.parse_args()
+
+    stats = generate_kb(args.root, args.articles, args.seed, args.legacy_ratio, args.noise_journals)
+    print(f"✅ 已產生合成 KB: {args.root} ({stats})")
+
+if __name__ == "__main__":
+    sys.exit(main())
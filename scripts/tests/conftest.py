@@ -0,0 +1,44 @@
+import os
+import io
+import sys
+import contextlib
+import pytest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from synthetic_kb import generate_kb
+from publisher.contracts.types import PublisherConfig
+from publisher.actions.profiling import PhaseProfiler
+from publisher.entry.main import publish, parse_args
+
+@contextlib.contextmanager
+def chdir(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+def run_publish(workspace, argv=(), **overrides):
+    """在 workspace (KB/ + quartz/) 執行一次完整發佈，回傳 (publish 的結果, 輸出文字)"""
+    out = io.StringIO()
+    with chdir(workspace), contextlib.redirect_stdout(out):
+        result = publish(PublisherConfig(**overrides), parse_args(list(argv)), PhaseProfiler())
+    return result, out.getvalue()
+
+@pytest.fixture
+def synthetic_workspace(tmp_path):
+    """小型合成 KB (每個測試一份，可以任意修改)"""
+    generate_kb(str(tmp_path / "KB"), articles=60, seed=7)
+    return tmp_path
+
+@pytest.fixture(scope="session")
+def published_articles(tmp_path_factory):
+    """發佈一次合成 KB 後的所有文章 (已指定路由，唯讀共用)"""
+    workspace = tmp_path_factory.mktemp("published")
+    generate_kb(str(workspace / "KB"), articles=150, seed=11)
+    (results_by_file, *_), _ = run_publish(workspace)
+    return [a for f in results_by_file for a in results_by_file[f] if a.filename]
@@ -0,0 +1,217 @@
+"""
+差分測試用的參考實作: 改寫成單次 Lexer 之前的 _parse_block_based (逐行重掃的舊版)。
+只用來比對輸出，不要修改；新解析器的結果必須與它相同。
+"""
+import re
+from pathlib import Path
+from typing import List
+from publisher.contracts.types import Article
+from publisher.actions.utils import sanitize_content_links
+
+def _parse_block_based(filepath: Path, content: str, publish_uuid: str, trigger_tag: str) -> List[Article]:
+    articles = []
+    lines = content.split('\n')
+    i = 0
+    in_code_block = False
+    
+    while i < len(lines):
+        line = lines[i]
+        
+        # 偵測 Code Block
+        if "```" in line:
+            in_code_block = not in_code_block
+        
+        has_valid_uuid = False
+        start_marker = ""
+        
+        # 檢查 UUID
+        if publish_uuid in line:
+            line_no_code = re.sub(r'(`+).*?\1', '', line)
+            if publish_uuid in line_no_code:
+                has_valid_uuid = True
+                start_marker = f"(({publish_uuid}))"
+
+        # 檢查 ++/publish
+        if not has_valid_uuid and trigger_tag in line:
+             line_no_code = re.sub(r'(`+).*?\1', '', line)
+             if trigger_tag in line_no_code:
+                 has_valid_uuid = True
+                 start_marker = trigger_tag
+
+        if has_valid_uuid and not in_code_block and not line.strip().startswith("id::"):
+            # 計算縮排級別
+            indent = len(line) - len(line.lstrip())
+            
+            # 提取標題
+            raw_title = line.strip().lstrip('- ').lstrip('# ').replace(start_marker, "").strip()
+            raw_title = raw_title.replace("**", "").replace("__", "") # Clean Markdown
+            
+            block_content = []
+            frontmatter_raw = {}
+            
+            # 追蹤 Code Block Fence 的縮排
+            fence_indent_len = 0
+            
+            # 往子 Block 掃描
+            j = i + 1
+            while j < len(lines):
+                sub_line = lines[j]
+                
+                # Global End Marker
+                if "🏁" in sub_line:
+                    j = len(lines) # Force Finish
+                    break
+                    
+                if not sub_line.strip():
+                    j += 1
+                    continue
+                    
+                # Pre-filter System Properties
+                clean_check = sub_line.strip()
+                if "::" in clean_check:
+                        if re.match(r'^(collapsed|id|logseq\.[a-z]+)::\s', clean_check):
+                            j += 1
+                            continue
+
+                # 偵測子內容中的 Code Block 開關
+                is_opening_fence = False
+                is_closing_fence = False
+                
+                if "```" in sub_line:
+                    # Normalize fence lang
+                    sub_line = re.sub(r'```([a-zA-Z0-9_\-\+]+)', lambda m: '```' + m.group(1).lower(), sub_line)
+                    
+                    clean_fence_check = sub_line.replace('\t', '').strip()
+                    if clean_fence_check.startswith("- "): 
+                            clean_fence_check = clean_fence_check[2:].strip()
+                    
+                    if not in_code_block:
+                        in_code_block = True
+                        fence_indent_len = len(sub_line) - len(sub_line.lstrip())
+                        is_opening_fence = True
+                    else:
+                        if clean_fence_check == "```" or clean_fence_check.startswith("```"):
+                            in_code_block = False
+                            is_closing_fence = True
+                
+                sub_indent = len(sub_line) - len(sub_line.lstrip())
+                
+                # 如果縮排回到父層級或更少，表示此 Block 結束
+                if sub_indent <= indent and not in_code_block and not is_closing_fence:
+                    break
+
+                # Frontmatter Block Detection
+                clean_sub_check = sub_line.strip()
+                if not in_code_block and clean_sub_check.lower().startswith("- frontmatter"):
+                    fm_indent = sub_indent
+                    k = j + 1
+                    while k < len(lines):
+                        fm_line = lines[k]
+                        if not fm_line.strip():
+                            k += 1
+                            continue
+                        fm_sub_indent = len(fm_line) - len(fm_line.lstrip())
+                        if fm_sub_indent <= fm_indent:
+                            break
+                        fm_text = fm_line.strip().lstrip("- ")
+                        fm_text = fm_text.lstrip("- ") 
+                        if ":" in fm_text:
+                            key, value = fm_text.split(":", 1)
+                            frontmatter_raw[key.strip()] = value.strip()
+                        k += 1
+                    j = k 
+                    continue
+                    
+                # 計算相對層級 (Tabs)
+                raw_indent = sub_line[:sub_indent]
+                relative_tabs = raw_indent[indent:].count('\t')
+                if relative_tabs == 0 and sub_indent > indent:
+                    relative_tabs = (sub_indent - indent) // 2
+                
+                content_part = sub_line[sub_indent:]
+                
+                if in_code_block or is_closing_fence: 
+                        # Strict Stripping
+                        if len(sub_line) >= fence_indent_len:
+                            clean_content = sub_line[fence_indent_len:].rstrip()
+                        else:
+                            clean_content = sub_line.strip()
+
+                        has_bullet = False
+                        
+                        if is_opening_fence:
+                            if clean_content.strip().startswith("- "):
+                                clean_content = clean_content.strip()[2:]
+                                has_bullet = True
+                            elif sub_line.replace('\t', '    ').strip().startswith("- "):
+                                has_bullet = True
+                                if clean_content.strip().startswith("- "):
+                                    clean_content = clean_content.strip()[2:]
+                        
+                else:
+                    clean_content = content_part
+                    has_bullet = False
+                    if not in_code_block and content_part.startswith("- "):
+                        clean_content = content_part[2:]
+                        has_bullet = True
+                    
+                    if clean_content.strip() == "```" or clean_content.strip().startswith("```"):
+                            has_bullet = False 
+                    
+                    if ":: " in clean_content:
+                            prop_match = re.match(r'^[a-zA-Z0-9-_]+::', clean_content)
+                            if prop_match:
+                                j += 1
+                                continue
+
+                if not in_code_block:
+                        clean_content = sanitize_content_links(clean_content)
+                
+                is_header = not in_code_block and clean_content.startswith("#")
+                content_level = max(0, relative_tabs - 1)
+                spaces_count = content_level * 2
+                indent_str = " " * spaces_count
+                
+                if is_closing_fence:
+                    articles_lines = f"{indent_str}  ```"
+                    fence_indent_len = 0
+                    
+                elif in_code_block:
+                    if is_opening_fence:
+                        clean_content = clean_content.lower().strip()
+                    
+                    if has_bullet:
+                        articles_lines = f"{indent_str}- {clean_content}"
+                    else:
+                        articles_lines = f"{indent_str}  {clean_content}"
+                        
+                elif has_bullet:
+                    articles_lines = f"{indent_str}- {clean_content}"
+                else:
+                    if is_header:
+                        articles_lines = f"{indent_str}- {clean_content}"
+                    else:
+                            articles_lines = f"{indent_str}  {clean_content}"
+                    
+                block_content.append(articles_lines)
+                j += 1
+            
+            if not raw_title:
+                 # print(f"DEBUG: Skipping empty title block in {filepath}")
+                 i = j
+                 continue
+
+            # print(f"DEBUG: Parsed article '{raw_title}' from {filepath} (Type: block)")
+            articles.append(Article(
+                title=raw_title,
+                frontmatter=frontmatter_raw,
+                body="\n".join(block_content),
+                source_file=filepath.name,
+                type="block"
+            ))
+            
+            i = j 
+        else:
+            i += 1
+    return articles
+
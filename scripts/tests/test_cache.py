@@ -0,0 +1,58 @@
+import os
+from datetime import datetime, timedelta
+from publisher.contracts.types import Article, PublisherConfig
+from publisher.actions.cache import (build_manifest_entry, lookup_cached_articles,
+                                     load_build_manifest, save_build_manifest)
+
+def _source(tmp_path, text="- 文章 ++/publish\n\t- 內文\n"):
+    path = tmp_path / "page.md"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+def _articles():
+    return [Article(title="文章", source_file="page.md", body="內文", tags=["Logseq"], date="2024-01-02")]
+
+def test_unchanged_file_hits(tmp_path):
+    path = _source(tmp_path)
+    entry = build_manifest_entry(path, _articles())
+    assert lookup_cached_articles(entry, path) == _articles()
+
+def test_touch_with_same_content_hits_and_refreshes_mtime(tmp_path):
+    path = _source(tmp_path)
+    entry = build_manifest_entry(path, _articles())
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+    assert lookup_cached_articles(entry, path) == _articles()
+    assert entry["mtime_ns"] == path.stat().st_mtime_ns
+
+def test_same_size_edit_misses(tmp_path):
+    path = _source(tmp_path)
+    entry = build_manifest_entry(path, _articles())
+    st = path.stat()
+    path.write_text("- 文章 ++/publish\n\t- 內容\n", encoding="utf-8")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+    assert path.stat().st_size == entry["size"]
+    assert lookup_cached_articles(entry, path) is None
+
+def test_size_change_and_missing_entry_miss(tmp_path):
+    path = _source(tmp_path)
+    entry = build_manifest_entry(path, _articles())
+    path.write_text("- 文章 ++/publish\n\t- 更長的內文\n", encoding="utf-8")
+    assert lookup_cached_articles(entry, path) is None
+    assert lookup_cached_articles(None, path) is None
+
+def test_volatile_entry_expires_next_day(tmp_path):
+    path = _source(tmp_path)
+    entry = build_manifest_entry(path, _articles(), date_volatile=True)
+    assert lookup_cached_articles(entry, path) == _articles()
+    entry["volatile_on"] = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    assert lookup_cached_articles(entry, path) is None
+
+def test_manifest_round_trip_requires_same_context(tmp_path):
+    config = PublisherConfig(cache_dir=str(tmp_path / "cache"))
+    path = _source(tmp_path)
+    entries = {str(path): build_manifest_entry(path, _articles())}
+    save_build_manifest(config, entries, "ctx-a")
+    loaded = load_build_manifest(config, "ctx-a")
+    assert lookup_cached_articles(loaded[str(path)], path) == _articles()
+    assert load_build_manifest(config, "ctx-b") == {}
@@ -0,0 +1,66 @@
+import random
+import pytest
+from publisher.contracts.types import Article
+from publisher.actions.collisions import (resolve_collisions, check_collisions, collision_count,
+                                          compute_short_hash, is_case_insensitive_dir)
+
+def _article(title, source, filename=None, target_dir="out", date="2024-01-02", slug=""):
+    return Article(title=title, source_file=source, body="", target_dir=target_dir,
+                   filename=filename or f"{title}.md", date=date, slug=slug)
+
+def test_duplicate_paths_get_suffixes_independent_of_scan_order():
+    for seed in range(5):
+        articles = [_article("Note", f"{c}.md") for c in "abc"]
+        random.Random(seed).shuffle(articles)
+        report = resolve_collisions(articles)
+        by_source = {a.source_file: a.filename for a in articles}
+        assert by_source == {"a.md": "Note.md", "b.md": "Note-2.md", "c.md": "Note-3.md"}
+        assert len(report["path"]) == 1 and len(report["path"][0][1]) == 3
+        assert len({a.short_hash for a in articles}) == 3
+
+def test_case_only_paths_depend_on_filesystem():
+    articles = [_article("Note", "a.md"), _article("note", "b.md")]
+    report = resolve_collisions(articles, case_insensitive=True)
+    assert [a.filename for a in articles] == ["Note.md", "note-2.md"]
+    assert report["path"] == [] and len(report["path_case"]) == 1
+
+    articles = [_article("Note", "a.md"), _article("note", "b.md")]
+    report = resolve_collisions(articles, case_insensitive=False)
+    assert [a.filename for a in articles] == ["Note.md", "note.md"]
+    assert report["path"] == [] and report["path_case"] == []
+
+def test_exact_and_case_only_duplicates_are_reported_separately():
+    articles = [_article("Note", "a.md"), _article("Note", "b.md"), _article("NOTE", "c.md")]
+    report = resolve_collisions(articles)
+    assert [a.filename for a in articles] == ["Note.md", "Note-2.md", "NOTE-3.md"]
+    assert [len(members) for _, members in report["path"]] == [2]
+    assert [len(members) for _, members in report["path_case"]] == [2]
+
+def test_duplicate_slugs_get_suffixes():
+    articles = [_article("A", "a.md", slug="same"), _article("B", "b.md", slug="same")]
+    report = resolve_collisions(articles)
+    assert [a.slug for a in articles] == ["same", "same-2"]
+    assert report["slug"][0][0] == "same"
+
+def test_short_hash_collision_is_salted():
+    articles = [_article("Same", "a.md", target_dir="x"), _article("Same", "b.md", target_dir="y")]
+    report = resolve_collisions(articles)
+    assert articles[0].short_hash == compute_short_hash(articles[0])
+    assert articles[1].short_hash == compute_short_hash(articles[1], 1)
+    assert len(report["short_hash"]) == 1 and report["path"] == []
+
+def test_error_policy_aborts_on_collision(capsys):
+    assert check_collisions([_article("A", "a.md"), _article("B", "b.md")], "error")
+    assert not check_collisions([_article("A", "a.md"), _article("A", "b.md")], "error")
+    assert check_collisions([_article("A", "a.md"), _article("A", "b.md")], "warn")
+    assert "輸出路徑" in capsys.readouterr().out
+
+def test_no_collisions_leaves_articles_alone():
+    articles = [_article(t, f"{t}.md", slug=t.lower()) for t in ("A", "B", "C")]
+    assert collision_count(resolve_collisions(articles)) == 0
+    assert [a.path_suffix for a in articles] == ["", "", ""]
+
+def test_case_probe_uses_nearest_existing_parent(tmp_path):
+    missing = tmp_path / "does" / "not" / "exist"
+    assert is_case_insensitive_dir(str(missing)) == is_case_insensitive_dir(str(tmp_path))
+    assert not list(tmp_path.iterdir())
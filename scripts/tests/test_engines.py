@@ -0,0 +1,44 @@
+import pytest
+from publisher.contracts.types import PublisherConfig
+from publisher.actions import optional
+from publisher.actions.linkgraph import LinkGraph
+from publisher.actions.similarity import ContentSimilarity
+from publisher.actions.related import RelatedIndex, article_key
+from publisher.actions.pipeline import build_tag_index
+
+pytest.importorskip("numpy")
+pytest.importorskip("scipy.sparse")
+
+def _build(factory, pure: bool, monkeypatch):
+    """pure 時讓 optional_module 以為 NumPy / SciPy 沒安裝"""
+    with monkeypatch.context() as m:
+        if pure:
+            m.setattr(optional, "_modules", {"numpy": None, "scipy.sparse": None})
+        return factory()
+
+def test_similarity_numpy_matches_pure_python(published_articles, monkeypatch):
+    keys = [article_key(a) for a in published_articles]
+    config = PublisherConfig()
+    fast, pure = (_build(lambda: ContentSimilarity(published_articles, keys, config), p, monkeypatch)
+                  for p in (False, True))
+    assert any(fast.neighbors.values())
+    # 同一組相似文章；分數只容許浮點誤差 (四捨五入到 12 位時可能落在進位邊界的兩側)
+    assert {k: set(v) for k, v in fast.neighbors.items()} == {k: set(v) for k, v in pure.neighbors.items()}
+    for key, neighbors in fast.neighbors.items():
+        assert neighbors == pytest.approx(pure.neighbors[key], abs=1e-9)
+
+def test_linkgraph_numpy_matches_pure_python(published_articles, monkeypatch):
+    keys = [article_key(a) for a in published_articles]
+    fast, pure = (_build(lambda: LinkGraph(published_articles, keys), p, monkeypatch) for p in (False, True))
+    assert fast.edges > 0
+    assert fast.neighbors == pure.neighbors
+
+@pytest.mark.parametrize("engine", ["links", "blend"])
+def test_related_ranking_is_engine_independent(published_articles, monkeypatch, engine):
+    config = PublisherConfig(related_engine=engine)
+
+    def ranking():
+        related = RelatedIndex(published_articles, build_tag_index(published_articles), config)
+        return [[article_key(r) for r in related.related(a)] for a in published_articles]
+
+    assert _build(ranking, False, monkeypatch) == _build(ranking, True, monkeypatch)
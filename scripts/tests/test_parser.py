@@ -0,0 +1,57 @@
+import random
+from pathlib import Path
+import pytest
+
+import reference_parser
+from publisher.contracts.types import PublisherConfig
+from publisher.actions.markers import marker_matcher
+from publisher.actions.parser import _parse_block_based, parse_logseq_file
+
+CONFIG = PublisherConfig()
+TRIGGER = "++/publish"
+
+# 差分 Fuzz 的素材: 各種縮排、Block 開頭與容易出錯的內容 (Code Fence、行內 Code、屬性、標記)
+INDENTS = ["", "\t", "\t\t", "  ", "    ", "\t  ", " \t", "　", "\t\t\t"]
+PREFIXES = ["- ", "", "-\t", "# ", "- # ", "## "]
+BODIES = [
+    "hello", "++/`x`publish T", "`a` ++/publish `b`", "```", "```Python", "```JS code", "x ```",
+    "`inline ++/publish code`", "++/publish", "Title ++/publish", f"(({CONFIG.publish_uuid}))",
+    f"**T** (({CONFIG.publish_uuid}))", "🏁", "id:: 123", "collapsed:: true", "logseq.order-list-type:: number",
+    "key:: value", "a-b:: c", "ta::g x", "frontmatter", "FrontMatter", "title: Foo", "tags: [a, b]",
+    '[[Some "Link"]] text', "[[A|b c]]", "text with :: inside", "#tag", "", "   ", "id::x",
+    "date: 2024-01-01", "```  ", "- ```", "foo ``` bar ```",
+]
+TRAILING = ["", " ", "  ", "\t"]
+
+def _random_page(rng: random.Random) -> str:
+    return "\n".join(rng.choice(INDENTS) + rng.choice(PREFIXES) + rng.choice(BODIES) + rng.choice(TRAILING)
+                     for _ in range(rng.randint(1, 30)))
+
+def _summary(articles):
+    return [(a.title, a.body, a.frontmatter) for a in articles]
+
+def _assert_same(filepath: Path, content: str, matcher):
+    expected = reference_parser._parse_block_based(filepath, content, CONFIG.publish_uuid, TRIGGER)
+    assert _summary(_parse_block_based(filepath, content, matcher)) == _summary(expected), content
+
+@pytest.mark.parametrize("seed", range(4))
+def test_block_parser_matches_reference_on_random_pages(seed):
+    rng = random.Random(seed)
+    matcher = marker_matcher(CONFIG)
+    for _ in range(1500):
+        _assert_same(Path("x.md"), _random_page(rng), matcher)
+
+def test_block_parser_matches_reference_on_synthetic_kb(synthetic_workspace):
+    matcher = marker_matcher(CONFIG)
+    files = sorted((synthetic_workspace / "KB").rglob("*.md"))
+    assert files
+    for filepath in files:
+        _assert_same(filepath, filepath.read_text(encoding="utf-8"), matcher)
+
+def test_marker_inside_inline_code_is_ignored(tmp_path):
+    page = tmp_path / "journals" / "2024_01_02.md"
+    page.parent.mkdir()
+    page.write_text("- `++/publish` 只是說明\n- 真正的文章 ++/publish\n\t- 內文\n", encoding="utf-8")
+    articles = parse_logseq_file(page, CONFIG)
+    assert [a.title for a in articles] == ["真正的文章"]
+    assert "內文" in articles[0].body
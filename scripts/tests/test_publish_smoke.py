@@ -0,0 +1,39 @@
+import os
+import sys
+import json
+import subprocess
+from conftest import SCRIPTS_DIR, run_publish
+
+def test_second_run_rewrites_nothing(synthetic_workspace):
+    run_publish(synthetic_workspace)
+    content = synthetic_workspace / "quartz" / "content"
+    assert (content / "index.md").exists()
+    mtimes = {p: p.stat().st_mtime_ns for p in content.rglob("*.md")}
+
+    _, output = run_publish(synthetic_workspace)
+    assert "更新 0 篇" in output
+    assert {p: p.stat().st_mtime_ns for p in content.rglob("*.md")} == mtimes
+
+def test_edit_rewrites_only_affected_articles(synthetic_workspace):
+    (results_by_file, *_), _ = run_publish(synthetic_workspace)
+    # Legacy 頁面的整個檔案都是內文，加在檔尾一定會改變文章
+    source = next(f for f, arts in results_by_file.items() if any(a.type == "file" and a.filename for a in arts))
+    with open(synthetic_workspace / source, "a", encoding="utf-8") as f:
+        f.write("\n新增的一段內文\n")
+    _, output = run_publish(synthetic_workspace)
+    assert "更新 0 篇" not in output
+    assert "跳過 0 篇" not in output
+
+def test_bench_publisher_smoke(tmp_path):
+    out = tmp_path / "bench.json"
+    proc = subprocess.run(
+        [sys.executable, os.path.join(SCRIPTS_DIR, "bench_publisher.py"), "--sizes", "50", "--repeat", "1",
+         "--workdir", str(tmp_path / "work"), "--out", str(out), "--import-budget-ms", "60000"],
+        cwd=tmp_path, capture_output=True, text=True, timeout=600,
+    )
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    report = json.loads(out.read_text(encoding="utf-8"))
+    assert not report["startup"]["eager_lazy_modules"]
+    benches = report["sizes"]["50"]
+    assert benches["parse_logseq_file"]["items"] > 0
+    assert all(stats["min_s"] >= 0 for stats in benches.values())
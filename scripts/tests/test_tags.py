@@ -0,0 +1,47 @@
+import random
+from publisher.actions.tags import TagRules, load_tag_rules, drain_rule_hits
+
+RULES = {
+    "blacklist": ["h1", "noise"],
+    "renames": {"product manager": "PM", "ml": "machine-learning"},
+    "prefixes": ["AI", "AIGC", "Logseq", "Log", "Notion"],
+}
+
+def _split_naive(rules: TagRules, tag: str):
+    """逐一檢查前綴的原始寫法 (Trie 的結果必須與它相同)"""
+    for prefix in rules.prefixes:
+        if tag.lower().startswith(prefix.lower()) and len(tag) > len(prefix):
+            suffix = tag[len(prefix):].lstrip("- _")
+            if suffix:
+                return [prefix, suffix], prefix
+    return [tag], ""
+
+def test_prefix_trie_matches_linear_scan():
+    rules = TagRules(RULES)
+    rng = random.Random(3)
+    pieces = ["AI", "ai", "AIGC", "Log", "logseq", "LOGSEQ", "Notion", "No", "-", "_", " ", "筆記", "x", "Seq", "GC"]
+    for _ in range(3000):
+        tag = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 4)))
+        assert rules._split_prefix(tag) == _split_naive(rules, tag), tag
+
+def test_clean_applies_blacklist_rename_prefix_and_dedup():
+    rules = TagRules(RULES)
+    assert rules.clean(["#Logseq筆記法", "h1", "product manager", "PM", "ml", "deep learning"]) == \
+        ["Logseq", "筆記法", "PM", "MachineLearning", "DeepLearning"]
+    # 前綴依規則順序優先: AI 排在 AIGC 前面
+    assert rules.clean(["AIGC工具"]) == ["AI", "GC工具"]
+
+def test_normalize_results_are_cached_and_rule_hits_counted():
+    rules = TagRules(RULES)
+    drain_rule_hits()
+    for _ in range(3):
+        rules.clean(["Logseq筆記法", "noise"])
+    info = rules.normalize.cache_info()
+    assert (info.misses, info.hits) == (2, 4)
+    assert drain_rule_hits() == {"prefix:Logseq": 3, "blacklist:noise": 3}
+    assert drain_rule_hits() == {}
+
+def test_builtin_rules_load_once():
+    rules = load_tag_rules()
+    assert rules is load_tag_rules()
+    assert rules.clean(["product manager"]) == ["PM"]
@@ -0,0 +1,104 @@
+import random
+from pathlib import Path
+from publisher.contracts.types import BlockIndex, PublisherConfig
+from publisher.actions.transclusion import Transcluder
+
+def _index(outlines):
+    """uuid -> 大綱原文 (第一行是 Block 自己的文字)"""
+    index = BlockIndex()
+    for uuid, outline in outlines.items():
+        index.blocks[uuid] = {"text": outline.split("\n", 1)[0], "outline": outline,
+                              "page": "p", "file": "p.md", "parents": []}
+    return index
+
+def _config(tmp_path=None, max_depth=5):
+    return PublisherConfig(transclusion_max_depth=max_depth, logseq_dir=str(tmp_path or "/nonexistent"))
+
+class _NoStore(dict):
+    def __setitem__(self, key, value):
+        pass
+
+def _uncached(index, config):
+    """不使用 memo 的參考: 每次都重新展開"""
+    transcluder = Transcluder(index, config)
+    transcluder._memo = _NoStore()
+    transcluder._truncated_memo = _NoStore()
+    return transcluder
+
+class _CountingTranscluder(Transcluder):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.loads = {}
+
+    def _source(self, key, inline):
+        self.loads[key] = self.loads.get(key, 0) + 1
+        return super()._source(key, inline)
+
+def test_inline_reference_and_embed():
+    index = _index({"a": "A 的內容\n  - 子 Block", "b": "B ((a))"})
+    t = Transcluder(index, _config())
+    assert t.expand("- 看 ((b))") == "- 看 B A 的內容"
+    assert t.expand("\t- {{embed ((a))}}") == "\t- A 的內容\n\t  - 子 Block"
+    assert t.dependencies("- 看 ((b))") == ["block:a", "block:b"]
+
+def test_cycle_keeps_raw_syntax():
+    index = _index({"a": "A ((b))", "b": "B ((a))"})
+    t = Transcluder(index, _config())
+    assert t.expand("- ((a))") == "- A B ((a))"
+    assert t.expand("- ((b))") == "- B A ((b))"
+
+def test_max_depth_cuts_off_chain():
+    index = _index({"a": "A ((b))", "b": "B ((c))", "c": "C ((d))", "d": "D"})
+    assert Transcluder(index, _config(max_depth=2)).expand("((a))") == "A B ((c))"
+    assert Transcluder(index, _config(max_depth=4)).expand("((a))") == "A B C D"
+
+def test_missing_block_and_inline_code_are_kept():
+    t = Transcluder(_index({"a": "A"}), _config())
+    assert t.expand("((missing)) `((a))` ((a))") == "((missing)) `((a))` A"
+    assert t.dependencies("((missing))") == ["block:missing"]
+
+def test_tags_block_references_are_not_expanded(tmp_path):
+    index = _index({"t1": "++Logseq", "a": "A"})
+    tags_block = str(Path(tmp_path) / "pages" / "TagsBlock.md")
+    index.files[tags_block] = {"page": "TagsBlock", "aliases": [], "mtime_ns": 0, "size": 0,
+                               "blocks": {"t1": index.blocks["t1"]}}
+    t = Transcluder(index, _config(tmp_path))
+    assert t.expand("- 文章 ((t1)) ((a))") == "- 文章 ((t1)) A"
+
+def test_shared_block_is_expanded_once_regardless_of_depth():
+    # leaf 在 1~4 層深的位置都被引用
+    index = _index({"leaf": "L", "a": "A ((leaf))", "b": "B ((a)) ((leaf))", "c": "C ((b)) ((leaf))"})
+    t = _CountingTranscluder(index, _config(max_depth=6))
+    bodies = ["((leaf))", "((a))", "((b))", "((c))", "((c)) ((a))"]
+    expected = [_uncached(index, _config(max_depth=6)).expand(body) for body in bodies]
+    assert [t.expand(body) for body in bodies] == expected
+    assert t.loads["block:leaf"] == 1
+
+def test_memo_matches_uncached_expansion():
+    """隨機的引用圖 (含循環、找不到的 Block、各種深度上限)，memo 不可改變任何結果"""
+    rng = random.Random(5)
+    for _ in range(300):
+        uuids = [f"u{i}" for i in range(rng.randint(2, 8))]
+
+        def ref():
+            uuid = rng.choice(uuids + ["missing"])
+            return f"(({uuid}))" if rng.random() < 0.6 else f"{{{{embed (({uuid}))}}}}"
+
+        def text():
+            lines = []
+            for _ in range(rng.randint(1, 3)):
+                k = rng.random()
+                if k < 0.4:
+                    lines.append(f"- t{rng.randint(0, 9)} " + " ".join(ref() for _ in range(rng.randint(0, 2))))
+                elif k < 0.7:
+                    lines.append(f"  - {ref()}")
+                else:
+                    lines.append(f"- {{{{embed (({rng.choice(uuids)}))}}}}")
+            return "\n".join(lines)
+
+        index = _index({uuid: text() for uuid in uuids})
+        config = _config(max_depth=rng.randint(1, 5))
+        cached, reference = Transcluder(index, config), _uncached(index, config)
+        for body in [text() for _ in range(6)]:
+            assert cached.expand(body) == reference.expand(body), body
+            assert cached.dependencies(body) == reference.dependencies(body), body